@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:05:37 2026
+
+@author: mischasch
+"""
+import itertools
+import numbers
+from collections import OrderedDict
+
+import numpy as np
+
+# =============================================================================
+# Brine properties after Batzle & Wang (1992): Seismic properties of pore
+# fluids. Geophysics 57(11), 1396-1408. All functions are vectorized: T, p
+# and S may be floats or arrays of equal (or broadcastable) shape.
+# =============================================================================
+def density(T, p, S):
+    '''
+    brine density
+
+    Parameters
+    ----------
+    T : float or array of float
+        temperature [°C].
+    p : float or array of float
+        pressure [bara].
+    S : float or array of float
+        salinity [mg/l].
+
+    Returns
+    -------
+    float or np.ndarray
+        density [kg/m3].
+
+    '''
+    T, P, S = _units(T, p, S)
+
+    rho_w = 1 + 1e-6 * (-80 * T - 3.3 * T**2 + 0.00175 * T**3 + 489 * P
+                        - 2 * T * P + 0.016 * T**2 * P - 1.3e-5 * T**3 * P
+                        - 0.333 * P**2 - 0.002 * T * P**2)
+    rho_b = rho_w + S * (0.668 + 0.44 * S
+                         + 1e-6 * (300 * P - 2400 * P * S
+                                   + T * (80 + 3 * T - 3300 * S - 13 * P + 47 * P * S)))
+
+    return _result(1000 * rho_b)
+
+def viscosity(T, S):
+    '''
+    brine dynamic viscosity
+
+    Parameters
+    ----------
+    T : float or array of float
+        temperature [°C].
+    S : float or array of float
+        salinity [mg/l].
+
+    Returns
+    -------
+    float or np.ndarray
+        dynamic viscosity [Pa s].
+
+    '''
+    T, _, S = _units(T, 0, S)
+
+    eta = 0.1 + 0.333 * S + (1.65 + 91.9 * S**3) * np.exp(
+        -(0.42 * (S**0.8 - 0.17)**2 + 0.045) * T**0.8)
+
+    return _result(1e-3 * eta)
+
+def _units(T, p, S) -> tuple:
+    '''
+    T [°C], p [MPa] and S [weight fraction] as float arrays. Salinity in
+    mg/l is converted with a density of 1 kg/l.
+    '''
+    return (np.asarray(T, dtype = float), np.asarray(p, dtype = float) / 10,
+            np.asarray(S, dtype = float) * 1e-6)
+
+def _result(values: np.ndarray):
+    return float(values) if values.ndim == 0 else values
+
+# =============================================================================
+# Lookup table and cache. Field-wide computations need the properties at 
+# the same conditions over and over: exact repeats are answered from an LRU
+# cache, new conditions are interpolated from a precomputed table.
+# =============================================================================
+class BrineTable():
+    '''
+    density and viscosity precomputed on a regular temperature - pressure - 
+    salinity grid. Values in between are interpolated (multilinear, the 
+    viscosity logarithmically), conditions outside the grid are NaN. With 
+    the default grid, the interpolation error is below 1e-5 for density 
+    and 1e-3 for viscosity (relative).
+    '''
+    def __init__(self, T: tuple = (0, 250, 2.5), p: tuple = (1, 1001, 10),
+                 S: tuple = (0, 350000, 5000)):
+        '''
+        
+
+        Parameters
+        ----------
+        T : tuple, optional
+            (start, stop, step) of the temperatures [°C], stop included. 
+            The default is (0, 250, 2.5).
+        p : tuple, optional
+            (start, stop, step) of the pressures [bara]. The default is 
+            (1, 1001, 10).
+        S : tuple, optional
+            (start, stop, step) of the salinities [mg/l]. The default is
+            (0, 350000, 5000).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.axes = [_axis(*T), _axis(*p), _axis(*S)]
+        
+        grid = np.meshgrid(*self.axes, indexing = 'ij')
+        self.density = density(*grid)
+        
+        #the viscosity depends on T**0.8 and S**0.8, it is tabulated on a 
+        #grid that is regular in T**0.8 and S**0.8
+        self.viscosity_axes = [np.linspace(axis[0]**0.8, axis[-1]**0.8, len(axis))
+                               for axis in (self.axes[0], self.axes[2])]
+        T_viscosity, S_viscosity = np.meshgrid(*[axis**1.25 for axis in 
+                                                 self.viscosity_axes], 
+                                               indexing = 'ij')
+        self.log_viscosity = np.log(viscosity(T_viscosity, S_viscosity))
+        
+    def properties(self, T, p, S) -> tuple:
+        '''
+        interpolated density [kg/m3] and viscosity [Pa s], see density and
+        viscosity for the parameters
+        '''
+        T, p, S = np.broadcast_arrays(*[np.asarray(value, dtype = float)
+                                        for value in (T, p, S)])
+        
+        return (_interpolate(self.density, self.axes, [T, p, S]),
+                np.exp(_interpolate(self.log_viscosity, self.viscosity_axes,
+                                    [_power(T, 0.8), _power(S, 0.8)])))
+
+class BrineCache():
+    '''
+    brine density and viscosity with a bounded LRU cache of the conditions
+    (T, p, S) computed before. Conditions not in the cache are interpolated
+    from a lookup table, or computed with the correlations if they are 
+    outside the table or no table is used.
+    '''
+    def __init__(self, maxsize: int = 4096, table = True):
+        '''
+        
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            maximum number of cached conditions, the least recently used 
+            are dropped. The default is 4096.
+        table : BrineTable or bool, optional
+            lookup table. True for the default table (built on first use), 
+            False for the exact correlations. The default is True.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.maxsize = maxsize
+        self._table = table
+        
+        self._cache = OrderedDict() #(T, p, S): (density, viscosity)
+        self.hits = 0
+        self.misses = 0
+        
+    def __len__(self) -> int:
+        return len(self._cache)
+        
+    @property
+    def table(self):
+        '''
+        lookup table, None if the correlations are used
+        '''
+        if self._table is True:
+            self._table = BrineTable()
+        return self._table or None
+    
+    @property
+    def hit_rate(self) -> float:
+        '''
+        share of the conditions answered from the cache, NaN before the 
+        first call
+        '''
+        calls = self.hits + self.misses
+        return self.hits / calls if calls > 0 else np.nan
+    
+    def properties(self, T, p, S) -> tuple:
+        '''
+        density and viscosity at one or many conditions. Arrays are 
+        broadcast, every distinct condition is looked up once.
+
+        Parameters
+        ----------
+        T : float or array of float
+            temperature [°C].
+        p : float or array of float
+            pressure [bara].
+        S : float or array of float
+            salinity [mg/l].
+
+        Returns
+        -------
+        tuple
+            density [kg/m3] and dynamic viscosity [Pa s], floats or arrays
+            in the shape of the broadcast conditions.
+
+        '''
+        #single condition, e.g. of one well
+        if all([isinstance(value, numbers.Real) for value in (T, p, S)]):
+            key = (float(T), float(p), float(S))
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            
+        T, p, S = np.broadcast_arrays(*[np.asarray(value, dtype = float)
+                                        for value in (T, p, S)])
+        shape = T.shape
+        
+        conditions, inverse = _unique_rows(np.column_stack([T.ravel(), p.ravel(), 
+                                                            S.ravel()]))
+            
+        keys = [tuple(condition) for condition in conditions.tolist()]
+        values = np.empty((len(keys), 2))
+        
+        missing = []
+        for i, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                values[i] = self._cache[key]
+            else:
+                missing.append(i)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+                
+        if len(missing) > 0:
+            values[missing] = np.column_stack(self._compute(conditions[missing]))
+            for i, value in zip(missing, values[missing].tolist()):
+                self._cache[keys[i]] = tuple(value)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last = False)
+        
+        values = values[inverse]
+        return (_result(values[:, 0].reshape(shape)), 
+                _result(values[:, 1].reshape(shape)))
+    
+    def clear(self) -> None:
+        '''
+        empties the cache and resets the hit and miss counts
+        '''
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+        
+    def _compute(self, conditions: np.ndarray) -> tuple:
+        T, p, S = conditions.T
+        
+        if self.table is None:
+            return density(T, p, S), viscosity(T, S)
+        
+        rho, mu = self.table.properties(T, p, S)
+        
+        #conditions outside of the table
+        outside = np.isnan(rho) | np.isnan(mu)
+        if outside.any():
+            rho[outside] = density(T[outside], p[outside], S[outside])
+            mu[outside] = viscosity(T[outside], S[outside])
+            
+        return rho, mu
+    
+#cache used by the calculators
+cache = BrineCache()
+
+def properties(T, p, S) -> tuple:
+    '''
+    density [kg/m3] and viscosity [Pa s] from the cache of the module (see
+    BrineCache.properties)
+    '''
+    return cache.properties(T, p, S)
+
+def _power(x: np.ndarray, exponent: float) -> np.ndarray:
+    '''
+    sign(x) |x|**exponent, so negative values stay outside of the table
+    '''
+    return np.sign(x) * np.abs(x)**exponent
+
+def _axis(start: float, stop: float, step: float) -> np.ndarray:
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+def _unique_rows(X: np.ndarray) -> tuple:
+    '''
+    distinct rows of X and the index of the distinct row of every row
+    '''
+    if len(X) < 2:
+        return X, np.zeros(len(X), dtype = np.intp)
+    
+    order = np.lexsort(X.T[::-1])
+    X_sorted = X[order]
+    
+    new = np.ones(len(X), dtype = bool)
+    new[1:] = np.any(X_sorted[1:] != X_sorted[:-1], axis = 1)
+    
+    inverse = np.empty(len(X), dtype = np.intp)
+    inverse[order] = np.cumsum(new) - 1
+    
+    return X_sorted[new], inverse
+
+def _interpolate(values: np.ndarray, axes: list, points: list) -> np.ndarray:
+    '''
+    multilinear interpolation on a regular grid, NaN outside of the grid
+    '''
+    lower, weights = [], []
+    inside = np.ones(points[0].shape, dtype = bool)
+    
+    for axis, x in zip(axes, points):
+        t = (x - axis[0]) / (axis[1] - axis[0])
+        inside &= (t >= 0) & (t <= len(axis) - 1)
+        
+        i = np.clip(np.floor(np.nan_to_num(t)).astype(np.intp), 0, len(axis) - 2)
+        lower.append(i)
+        weights.append(t - i)
+        
+    result = np.zeros(points[0].shape)
+    for corner in itertools.product((0, 1), repeat = len(axes)):
+        weight = np.ones(points[0].shape)
+        for w, c in zip(weights, corner):
+            weight = weight * (w if c else 1 - w)
+        result += weight * values[tuple(i + c for i, c in zip(lower, corner))]
+        
+    return np.where(inside, result, np.nan)
@@ -7,20 +7,43 @@ Created on Tue Oct 11 22:44:21 2022
 """
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
+import copy
+import functools
 import sys
+import warnings
 
+from resy import brine
+from resy.calculator import result_cache
+from resy.friction_losses import friction_losses
 
+#calculators whose results are cached, class name: class (see register)
+calculators = dict()
+
+def register(cls):
+    '''
+    class decorator that caches the results of a calculator in
+    resy.calculator.result_cache.cache, keyed by a hash of its inputs. The
+    calculator has to implement inputs.
+    '''
+    calculate = cls.calculate
+
+    @functools.wraps(calculate)
+    def cached_calculate(self):
+        return result_cache.cache.result(self, calculate)
+
+    cls.calculate = cached_calculate
+    calculators[cls.__name__] = cls
+    return cls
 
 class WellCalculator(ABC):
     '''
-    ABC for all calculator classes
+    ABC for all calculator classes. Calculators do not modify the well.
     '''
+    #changes whenever the results of the calculator change, so cached results
+    #are not used anymore (see register)
+    version = 1
+    
     def __init__(self, well):
-        #get location of reslib from config and import module
-        from resy.config import config
-        sys.path.append(config.get('Packages', 'reslib'))
-        import reseng_2101
-
         self.well = well
         
 
@@ -28,10 +51,21 @@ class WellCalculator(ABC):
     def calculate(self):
         ...
         return object #something MUST be returned
+    
+    def inputs(self) -> tuple:
+        '''
+        everything the result depends on, as numbers, strings, None or
+        arrays (see register)
+        '''
+        raise NotImplementedError(type(self).__name__ + ' does not define its inputs')
         
+@register
 class WellFLatQCalculator(WellCalculator):
         '''
-        see documentation in Well.get_fl_at_q()
+        see documentation in Well.get_fl_at_q(). The Darcy-Weisbach losses of
+        all casing sections at all rates are computed at once (see 
+        resy.friction_losses), with the brine properties at T_res, p_res and
+        S of the well (see resy.brine.properties).
 
         '''
         def __init__(self, well, q, z_ref: float, flow_direction: str = 'up'):
@@ -41,27 +75,42 @@ class WellFLatQCalculator(WellCalculator):
             self.z_ref = z_ref
             self.flow_direction = flow_direction
             
+        def inputs(self) -> tuple:
+            return (_casing_inputs(self.well.casing_design), self.well.k,
+                    self.well.T_res, self.well.p_res, self.well.S, self.q,
+                    self.z_ref, self.flow_direction)
+            
         def calculate(self):
+            casing_design = self.well.casing_design
+            if casing_design is None:
+                raise ValueError('Well ' + str(self.well.uwi) + ' has no casing design')
+            
             if self.z_ref != 0:
-                adj_casing_design = self.well.casing_design.adjust_to_zref(self.z_ref,
+                #adjust a copy, the casing design of the well is not modified
+                casing_design = copy.copy(casing_design).adjust_to_zref(self.z_ref,
                                                             self.flow_direction)
-            else:
-                adj_casing_design = self.well.casing_design
-
-            if not isinstance(self.q, Iterable):
-                self.q = [self.q]
-                #only one q value
-            fl = [res.hyd_fl_well_aux(adj_casing_design.ids,
-                                     adj_casing_design.ls, k = self.well.k,
-                                     q = qi, p =  self.well.p_res,
-                                     T = self.well.T_res,
-                                     S = self.well.S)
-                  for qi in self.q]
+                
+            T, p, S = self.well.T_res, self.well.p_res, self.well.S
+            if T is None or p is None:
+                raise ValueError('Well ' + str(self.well.uwi) + ' needs T_res '
+                                 'and p_res for friction losses')
+            if S is None:
+                warnings.warn('Well ' + str(self.well.uwi) + ' has no salinity, '
+                              'friction losses are computed for fresh water')
+                S = 0
+                
+            #memoized, see resy.brine.BrineCache
+            rho, mu = brine.properties(T, p, S)
+            
+            fl = friction_losses(self.q, casing_design.ids, casing_design.ls, 
+                                 k = self.well.k, rho = rho, mu = mu)
             
-            if len(fl) == 1:
-                fl = fl[0]
+            #only one q value
+            if not isinstance(self.q, Iterable):
+                fl = float(fl[0])
             return fl
     
+@register
 class WellPatQCalculator(WellCalculator):
     '''
     computes pressure at a given depth in a well
@@ -76,11 +125,26 @@ class WellPatQCalculator(WellCalculator):
         
         if T is None:
             T = self.well.T_res
+        self.T = T
+        
+    def inputs(self) -> tuple:
+        #exactly the values calculate reads (b_res and c_res are set on the
+        #well, e.g. by Well.compute_c_surf)
+        return (_casing_inputs(self.well.casing_design), self.well.k,
+                self.well.p_res, self.T, self.well.S,
+                getattr(self.well, 'b_res', None), getattr(self.well, 'c_res', None),
+                self.q, self.z_ref, self.flow_direction)
     
     def calculate(self):
+        if self.flow_direction != 'up':
+            raise ValueError('pressures are only implemented for flow direction '
+                             "'up', not " + repr(self.flow_direction))
+        
+        res = _reslib()
+        
         if self.z_ref != 0:
-            adj_casing_design = self.well.casing_design.adjust_to_zref(self.z_ref,
-                                                        self.flow_direction)
+            adj_casing_design = copy.copy(self.well.casing_design).adjust_to_zref(
+                self.z_ref, self.flow_direction)
         else:
             adj_casing_design = self.well.casing_design
             
@@ -90,15 +154,30 @@ class WellPatQCalculator(WellCalculator):
         #TODO: h in TVD above Top Reservoir
         h = 500 #temporary, remove!
         
-        if self.flow_direction == 'up':
-            p = [res.hyd_p_prod_well(q = qi, 
-                                      p_res = self.well.p_res,
-                                      T = self.T, 
-                                      k = self.well.k,
-                                      h = h,
-                                      ls = adj_casing_design.ls,
-                                      ids = adj_casing_design.ids,
-                                      b = self.well.b_res,
-                                      c = self.well.c_res,
-                                      S = self.well.S, p_int = 0)
-                 for qi in self.q]
\ No newline at end of file
+        p = [res.hyd_p_prod_well(q = qi, 
+                                  p_res = self.well.p_res,
+                                  T = self.T, 
+                                  k = self.well.k,
+                                  h = h,
+                                  ls = adj_casing_design.ls,
+                                  ids = adj_casing_design.ids,
+                                  b = self.well.b_res,
+                                  c = self.well.c_res,
+                                  S = self.well.S, p_int = 0)
+             for qi in self.q]
+        return p
+        
+def _casing_inputs(casing_design) -> tuple:
+    if casing_design is None:
+        return None
+    return casing_design.ids, casing_design.ls
+
+def _reslib():
+    '''
+    imports reseng_2101 from the location of reslib in the config
+    '''
+    from resy.config import config
+    sys.path.append(config.get('Packages', 'reslib'))
+    import reseng_2101
+    
+    return reseng_2101
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 10:14:52 2026
+
+@author: mischasch
+"""
+import copy
+import hashlib
+import numbers
+import os
+import warnings
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from resy.config import config
+
+#changes whenever the keys or the file format change, so cached results are
+#not used anymore
+VERSION = 2
+
+class ResultCache():
+    '''
+    content-addressed cache of the results of registered calculators (see
+    resy.calculator.WellCalculator.register). A result is stored under a
+    hash of everything it is computed from (see WellCalculator.inputs), so
+    modified wells are never answered with stale results.
+
+    Recent results are kept in memory, all results are kept in a directory
+    (if set) as one numpy .npz file each, so they are reused across 
+    sessions. The least recently used files are removed when the directory
+    exceeds maxsize. Only numeric results (floats, numeric arrays and lists
+    of floats) are cached, files are read without pickle.
+    '''
+    suffix = '.npz'
+
+    def __init__(self, directory = None, maxsize: int = 2**28, memory: int = 1024):
+        '''
+
+
+        Parameters
+        ----------
+        directory : str or Path, optional
+            directory to persist the results in. The default is None
+            (memory only).
+        maxsize : int, optional
+            maximum size of the directory [bytes]. The default is 2**28
+            (256 MB).
+        memory : int, optional
+            maximum number of results kept in memory. The default is 1024.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.directory = Path(directory) if directory is not None else None
+        self.maxsize = maxsize
+        self.memory = memory
+
+        self._memory = OrderedDict() #key: (result, calculator, tag)
+        self._files = None #key: (path, size, calculator, tag), read on first use
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._memory.keys() | self.files.keys())
+
+    @property
+    def files(self) -> dict:
+        '''
+        results in the directory, key: (path, size [bytes], calculator, tag)
+        '''
+        if self._files is None:
+            self._files = dict()
+            if self.directory is not None and self.directory.exists():
+                for path in self.directory.glob('*' + self.suffix):
+                    entry = _parse(path)
+                    if entry is not None:
+                        self._files[entry[0]] = (path, path.stat().st_size) + entry[1:]
+        return self._files
+
+    @property
+    def size(self) -> int:
+        '''
+        size of the results in the directory [bytes]
+        '''
+        return sum([entry[1] for entry in self.files.values()])
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+        share of the results answered from the cache, NaN before the first
+        call
+        '''
+        calls = self.hits + self.misses
+        return self.hits / calls if calls > 0 else np.nan
+
+    def key(self, calculator) -> str:
+        '''
+        hash of the calculator class and its inputs
+        '''
+        return _digest((VERSION, type(calculator).__name__, calculator.version)
+                       + tuple(calculator.inputs()))
+
+    def result(self, calculator, calculate):
+        '''
+        result of a calculator from the cache, else computed with
+        calculate(calculator) and stored
+
+        Parameters
+        ----------
+        calculator : WellCalculator
+        calculate : callable
+            computes the result (the undecorated calculate method).
+
+        Returns
+        -------
+        result of the calculator.
+
+        '''
+        key = self.key(calculator)
+
+        found, result = self.get(key)
+        if found:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = calculate(calculator)
+        self.put(key, result, type(calculator).__name__, _tag(calculator.well.uwi))
+
+        return result
+
+    def get(self, key: str) -> tuple:
+        '''
+        (True, copy of the result) if a result is stored under the key,
+        else (False, None)
+        '''
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return True, copy.deepcopy(self._memory[key][0])
+
+        if key not in self.files:
+            return False, None
+
+        path, _, name, tag = self.files[key]
+        try:
+            with np.load(path, allow_pickle = False) as data:
+                result = _decode(str(data['kind']), data['result'])
+            #mark as recently used for the eviction
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            self._remove(key)
+            return False, None
+
+        self._remember(key, name, tag, result)
+        return True, copy.deepcopy(result)
+
+    def put(self, key: str, result, calculator: str = '', tag: str = '') -> None:
+        '''
+        stores a result. Results that are not numeric are not cached, 
+        failing to write the directory only issues a warning.
+
+        Parameters
+        ----------
+        key : str
+            see key.
+        result : float, np.ndarray or list of float
+        calculator : str, optional
+            name of the calculator class. The default is ''.
+        tag : str, optional
+            tag of the well (see invalidate). The default is ''.
+
+        '''
+        encoded = _encode(result)
+        if encoded is None:
+            return
+        
+        self._remember(key, calculator, tag, copy.deepcopy(result))
+
+        if self.directory is None:
+            return
+
+        path = self.directory / '-'.join([calculator, tag, key + self.suffix])
+        try:
+            self.directory.mkdir(parents = True, exist_ok = True)
+
+            #write to temporary file first, so readers never see partial results
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                np.savez(f, kind = encoded[0], result = encoded[1])
+            os.replace(tmp, path)
+
+        except OSError as e:
+            warnings.warn('result of ' + calculator + ' could not be cached: ' + str(e))
+            return
+
+        self.files[key] = (path, path.stat().st_size, calculator, tag)
+        self._evict()
+
+    def invalidate(self, well = None, calculator = None) -> None:
+        '''
+        removes results from memory and the directory, e.g. after the code
+        of a calculator changed
+
+        Parameters
+        ----------
+        well : Well or str, optional
+            only the results of this well (or UWI). The default is None.
+        calculator : type or str, optional
+            only the results of this calculator class (or class name). The
+            default is None.
+
+        '''
+        tag = None if well is None else _tag(getattr(well, 'uwi', well))
+        name = getattr(calculator, '__name__', calculator)
+
+        for key, entry in list(self._memory.items()) + list(self.files.items()):
+            if (tag is None or entry[-1] == tag) and (name is None or entry[-2] == name):
+                self._remove(key)
+
+    def clear(self) -> None:
+        '''
+        removes all results and resets the hit and miss counts
+        '''
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, calculator: str, tag: str, result) -> None:
+        self._memory[key] = (result, calculator, tag)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory:
+            self._memory.popitem(last = False)
+
+    def _remove(self, key: str) -> None:
+        self._memory.pop(key, None)
+
+        entry = self.files.pop(key, None)
+        if entry is not None:
+            entry[0].unlink(missing_ok = True)
+
+    def _evict(self) -> None:
+        '''
+        removes the least recently used files until the directory is not
+        larger than maxsize
+        '''
+        size = self.size
+        if size <= self.maxsize:
+            return
+
+        used = dict()
+        for key, (path, *_) in self.files.items():
+            try:
+                used[key] = path.stat().st_mtime_ns
+            except OSError:
+                used[key] = 0
+
+        for key in sorted(used, key = used.get):
+            if size <= self.maxsize:
+                break
+            size -= self.files[key][1]
+
+            #only the file, recent results stay in memory
+            path = self.files.pop(key)[0]
+            path.unlink(missing_ok = True)
+
+#cache used by the registered calculators, persisted in the directory of the
+#Calculator section of the config.ini (if set)
+cache = ResultCache(config.get('Calculator', 'cache', fallback = None),
+                    maxsize = int(config.getfloat('Calculator', 'maxsize',
+                                                  fallback = 256) * 2**20))
+
+def _digest(values) -> str:
+    h = hashlib.blake2b(digest_size = 16)
+    for value in values:
+        _update(h, value)
+    return h.hexdigest()
+
+def _update(h, value) -> None:
+    '''
+    adds a value to a hash. Every value is prefixed with its kind and
+    length, so different values never give the same sequence of bytes.
+    Tuples are hashed element by element (they group inputs that may be
+    None), array-likes such as lists, ranges or pandas Series as arrays.
+    '''
+    if isinstance(value, tuple):
+        h.update(('t' + str(len(value)) + ':').encode())
+        for item in value:
+            _update(h, item)
+        return
+    
+    if value is None:
+        data, kind = b'', 'n'
+    elif isinstance(value, str):
+        data, kind = value.encode('utf-8'), 's'
+    elif isinstance(value, numbers.Real):
+        data, kind = repr(float(value)).encode(), 'f'
+    elif isinstance(value, (list, range, np.ndarray)) or hasattr(value, '__array__'):
+        values = np.asarray(value)
+        if values.dtype.kind in 'biuf':
+            data = np.ascontiguousarray(values, dtype = float).tobytes()
+            kind = 'a' + str(values.shape)
+        else:
+            h.update(('o' + str(values.shape) + ':').encode())
+            for item in values.ravel().tolist():
+                _update(h, item)
+            return
+    else:
+        raise ValueError('values of type ' + type(value).__name__
+                         + ' can not be used in keys')
+
+    h.update((kind + str(len(data)) + ':').encode())
+    h.update(data)
+
+def _encode(result) -> tuple:
+    '''
+    (kind, array) of a result, None if it is not numeric and can't be cached
+    '''
+    if isinstance(result, numbers.Real) and not isinstance(result, (bool, np.bool_)):
+        return 'float', np.asarray(result, dtype = float)
+    if isinstance(result, np.ndarray) and result.dtype.kind in 'biuf':
+        return 'array', result
+    if (isinstance(result, list) and 
+        all([isinstance(value, numbers.Real) for value in result])):
+        return 'list', np.asarray(result, dtype = float)
+    return None
+
+def _decode(kind: str, values: np.ndarray):
+    '''
+    inverse of _encode
+    '''
+    if kind == 'float':
+        return float(values)
+    if kind == 'array':
+        return values
+    if kind == 'list':
+        return values.tolist()
+    raise ValueError('unknown kind of result: ' + kind)
+
+def _tag(uwi) -> str:
+    '''
+    short hash of a UWI, for file names
+    '''
+    return hashlib.blake2b(str(uwi).encode('utf-8'), digest_size = 4).hexdigest()
+
+def _parse(path: Path) -> tuple:
+    '''
+    (key, calculator, tag) from the name of a result file, None if it is no
+    result file
+    '''
+    parts = path.stem.split('-')
+    if len(parts) != 3:
+        return None
+
+    calculator, tag, key = parts
+    return key, calculator, tag
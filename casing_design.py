@@ -116,12 +116,29 @@ class CasingDesign():
         if index > len(self.ls):
             raise ValueError('index out of bounds')
             
-        #set item
-        self.ls[index] = new['l']
-        self.ids[index] = new['id']
-        self.ods[index] = new['od']
-        self.wgs[index] = new['wg']
-        self.descr[index] = new['descr']
+        #set item. The arrays are replaced, not modified, as they may be 
+        #shared with copies (see __copy__)
+        self.ls = _replaced(self.ls, index, new['l'])
+        self.ids = _replaced(self.ids, index, new['id'])
+        self.ods = _replaced(self.ods, index, new['od'])
+        self.wgs = _replaced(self.wgs, index, new['wg'])
+        self.descr = _replaced(self.descr, index, new['descr'])
+        
+    def __copy__(self):
+        '''
+        copy that shares the arrays with this casing design. The copy gets
+        read-only views, all methods replace arrays instead of writing into 
+        them (copy on write). The arrays of this casing design stay 
+        writable.
+        '''
+        new = CasingDesign.__new__(CasingDesign)
+        new.__dict__.update(self.__dict__)
+        
+        for name, values in new.__dict__.items():
+            if isinstance(values, np.ndarray):
+                new.__dict__[name] = _read_only(values)
+                
+        return new
         
     def __repr__(self):
         return pd.DataFrame(data = np.array([self.ls, self.ids, self.ods, self.wgs, self.descr]).T, columns = ['ls', 'ids', 'ods', 'wgs', 'descr']).to_string(index = False)
@@ -341,12 +358,14 @@ class CasingDesign():
         if direction == 'up':
             length = sum(self.ls) - z_ref
             rest = self.ls[:containing_section + 1].sum() - length#reduce containing section by rest length
-            self.ls[containing_section] -= rest
+            self.ls = _replaced(self.ls, containing_section, 
+                                self.ls[containing_section] - rest)
             self.remove(np.arange(containing_section + 1, len(self.ls))) #remove sections above
             
         if direction == 'down':
             rest = self.ls[containing_section:].sum() - z_ref #reduce containing section by rest length
-            self.ls[containing_section] -= rest
+            self.ls = _replaced(self.ls, containing_section, 
+                                self.ls[containing_section] - rest)
             self.remove(np.arange(0, containing_section)) #remove sections above
             
         
@@ -368,4 +387,20 @@ class CasingDesign():
 
         '''
         #TODO
-        pass
\ No newline at end of file
+        pass
+    
+def _read_only(values: np.ndarray) -> np.ndarray:
+    '''
+    read-only view of an array
+    '''
+    values = values.view()
+    values.flags.writeable = False
+    return values
+
+def _replaced(values, index: int, value):
+    '''
+    copy of an array (or list) with one value replaced
+    '''
+    values = np.array(values) if isinstance(values, np.ndarray) else list(values)
+    values[index] = value
+    return values
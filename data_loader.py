@@ -8,7 +8,14 @@ Created on Sun Oct  9 16:27:26 2022
 import pandas as pd
 from abc import ABC, abstractmethod
 from pathlib import Path
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import json
+import time
+import warnings
 import numpy as np
+from openpyxl import load_workbook
 
 #local application import
 from resy.well import Well
@@ -16,16 +23,78 @@ from resy.field import Field
 from resy.welltop import Welltop
 from resy.casing_design import CasingDesign
 from resy.hydraulic_characterisation import PTA, IPR
+from resy.survey import Survey
+from resy.sheet_cache import SheetCache
+from resy.instrumentation import Instrumentation
+from resy.sqlite_store import (ConnectionPool, TABLES as SQLITE_TABLES,
+                               WELL_COLUMNS as SQLITE_WELL_COLUMNS,
+                               WELLTOP_COLUMNS as SQLITE_WELLTOP_COLUMNS,
+                               PTA_COLUMNS as SQLITE_PTA_COLUMNS,
+                               CASING_COLUMNS as SQLITE_CASING_COLUMNS,
+                               survey_arrays)
 import resy.config
 
+#sheets of the HydraulikDB and how to parse them (see _parse_sheet):
+#   header: row (zero indexed) containing the column names
+#   keys: column names or positions. The data ends at the last row in which
+#       any key column is filled, rows after gaps are read
+#   na_values: additional strings to interpret as NaN, optional
+HYDRAULIKDB_SHEETS = {'1a Verlauf':         {'header': 0, 'keys': ['UWI']},
+                      '2a Temperatur':      {'header': 2, 'keys': ['UWI']},
+                      '3a Potential':       {'header': 2, 'keys': ['UWI']},
+                      '8 Mineralisation':   {'header': 0, 'keys': ['UWI'],
+                                             'na_values': [' ']},
+                      '5a Produktivität':   {'header': 2, 'keys': ['Bohrung', 2],
+                                             'na_values': [' ']},
+                      '4d Hydraulik PTA':   {'header': 2, 'keys': ['chk Bohrung'],
+                                             'na_values': [' ']},
+                      '14 Casing Design':   {'header': 1, 'keys': ['UWI']}}
+
+#strings interpreted as NaN (same as pd.read_excel)
+_NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', 
+              '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 
+              'None', 'n/a', 'nan', 'null'}
+
 class DataLoader(ABC):
     '''
     abstractr base class for any class that loads data
     '''
-    def __init__(self, field: Field) -> None:
+    def __init__(self, field: Field, verbose: bool = None, 
+                 instrumentation: Instrumentation = None) -> None:
+        '''
         
+
+        Parameters
+        ----------
+        field : Field
+            field to load the data into.
+        verbose : bool, optional
+            if True, progress is printed. The default is the verbose keyword 
+            of the config.ini (True if not set).
+        instrumentation : Instrumentation, optional
+            collects timings and row counts per sheet and sends them to its
+            sinks (see resy.instrumentation). Loaders that share sheets 
+            should share the instrumentation. The default is a new 
+            Instrumentation with the default sinks.
+
+        '''
         self.field = field
         
+        if verbose is None:
+            from resy.config import config
+            verbose = config.getboolean('DataLoader', 'verbose', fallback = True)
+        self.verbose = verbose
+        
+        self.instrumentation = (instrumentation if instrumentation is not None
+                                else Instrumentation())
+        
+    def _print(self, message: str) -> None:
+        '''
+        prints progress if the loader is verbose
+        '''
+        if self.verbose:
+            print(message)
+        
     @abstractmethod
     def load(self):
         ...
@@ -35,221 +104,1407 @@ class HydraulikDBLoader(DataLoader):
     loads all data from the SWM Hydraulikdatenbank from the path provided with 
     the HydraulikDB keyword of the config.ini
     
+    Parsed sheets are cached next to the workbook (see resy.sheet_cache), 
+    unless the cache keyword of the config.ini is set to False. Sheets that
+    are not cached are parsed in parallel from a single read of the workbook.
     '''
-    def __init__(self, field):
-        super().__init__(field)
+    #sheets used by this loader
+    sheets = ['1a Verlauf', '2a Temperatur', '3a Potential', '8 Mineralisation',
+              '5a Produktivität', '4d Hydraulik PTA']
+    
+    def __init__(self, field, use_cache: bool = None, workers: int = None,
+                 **kwargs):
+        '''
+        
+
+        Parameters
+        ----------
+        field : Field
+            field to load the data into.
+        use_cache : bool, optional
+            if True, parsed sheets are read from / written to the on-disk 
+            cache. The default is the cache keyword of the config.ini 
+            (True if not set).
+        workers : int, optional
+            number of processes used to parse sheets. 1 parses all sheets in
+            the current process. The default is the workers keyword of the 
+            config.ini (number of CPUs if not set).
+        **kwargs
+            verbose and instrumentation, see DataLoader.
+
+        '''
+        super().__init__(field, **kwargs)
         
         #import config for location of HydraulikDB file
         from resy.config import config
         self.hdb_file = config.get('DataLoader', 'HydraulikDB')
+        
+        if use_cache is None:
+            use_cache = config.getboolean('DataLoader', 'cache', fallback = True)
+            
+        self.cache = SheetCache(self.hdb_file) if use_cache else None
+        
+        if workers is None:
+            workers = config.getint('DataLoader', 'workers', 
+                                    fallback = os.cpu_count() or 1)
+        self.workers = workers
+        
+    def read_sheet(self, sheet_name: str) -> pd.DataFrame:
+        '''
+        returns a sheet of the HydraulikDB as pd.DataFrame. The sheet is taken
+        from the cache if the workbook didn't change since it was cached.
+
+        Parameters
+        ----------
+        sheet_name : str
+            sheet name, must be one of HYDRAULIKDB_SHEETS.
+
+        Returns
+        -------
+        pd.DataFrame
+            the unfiltered sheet.
+
+        '''
+        return self.read_sheets([sheet_name])[sheet_name]
+    
+    def read_sheets(self, sheet_names: list = None) -> dict:
+        '''
+        returns several sheets of the HydraulikDB. Cached sheets are taken 
+        from the cache, the workbook is read only once for all other sheets.
+        If more than one sheet needs to be parsed, the sheets are parsed 
+        concurrently in a process pool.
+
+        Parameters
+        ----------
+        sheet_names : list of str, optional
+            sheet names, must be in HYDRAULIKDB_SHEETS. The default is the
+            sheets of this loader.
+
+        Returns
+        -------
+        dict
+            sheet name: unfiltered sheet as pd.DataFrame.
+
+        '''
+        if sheet_names is None:
+            sheet_names = self.sheets
+            
+        frames = {}
+        
+        if self.cache is not None:
+            #the workbook may have changed since the last read, e.g. between
+            #lazy loads (see LazyLoader)
+            self.cache.refresh()
+            for sheet_name in sheet_names:
+                with self.instrumentation.timer(sheet_name, 'parse'):
+                    d = self.cache.get(sheet_name, HYDRAULIKDB_SHEETS[sheet_name])
+                if d is not None:
+                    frames[sheet_name] = d
+                    self.instrumentation.count(sheet_name, source = 'cache')
+                    
+        missing = [sheet_name for sheet_name in sheet_names 
+                   if sheet_name not in frames]
+        
+        if len(missing) == 0:
+            return frames
+        
+        #read the workbook once, all sheets are parsed from memory
+        data = Path(self.hdb_file).read_bytes()
+        
+        if self.workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers = min(self.workers, len(missing)),
+                                     initializer = _init_worker,
+                                     initargs = (data,)) as pool:
+                parsed = dict(zip(missing, 
+                                  pool.map(_parse_worker_sheet, missing)))
+            for sheet_name, (d, seconds) in parsed.items():
+                self.instrumentation.add_time(sheet_name, 'parse', seconds)
+                parsed[sheet_name] = d
+        else:
+            workbook = _open_workbook(data)
+            parsed = {}
+            for sheet_name in missing:
+                with self.instrumentation.timer(sheet_name, 'parse'):
+                    parsed[sheet_name] = _parse_sheet(workbook, sheet_name)
+            workbook.close()
+                
+        for sheet_name, d in parsed.items():
+            self.instrumentation.count(sheet_name, source = 'workbook')
+            if self.cache is not None:
+                self.cache.put(sheet_name, d, HYDRAULIKDB_SHEETS[sheet_name])
+            frames[sheet_name] = d
+            
+        return frames
+
+    def load(self, frames: dict = None, wells: list = None, 
+             sheets: list = None) -> pd.DataFrame:
+        '''
+        loads the HydraulikDB into the field. Wells that are not yet in the
+        field are created in a single pass. Wells that are already in the 
+        field are updated incrementally: only the rows that changed, were 
+        added or were removed since the previous load are applied (see 
+        _detect_changes).
+
+        Parameters
+        ----------
+        frames : dict, optional
+            sheets as returned by read_sheets. Missing sheets are read.
+            The default is None (read all sheets).
+        wells : list of str, optional
+            UWIs of the wells to load. The default is None (all wells).
+        sheets : list of str, optional
+            sheets of this loader to load. The default is None (all sheets).
 
-    def load(self):       
+        Returns
+        -------
+        changes : pd.DataFrame
+            applied changes with columns 'sheet', 'UWI' and 'change' 
+            ('added', 'changed' or 'removed').
+
+        '''
         #file = r'I:\Projekte\SW-ER-PG\FG Reservoir\(05) Reservoir Engineering\Datensammlung\neu\HydraulikdatenbankSWM.xlsx'
+        if sheets is None:
+            sheets = self.sheets
+            
+        frames = self._complete_frames(frames, sheets)
+        
+        prepared = dict()
+        for sheet_name in sheets:
+            self._print('Loading ' + sheet_name + '...')
+            with self.instrumentation.timer(sheet_name, 'construction'):
+                prepared[sheet_name] = _PREPARE[sheet_name](frames[sheet_name])
+            self.instrumentation.count(sheet_name, 
+                                       rows_read = len(frames[sheet_name]),
+                                       rows_accepted = len(prepared[sheet_name]))
+            
+        changes = self._detect_changes(prepared, wells)
         
-        #%% Verlauf, ATTENTION: nrows needs to be adjusted
-        #when new wells are present
-        print('Loading 1a Verlauf...')
-        d_verlauf = (pd.read_excel(self.hdb_file, sheet_name = '1a Verlauf',
-                                  header = 0,
-                                  nrows = 69))
+        #wells in the Verlauf that are not in the field yet are created in
+        #a single pass, all other changes are applied sheet by sheet
+        new_uwis = _uwis_of(changes, '1a Verlauf', 'added')
+        new_uwis = new_uwis[~new_uwis.isin(self.field.uwis)]
         
+        if len(new_uwis) > 0:
+            self._print('Creating wells...')
+            #wells are built from all sheets at once, the time is counted 
+            #for the Verlauf
+            with self.instrumentation.timer('1a Verlauf', 'construction'):
+                self.field.add_wells(_build_wells(prepared, new_uwis))
         
-        #create field and new well for each verlauf entry with UWI and well name
+        #changes of the Verlauf affect the IPR measurement depth
+        if '5a Produktivität' in prepared:
+            changes = _add_dependent_changes(changes, '1a Verlauf', 
+                                             '5a Produktivität', 
+                                             prepared['5a Produktivität'].index)
+        elif '5a Produktivität' in self.field._row_hashes:
+            #IPR not loaded now: forget the hashes, so the IPR is applied 
+            #again when it is loaded
+            self.field._row_hashes['5a Produktivität'] = \
+                (self.field._row_hashes['5a Produktivität']
+                 .drop(_uwis_of(changes, '1a Verlauf', 'changed'), 
+                       errors = 'ignore'))
         
+        built = changes.UWI.isin(new_uwis) & changes.sheet.isin(_BUILD_SHEETS)
+        self._apply_changes(prepared, changes[~built])
+
+        self.instrumentation.flush(self, sheets)
+        self._print('Done')
         
-        for i, welli in d_verlauf.iterrows():
-            well = Well(uwi = welli.UWI,
-                             name = welli.Bohrung)
+        return changes
+    
+    def _detect_changes(self, prepared: dict, wells: list = None) -> pd.DataFrame:
+        '''
+        compares the content hash of every row (per sheet and UWI) to the 
+        hashes of the previous load, which are stored in the field. The 
+        stored hashes are updated.
+
+        Parameters
+        ----------
+        prepared : dict
+            sheet name: sheet prepared by the corresponding _PREPARE function.
+        wells : list of str, optional
+            UWIs to compare. Rows of all other wells are ignored. The default 
+            is None (all wells).
+
+        Returns
+        -------
+        changes : pd.DataFrame
+            columns 'sheet', 'UWI', 'change'.
+
+        '''
+        if isinstance(wells, str):
+            wells = [wells]
             
-            #create TR welltop
-            tr_welltop = Welltop(name = 'top reservoir',
-                               z_MD = welli.Z1_mMD_TR,
-                               z_TVD = welli.Z1_mTVD_TR,
-                               x = welli.X_TR,
-                               y = welli.Y_TR
-                               )
+        #wells that receive data: all wells in the field, but if the Verlauf
+        #is loaded, it adds and removes wells
+        uwis = pd.Index(self.field.uwis)
             
-            gok_welltop = Welltop(name = 'surface',
-                                  z_MD = 0,
-                                  z_NN = welli.GOK_mNN)
+        changes = []
+        for sheet_name in sorted(prepared, key = lambda name: name != '1a Verlauf'):
+            d = prepared[sheet_name]
             
-            if not np.isnan(welli.GOK_mNN):
-                well.welltops['surface'] = gok_welltop
-                
-            if not all([np.isnan(tr_welltop.z_MD),
-                    np.isnan(tr_welltop.z_TVD)]):    
-                
-                well.welltops['top reservoir'] = tr_welltop
-            
-            #create final depth welltop
-            fd_welltop = Welltop(name = 'final depth',
-                                      z_MD = welli.Z1_mMD_ET,
-                                      z_TVD = welli.Z1_mTVD_ET,
-                                      x = welli.X_ET,
-                                      y = welli.Y_ET
-                                      )
-            if not all([np.isnan(fd_welltop.z_MD),
-                    np.isnan(fd_welltop.z_TVD)]): 
-                
-                well.welltops['final depth'] = fd_welltop
-            
-            self.field.add_well(well)
-            
-        print('Done')
-        
-        #%%Temperatur
-        print('Loading 2a Temperatur...')
-        d_temperature = (pd.read_excel(self.hdb_file , sheet_name = '2a Temperatur',
-                                  header = 2,
-                                  nrows = 170))
-        d_temperature = (d_temperature
-                         .loc[d_temperature.chk1 == 1])
-        
-        for i, welli in d_temperature.iterrows():
-            self.field[welli.UWI].T_res = welli.TRESmax
-        print('Done')
-            
-            
-        # %% Potential
-        print('Loading 3a Potential...')
-        d_potential = pd.read_excel(self.hdb_file , sheet_name = '3a Potential',
-                                    header = 2,
-                                    nrows = 125)
-        
-        d_potential = (d_potential
-                       .loc[d_potential.chk == 1])
-        
-        for i, welli in d_potential.iterrows():
-            self.field[welli.UWI].p_res = welli.PRES_TR
-        print('Done')
-        # %% Mineralisation
-        print('Loading 8 Mineralisation...')
-        d_mineralisation = pd.read_excel(self.hdb_file , sheet_name = '8 Mineralisation',
-                                    header = 0,
-                                    nrows = 54,
-                                    na_values = ' ')
-               
-        for i, welli in d_mineralisation.iterrows():
-            self.field[welli.UWI].S = welli.Mineralisation
-        print('Done')
-            
-        #%% b- und c-Koeffizienten
-        print('Loading 5a Produktivität...')
-        d_ipr = pd.read_excel(self.hdb_file , sheet_name = '5a Produktivität',
-                                    header = 2,
-                                    nrows = 37,
-                                    na_values = ' ')
-        d_ipr = (d_ipr
-                 .rename(columns = {'C [-]': 'c',
-                                    'B [-]': 'b',
-                                    'Bohrung': 'Name',
-                                    d_ipr.columns[2]: 'UWI',
-                                    d_ipr.columns[7]: 'certain_end',
-                                    d_ipr.columns[9]: 'uncertain_end',
-                                    d_ipr.columns[10]: 'description',
-                                    d_ipr.columns[11]: 'origin'})
-                 .query('~UWI.isnull()', engine = 'python'))
-        
-        for i, welli in d_ipr.iterrows():
-            ipr = IPR()
-            ipr.b = welli.b
-            ipr.c = welli.c
-            ipr.range_certain = (welli.Sicher, welli.certain_end)
-            ipr.range_uncertain = (welli.Unsicher, welli.uncertain_end)
-            ipr.description = welli.description
-            ipr.origin = welli.origin
-            
-            if isinstance(welli.description, str): #if not: nan
-                if 'BDS' in welli.description:
-                    #neglect distance from sensor to top reservoir
-                    try:
-                        ipr.measurement_depth = (self.field[welli.UWI]
-                                             .welltops['top reservoir'].z_MD)
-                    except:
-                        raise ValueError('no welltop found for top reservoir in well: '
-                                         + welli.UWI)
-                elif 'TKP' in welli.description or 'TKP':
-                    #Attention: no esp intake depth is known form the data. 
-                    # 700 m is just assumed.
-                    ipr.measurement_depth = 700
+            with self.instrumentation.timer(sheet_name, 'construction'):
+                new = _row_hashes(d)
+                old = self.field._row_hashes.get(sheet_name, 
+                                                 pd.Series(dtype = 'uint64'))
+            
+                #hashes of wells that are not in the field (any more) are outdated
+                old = old[old.index.isin(uwis)]
+            
+                if sheet_name != '1a Verlauf':
+                    _warn_unknown_uwis(sheet_name, new.index, uwis)
+                    new = new[new.index.isin(uwis)]
+            
+                if wells is not None:
+                    keep = old[~old.index.isin(wells)]
+                    old = old[old.index.isin(wells)]
+                    new = new[new.index.isin(wells)]
                 else:
-                    ipr.measurement_depth = 0
+                    keep = old.iloc[:0]
+                
+                common = new.index.intersection(old.index)
+                changed = common[new[common].to_numpy() != old[common].to_numpy()]
+                added = new.index.difference(old.index)
+                removed = old.index.difference(new.index)
+            
+                for change, change_uwis in [('added', added),
+                                            ('changed', changed),
+                                            ('removed', removed)]:
+                    changes.append(pd.DataFrame({'sheet': sheet_name,
+                                                 'UWI': change_uwis,
+                                                 'change': change}))
                 
-            self.field[welli.UWI].ipr = ipr
-            
-        print('Done')
-        
-        #%% PTA
-        
-        print('Loading PTA...')
-        d_pta = pd.read_excel(self.hdb_file , sheet_name = '4d Hydraulik PTA',
-                                    header = 2,
-                                    nrows = 78,
-                                    na_values = ' ')
-        d_pta = (d_pta.loc[d_pta.chk == 1])
-               
-        for i, welli in d_pta.iterrows():
-            pta = PTA(k = welli['Permeabilität'],
-                                   phi = welli['Porosität'],
-                                   aquifer_thickness = welli['Mächtigkeit Auswertung'],
-                                   kh = welli['Transmissibilität'],
-                                   Kh = welli['Transmissivität'],
-                                   phih = welli['Porosität x Mächtigkeit'],
-                                   Sc = welli['Speicherkoeffizient'],
-                                   m_d_comp = welli['M=D'],
-                                   skin = welli['Skin/Skin0'])
-            
-            self.field[welli['chk Bohrung']].pta = pta
-
-        print('Done')
+                self.field._row_hashes[sheet_name] = pd.concat([keep, new])
+            
+                if sheet_name == '1a Verlauf':
+                    uwis = uwis.difference(removed).union(added)
+            
+        return pd.concat(changes, ignore_index = True)
+    
+    def _apply_changes(self, prepared: dict, changes: pd.DataFrame) -> None:
+        '''
+        applies changed, added and removed rows to the wells in the field.
+        Rows of the Verlauf are applied first, as they create and remove 
+        wells.
+
+        '''
+        wells = self.field.wells_by_uwi
+        
+        for sheet_name in sorted(prepared, key = lambda name: name != '1a Verlauf'):
+            d = prepared[sheet_name]
+            
+            with self.instrumentation.timer(sheet_name, 'construction'):
+                update = _uwis_of(changes, sheet_name, ['added', 'changed'])
+                removed = _uwis_of(changes, sheet_name, 'removed')
+            
+                if sheet_name == '1a Verlauf' and len(removed) > 0:
+                    self.field.remove_wells(list(removed))
+                    removed = removed[:0]
+            
+                if sheet_name == '5a Produktivität':
+                    #measurement depth from the (updated) top reservoir welltops
+                    d = d.loc[update]
+                    tr = [wells[uwi].welltops.get('top reservoir') for uwi in update]
+                    d = d.assign(Z1_mMD_TR = [np.nan if wt is None else wt.z_MD for wt in tr],
+                                 Z1_mTVD_TR = [np.nan if wt is None else wt.z_TVD for wt in tr])
+                    d['ipr_measurement_depth'] = _ipr_measurement_depth(d)
+            
+                _APPLY[sheet_name](wells, d, update, removed)
+        
+    def _complete_frames(self, frames: dict = None, sheets: list = None) -> dict:
+        '''
+        reads the sheets (default: sheets of this loader) that are missing in
+        frames
+        '''
+        frames = dict(frames) if frames is not None else {}
+        
+        if sheets is None:
+            sheets = self.sheets
+        
+        missing = [sheet_name for sheet_name in sheets 
+                   if sheet_name not in frames]
+        if len(missing) > 0:
+            frames.update(self.read_sheets(missing))
+            
+        return frames
             
                 
 class SurveyLoader(DataLoader):
-    def load(self):
+    '''
+    loads the deviation surveys of the wells from a directory of survey files
+    (path provided with the surveys keyword of the config.ini). A survey file
+    belongs to a well if its name (without suffix) is the UWI or the name of
+    the well, e.g. W1.csv or W1.las.
+    
+    Supported are delimited text files (csv, txt, asc, dev) with a header
+    row and LAS-style files (las). Files are parsed concurrently in a process
+    pool, every file is streamed in chunks directly into numpy arrays.
+    Files that did not change since the previous load are skipped.
+    '''
+    #file suffixes of survey files, LAS-style files are parsed by their header
+    suffixes = ['.csv', '.txt', '.asc', '.dev', '.las']
+    
+    def __init__(self, field, directory = None, workers: int = None,
+                 chunksize: int = 2**16, **kwargs):
         '''
-        #TODO: implement such that to each well a corresponding survey is looked up, loaded andconverted to a survey object.
+        
+
+        Parameters
+        ----------
+        field : Field
+            field to load the surveys into.
+        directory : str or Path, optional
+            directory of the survey files. The default is the surveys 
+            keyword of the config.ini.
+        workers : int, optional
+            number of processes used to parse files. 1 parses all files in
+            the current process. The default is the workers keyword of the 
+            config.ini (number of CPUs if not set).
+        chunksize : int, optional
+            number of stations read from a file at once. The default is 65536.
+        **kwargs
+            verbose and instrumentation, see DataLoader.
+
+        '''
+        super().__init__(field, **kwargs)
+        
+        from resy.config import config
+        if directory is None:
+            directory = config.get('DataLoader', 'surveys')
+        self.directory = Path(directory)
+        
+        if workers is None:
+            workers = config.getint('DataLoader', 'workers', 
+                                    fallback = os.cpu_count() or 1)
+        self.workers = workers
+        self.chunksize = chunksize
+        
+    def find_files(self, wells: list = None) -> dict:
+        '''
+        looks up the survey file of every well. Matching is case insensitive,
+        the UWI takes precedence over the well name.
+
+        Parameters
+        ----------
+        wells : list of str, optional
+            UWIs of the wells to look up. The default is None (all wells).
 
         Returns
         -------
-        field
-            DESCRIPTION.
+        dict
+            UWI: path of the survey file, for all wells with a survey file.
 
         '''
-        for well in self.wells:
-            pass
+        if isinstance(wells, str):
+            wells = [wells]
+        if wells is not None:
+            wells = set(wells)
         
-        pass
+        files = {}
+        for path in sorted(self.directory.iterdir()):
+            if path.is_file() and path.suffix.lower() in self.suffixes:
+                key = path.stem.lower()
+                if key in files:
+                    warnings.warn('several survey files for ' + path.stem + 
+                                  ', using ' + files[key].name)
+                else:
+                    files[key] = path
+                    
+        found = {}
+        for well in self.field.wells:
+            if wells is not None and well.uwi not in wells:
+                continue
+            for key in [well.uwi, well.name]:
+                if key is not None and str(key).lower() in files:
+                    found[well.uwi] = files[str(key).lower()]
+                    break
+                
+        return found
+    
+    def load(self, wells: list = None) -> pd.DataFrame:
+        '''
+        loads the surveys into the wells of the field. Surveys of wells whose
+        survey file was removed are kept.
+
+        Parameters
+        ----------
+        wells : list of str, optional
+            UWIs of the wells to load. The default is None (all wells).
+
+        Returns
+        -------
+        changes : pd.DataFrame
+            loaded surveys with columns 'sheet' (always 'survey'), 'UWI' and
+            'change' ('added' or 'changed').
+
+        '''
+        self._print('Loading surveys...')
+        files = self.find_files(wells)
+        
+        #skip files that didn't change since the previous load
+        new = pd.Series({uwi: _file_signature(path) for uwi, path in files.items()},
+                        dtype = 'uint64')
+        old = self.field._row_hashes.get('survey', pd.Series(dtype = 'uint64'))
+        
+        common = new.index.intersection(old.index)
+        changed = common[new[common].to_numpy() != old[common].to_numpy()]
+        added = new.index.difference(old.index)
+        update = added.append(changed)
+        
+        paths = [str(files[uwi]) for uwi in update]
+        
+        with self.instrumentation.timer('survey', 'parse'):
+            if self.workers > 1 and len(paths) > 1:
+                with ProcessPoolExecutor(max_workers = min(self.workers, len(paths))) as pool:
+                    surveys = list(pool.map(_parse_survey_file, paths,
+                                            [self.chunksize] * len(paths)))
+            else:
+                surveys = [_parse_survey_file(path, self.chunksize) for path in paths]
+            
+        with self.instrumentation.timer('survey', 'construction'):
+            for uwi, (md, incl, azim, tvd) in zip(update, surveys):
+                self.field[uwi].survey = Survey(md, incl, azim, tvd)
+            
+        self.field._row_hashes['survey'] = pd.concat([old[~old.index.isin(new.index)], new])
+        
+        stations = sum([len(survey[0]) for survey in surveys])
+        self.instrumentation.count('survey', source = str(self.directory),
+                                   files = len(paths), rows_read = stations,
+                                   rows_accepted = stations)
+        self.instrumentation.flush(self, ['survey'])
+        self._print('Done')
+        
+        return pd.DataFrame({'sheet': 'survey',
+                             'UWI': update,
+                             'change': ['added'] * len(added) + ['changed'] * len(changed)})
     
 class CasingDesignLoader(HydraulikDBLoader):
     '''
     imnport casing design. Inherits from HydraulikDBLoader because the casing
     design is stored in the same excel file
     '''
-    def load(self):
+    sheets = ['14 Casing Design']
+    
+    
+class SQLiteLoader(DataLoader):
+    '''
+    loads wells from a local SQLite store written by 
+    resy.sqlite_store.SQLiteWriter (path provided with the sqlite keyword of
+    the config.ini). All tables are indexed by UWI, so single wells and 
+    subsets of wells are loaded without reading the whole store. The tables
+    are read concurrently by threads sharing a small connection pool.
+    '''
+    def __init__(self, field, database = None, pool: ConnectionPool = None,
+                 **kwargs):
         '''
-        #TODO
+        
+
+        Parameters
+        ----------
+        field : Field
+            field to load the wells into.
+        database : str or Path, optional
+            path to the SQLite database. The default is the sqlite keyword 
+            of the config.ini.
+        pool : ConnectionPool, optional
+            connection pool to read with, e.g. to share connections between
+            loaders. The default is a new pool of the database.
+        **kwargs
+            verbose and instrumentation, see DataLoader.
+
+        '''
+        super().__init__(field, **kwargs)
+        
+        if database is None:
+            from resy.config import config
+            database = config.get('DataLoader', 'sqlite')
+        self.database = database
+        
+        self.pool = pool if pool is not None else ConnectionPool(database)
+        
+    def select_uwis(self, wells: list = None, welltop: str = None, 
+                    z_min: float = None, z_max: float = None, 
+                    depth: str = 'z_TVD') -> list:
+        '''
+        UWIs of the stored wells, optionally filtered by the depth of a 
+        welltop, e.g. all wells with the top reservoir deeper than 3000 m TVD:
+        select_uwis(welltop = 'top reservoir', z_min = 3000)
+
+        Parameters
+        ----------
+        wells : list of str, optional
+            UWIs to select from. The default is None (all stored wells).
+        welltop : str, optional
+            name of the welltop to filter by. The default is None (no filter).
+        z_min : float, optional
+            minimum depth of the welltop (inclusive). The default is None.
+        z_max : float, optional
+            maximum depth of the welltop (inclusive). The default is None.
+        depth : str, optional
+            depth of the welltop to filter by: 'z_MD', 'z_TVD' or 'z_NN'. 
+            The default is 'z_TVD'.
+
         Returns
         -------
-        field
-            DESCRIPTION.
+        list of str
 
         '''
-        #file = r'I:\Projekte\SW-ER-PG\FG Reservoir\(05) Reservoir Engineering\Datensammlung\neu\HydraulikdatenbankSWM.xlsx'
+        if isinstance(wells, str):
+            wells = [wells]
+        
+        conditions, params = [], []
         
-        print('Loading 14 Casing Design...')
-        d_cd = (pd.read_excel(self.hdb_file, sheet_name = '14 Casing Design',
-                                  header = 1))
+        if wells is not None:
+            conditions.append('uwi IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps(list(wells)))
+            
+        if welltop is not None:
+            if depth not in ['z_MD', 'z_TVD', 'z_NN']:
+                raise ValueError('depth must be z_MD, z_TVD or z_NN')
+                
+            condition = 'name = ?'
+            params.append(welltop)
+            if z_min is not None:
+                condition += ' AND {} >= ?'.format(depth)
+                params.append(z_min)
+            if z_max is not None:
+                condition += ' AND {} <= ?'.format(depth)
+                params.append(z_max)
+                
+            conditions.append('uwi IN (SELECT uwi FROM welltops WHERE {})'.format(condition))
+            
+        sql = 'SELECT uwi FROM wells'
+        if len(conditions) > 0:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+            
+        with self.pool.connection() as connection:
+            return [uwi for (uwi,) in connection.execute(sql + ' ORDER BY uwi', params)]
+        
+    def read_tables(self, uwis: list = None) -> dict:
+        '''
+        reads the rows of the given wells from all tables, one thread per 
+        table
+
+        Parameters
+        ----------
+        uwis : list of str, optional
+            UWIs of the wells. The default is None (all stored wells).
+
+        Returns
+        -------
+        dict
+            table name: pd.DataFrame, sorted by UWI (and section / station).
+
+        '''
+        def read(table):
+            sql = 'SELECT * FROM ' + table
+            params = ()
+            if uwis is not None:
+                sql += ' WHERE uwi IN (SELECT value FROM json_each(?))'
+                params = (json.dumps(list(uwis)),)
+            sql += ' ORDER BY ' + ', '.join(_SQLITE_ORDER[table])
+            
+            with self.instrumentation.timer(table, 'parse'):
+                with self.pool.connection() as connection:
+                    d = pd.read_sql_query(sql, connection, params = params)
+                    
+            self.instrumentation.count(table, source = str(self.database),
+                                       rows_read = len(d), rows_accepted = len(d))
+            return d
+            
+        with ThreadPoolExecutor(max_workers = self.pool.size) as executor:
+            return dict(zip(SQLITE_TABLES, executor.map(read, SQLITE_TABLES)))
+        
+    def load(self, wells: list = None, welltop: str = None, 
+             z_min: float = None, z_max: float = None,
+             depth: str = 'z_TVD') -> pd.DataFrame:
+        '''
+        loads wells from the store into the field. The stored data replaces
+        the data of wells that are already in the field, all other wells
+        are added. See select_uwis for the parameters.
+
+        Returns
+        -------
+        changes : pd.DataFrame
+            loaded wells with columns 'sheet' (always 'sqlite'), 'UWI' and 
+            'change' ('added' or 'changed').
+
+        '''
+        self._print('Loading ' + str(self.database) + '...')
+        
+        if wells is None and welltop is None:
+            uwis = None
+        else:
+            uwis = self.select_uwis(wells, welltop, z_min, z_max, depth)
+            
+        tables = self.read_tables(uwis)
+        
+        #wells are built from all tables at once, the time is counted for 
+        #the wells table
+        with self.instrumentation.timer('wells', 'construction'):
+            welltops = _group_records(tables['welltops'])
+            iprs = _group_records(tables['ipr'])
+            ptas = _group_records(tables['pta'])
+            casing_sections = _group_frames(tables['casing_sections'])
+            surveys = _group_records(tables['surveys'])
+        
+            change = []
+            for row in tables['wells'].to_dict('records'):
+                uwi = row['uwi']
+                if uwi in self.field:
+                    well = self.field[uwi]
+                    #the store holds all data of the well, nothing left to load
+                    well._lazy = None
+                    change.append('changed')
+                else:
+                    well = Well(uwi)
+                    self.field.add_well(well)
+                    change.append('added')
+                
+                for column in SQLITE_WELL_COLUMNS:
+                    setattr(well, column, row[column])
+                
+                well.welltops = {r['name']: Welltop(**{key: r[key] for key in 
+                                                       ['name'] + SQLITE_WELLTOP_COLUMNS})
+                                 for r in welltops.get(uwi, [])}
+                well.ipr = _sqlite_ipr(iprs[uwi][0]) if uwi in iprs else IPR()
+                well.pta = (PTA(**{attribute: ptas[uwi][0][column] 
+                                   for attribute, column in SQLITE_PTA_COLUMNS.items()})
+                            if uwi in ptas else PTA())
+                well.casing_design = (_sqlite_casing_design(casing_sections[uwi])
+                                      if uwi in casing_sections else None)
+                well.survey = (Survey(*survey_arrays(surveys[uwi][0])) 
+                               if uwi in surveys else None)
         
-        d_cd = (d_cd.loc[~pd.isna(d_cd.OD)])
+        self.instrumentation.flush(self, SQLITE_TABLES)
+        self._print('Done')
         
-        for i, cd in d_cd.groupby('UWI'):
-            cd = cd.sort_values(by = 'Teufe bis', ascending = False)
-            new_cd = CasingDesign(ls = cd['Teufe von'] - cd['Teufe bis'],
-                                  ids = cd.ID,
-                                  ods = cd.OD,
-                                  z_from = cd['Teufe von'],
-                                  z_to = cd['Teufe bis'],
-                                  wgs = cd['Wandstärke'],
-                                  descr = cd.Sektion)
+        return pd.DataFrame({'sheet': 'sqlite', 
+                             'UWI': tables['wells'].uwi,
+                             'change': change})
+    
+    
+class LazyLoader():
+    '''
+    loads sheets of the HydraulikDB on first access of a well attribute that
+    is stored in the sheet (see Well._load_lazy). A sheet is loaded once for 
+    all wells of the field.
+    '''
+    #well attribute: sheet the attribute is loaded from
+    attributes = {'T_res':          '2a Temperatur',
+                  'p_res':          '3a Potential',
+                  'S':              '8 Mineralisation',
+                  'ipr':            '5a Produktivität',
+                  'pta':            '4d Hydraulik PTA',
+                  'casing_design':  '14 Casing Design'}
+    
+    def __init__(self, loaders: list, sheets: list, wells: list = None):
+        '''
+        
+
+        Parameters
+        ----------
+        loaders : list of HydraulikDBLoader
+            loaders of the sheets.
+        sheets : list of str
+            sheets to load lazily.
+        wells : list of str, optional
+            UWIs of the wells to load. The default is None (all wells).
+
+        Returns
+        -------
+        None.
+
+        '''
+        #sheet: loader, for all sheets that are not loaded yet
+        self.pending = {sheet_name: loader for loader in loaders 
+                        for sheet_name in loader.sheets 
+                        if sheet_name in sheets}
+        self.wells = wells
+        
+        #changes applied by the lazy loads (see HydraulikDBLoader.load)
+        self.changes = []
+        
+    def load(self, attribute: str) -> None:
+        '''
+        loads the sheet of an attribute, if not loaded yet
+
+        '''
+        loader = self.pending.pop(self.attributes.get(attribute), None)
+        
+        if loader is not None:
+            self.changes.append(loader.load(wells = self.wells, 
+                                            sheets = [self.attributes[attribute]]))
+            
+    def load_all(self) -> None:
+        '''
+        loads all pending sheets
+        
+        '''
+        for attribute in self.attributes:
+            self.load(attribute)
+            
+            
+#%% preparation of the HydraulikDB sheets
+# each function filters a sheet and returns the relevant columns indexed by
+# UWI with one row per well. If a well appears several times, the last row
+# is used.
+
+def _prepare_verlauf(d: pd.DataFrame) -> pd.DataFrame:
+    return _by_uwi(d, 'UWI', ['Bohrung', 'GOK_mNN', 
+                              'Z1_mMD_TR', 'Z1_mTVD_TR', 'X_TR', 'Y_TR',
+                              'Z1_mMD_ET', 'Z1_mTVD_ET', 'X_ET', 'Y_ET'])
+
+def _prepare_temperature(d: pd.DataFrame) -> pd.DataFrame:
+    d = d.loc[d.chk1 == 1]
+    return _by_uwi(d, 'UWI', ['TRESmax'])
+
+def _prepare_potential(d: pd.DataFrame) -> pd.DataFrame:
+    d = d.loc[d.chk == 1]
+    return _by_uwi(d, 'UWI', ['PRES_TR'])
+
+def _prepare_mineralisation(d: pd.DataFrame) -> pd.DataFrame:
+    return _by_uwi(d, 'UWI', ['Mineralisation'])
+
+def _prepare_ipr(d: pd.DataFrame) -> pd.DataFrame:
+    d = (d.rename(columns = {'C [-]': 'c',
+                             'B [-]': 'b',
+                             'Bohrung': 'Name',
+                             d.columns[2]: 'UWI',
+                             d.columns[7]: 'certain_end',
+                             d.columns[9]: 'uncertain_end',
+                             d.columns[10]: 'description',
+                             d.columns[11]: 'origin'}))
+    
+    return _by_uwi(d, 'UWI', ['b', 'c', 'Sicher', 'certain_end', 'Unsicher', 
+                              'uncertain_end', 'description', 'origin'])
+
+def _prepare_pta(d: pd.DataFrame) -> pd.DataFrame:
+    d = d.loc[d.chk == 1]
+    return _by_uwi(d, 'chk Bohrung', ['Permeabilität', 'Porosität',
+                                      'Mächtigkeit Auswertung', 
+                                      'Transmissibilität', 'Transmissivität',
+                                      'Porosität x Mächtigkeit', 
+                                      'Speicherkoeffizient', 'M=D', 
+                                      'Skin/Skin0'])
+
+def _prepare_casing_design(d: pd.DataFrame) -> pd.DataFrame:
+    '''
+    casing sections indexed by UWI (several rows per well), sorted bottom up
+    '''
+    d = (d.loc[d.OD.notna() & d.UWI.notna()]
+         .sort_values(by = ['UWI', 'Teufe bis'], ascending = [True, False],
+                      kind = 'mergesort'))
+    
+    return d.set_index('UWI')[['Sektion', 'Teufe von', 'Teufe bis', 'OD', 'ID',
+                               'Wandstärke']]
+
+def _by_uwi(d: pd.DataFrame, uwi_column: str, columns: list) -> pd.DataFrame:
+    '''
+    columns of a sheet indexed by UWI, rows without UWI are dropped
+    '''
+    d = d.loc[d[uwi_column].notna()]
+    d = d.drop_duplicates(subset = uwi_column, keep = 'last')
+    
+    return d.set_index(uwi_column)[columns].rename_axis('UWI')
+
+_PREPARE = {'1a Verlauf':         _prepare_verlauf,
+            '2a Temperatur':      _prepare_temperature,
+            '3a Potential':       _prepare_potential,
+            '8 Mineralisation':   _prepare_mineralisation,
+            '5a Produktivität':   _prepare_ipr,
+            '4d Hydraulik PTA':   _prepare_pta,
+            '14 Casing Design':   _prepare_casing_design}
+
+def _row_hashes(d: pd.DataFrame) -> pd.Series:
+    '''
+    content hash of the rows of a prepared sheet, one hash per UWI
+    '''
+    h = pd.util.hash_pandas_object(d, index = True)
+    
+    if not d.index.is_unique:
+        h = (h.groupby(level = 0, sort = False)
+             .agg(lambda hs: hash(tuple(hs)) & 0xFFFFFFFFFFFFFFFF)
+             .astype('uint64'))
+        
+    return h
+
+def _uwis_of(changes: pd.DataFrame, sheet_name: str, change) -> pd.Index:
+    '''
+    UWIs of one or several kinds of change in a sheet
+    '''
+    if isinstance(change, str):
+        change = [change]
+    
+    return pd.Index(changes.UWI[(changes.sheet == sheet_name) & 
+                                changes.change.isin(change)])
+
+def _add_dependent_changes(changes: pd.DataFrame, sheet_name: str,
+                           dependent_sheet: str, uwis: pd.Index) -> pd.DataFrame:
+    '''
+    marks the rows of dependent_sheet as changed if the row of the same well
+    in sheet_name changed
+    '''
+    dependent = _uwis_of(changes, sheet_name, 'changed').intersection(uwis)
+    dependent = dependent.difference(_uwis_of(changes, dependent_sheet, 
+                                              ['added', 'changed']))
+    
+    return pd.concat([changes, pd.DataFrame({'sheet': dependent_sheet,
+                                             'UWI': dependent,
+                                             'change': 'changed'})],
+                     ignore_index = True)
+
+#%% creation of wells and well data from prepared sheets
+#sheets joined to create new wells
+_BUILD_SHEETS = ['1a Verlauf', '2a Temperatur', '3a Potential', 
+                 '8 Mineralisation', '5a Produktivität', '4d Hydraulik PTA']
+
+def _build_wells(prepared: dict, uwis: pd.Index) -> list:
+    '''
+    creates new wells from the HydraulikDB sheets joined on UWI in a single
+    pass.
+
+    Parameters
+    ----------
+    prepared : dict
+        sheet name: sheet prepared by the corresponding _PREPARE function.
+        Must contain the Verlauf, all other sheets are optional.
+    uwis : pd.Index
+        UWIs of the wells to create, must be in the Verlauf.
+
+    Returns
+    -------
+    list of Well
+
+    '''
+    d_wells = prepared['1a Verlauf'].loc[uwis]
+    
+    for sheet_name in _BUILD_SHEETS[1:]:
+        if sheet_name in prepared:
+            d = prepared[sheet_name]
+            
+            d_wells = d_wells.join(d, how = 'left')
+            d_wells['has_' + sheet_name] = d_wells.index.isin(d.index)
+        else:
+            #sheet not loaded (see LazyLoader)
+            d_wells['has_' + sheet_name] = False
+    
+    if '5a Produktivität' in prepared:
+        d_wells['ipr_measurement_depth'] = _ipr_measurement_depth(d_wells)
+    
+    wells = []
+    for uwi, row in zip(d_wells.index, d_wells.to_dict('records')):
+        well = Well(uwi = uwi, name = row['Bohrung'], 
+                    welltops = _welltops(row))
+        
+        if row['has_2a Temperatur']:
+            well.T_res = row['TRESmax']
+        if row['has_3a Potential']:
+            well.p_res = row['PRES_TR']
+        if row['has_8 Mineralisation']:
+            well.S = row['Mineralisation']
+        if row['has_5a Produktivität']:
+            well.ipr = _ipr(row)
+        if row['has_4d Hydraulik PTA']:
+            well.pta = _pta(row)
+            
+        wells.append(well)
+        
+    return wells
+
+def _welltops(row: dict) -> dict:
+    '''
+    welltops of a row of the Verlauf
+    '''
+    welltops = dict()
+    
+    if not pd.isna(row['GOK_mNN']):
+        welltops['surface'] = Welltop(name = 'surface',
+                                      z_MD = 0,
+                                      z_NN = row['GOK_mNN'])
+    
+    if not (pd.isna(row['Z1_mMD_TR']) and pd.isna(row['Z1_mTVD_TR'])):
+        welltops['top reservoir'] = Welltop(name = 'top reservoir',
+                                            z_MD = row['Z1_mMD_TR'],
+                                            z_TVD = row['Z1_mTVD_TR'],
+                                            x = row['X_TR'],
+                                            y = row['Y_TR'])
+    
+    if not (pd.isna(row['Z1_mMD_ET']) and pd.isna(row['Z1_mTVD_ET'])):
+        welltops['final depth'] = Welltop(name = 'final depth',
+                                          z_MD = row['Z1_mMD_ET'],
+                                          z_TVD = row['Z1_mTVD_ET'],
+                                          x = row['X_ET'],
+                                          y = row['Y_ET'])
+    return welltops
+
+def _ipr(row: dict) -> IPR:
+    '''
+    IPR of a row of the Produktivität sheet, including the measurement depth
+    '''
+    return IPR(b = row['b'],
+               c = row['c'],
+               range_certain = (row['Sicher'], row['certain_end']),
+               range_uncertain = (row['Unsicher'], row['uncertain_end']),
+               description = row['description'],
+               origin = row['origin'],
+               measurement_depth = row['ipr_measurement_depth'])
+
+def _pta(row: dict) -> PTA:
+    '''
+    PTA of a row of the PTA sheet
+    '''
+    return PTA(k = row['Permeabilität'],
+               phi = row['Porosität'],
+               aquifer_thickness = row['Mächtigkeit Auswertung'],
+               kh = row['Transmissibilität'],
+               Kh = row['Transmissivität'],
+               phih = row['Porosität x Mächtigkeit'],
+               Sc = row['Speicherkoeffizient'],
+               m_d_comp = row['M=D'],
+               skin = row['Skin/Skin0'])
+
+def _casing_design(cd: pd.DataFrame) -> CasingDesign:
+    '''
+    casing design of the (sorted) sections of one well
+    '''
+    return CasingDesign(ls = cd['Teufe von'] - cd['Teufe bis'],
+                        ids = cd.ID,
+                        ods = cd.OD,
+                        z_from = cd['Teufe von'].to_numpy(),
+                        z_to = cd['Teufe bis'].to_numpy(),
+                        wgs = cd['Wandstärke'],
+                        descr = cd.Sektion.to_numpy())
+
+#%% application of changed rows to existing wells
+# each function sets the data of the wells in update from the prepared sheet
+# d and resets the data of the wells in removed.
+
+def _apply_verlauf(wells, d, update, removed) -> None:
+    for uwi, row in zip(update, d.loc[update].to_dict('records')):
+        well = wells[uwi]
+        well.name = row['Bohrung']
+        
+        for name in ['surface', 'top reservoir', 'final depth']:
+            well.welltops.pop(name, None)
+        well.welltops.update(_welltops(row))
+
+def _apply_temperature(wells, d, update, removed) -> None:
+    _apply_attribute(wells, 'T_res', update, d.TRESmax.loc[update].to_numpy(),
+                     removed, None)
+    
+def _apply_potential(wells, d, update, removed) -> None:
+    _apply_attribute(wells, 'p_res', update, d.PRES_TR.loc[update].to_numpy(),
+                     removed, None)
+    
+def _apply_mineralisation(wells, d, update, removed) -> None:
+    _apply_attribute(wells, 'S', update, d.Mineralisation.loc[update].to_numpy(),
+                     removed, None)
+
+def _apply_ipr(wells, d, update, removed) -> None:
+    iprs = [_ipr(row) for row in d.loc[update].to_dict('records')]
+    _apply_attribute(wells, 'ipr', update, iprs, removed, IPR)
+
+def _apply_pta(wells, d, update, removed) -> None:
+    ptas = [_pta(row) for row in d.loc[update].to_dict('records')]
+    _apply_attribute(wells, 'pta', update, ptas, removed, PTA)
+    
+def _apply_casing_design(wells, d, update, removed) -> None:
+    groups = d.loc[update].groupby(level = 0, sort = False)
+    _apply_attribute(wells, 'casing_design', 
+                     [uwi for uwi, _ in groups],
+                     [_casing_design(cd) for _, cd in groups],
+                     removed, None)
+
+def _apply_attribute(wells: dict, attribute: str, uwis, values, 
+                     removed, default) -> None:
+    '''
+    sets an attribute of the wells in uwis to values and resets it for the 
+    removed wells. default is the reset value or a class to instantiate.
+    '''
+    for uwi, value in zip(uwis, values):
+        setattr(wells[uwi], attribute, value)
+        
+    for uwi in removed:
+        setattr(wells[uwi], attribute, 
+                default() if isinstance(default, type) else default)
+
+_APPLY = {'1a Verlauf':         _apply_verlauf,
+          '2a Temperatur':      _apply_temperature,
+          '3a Potential':       _apply_potential,
+          '8 Mineralisation':   _apply_mineralisation,
+          '5a Produktivität':   _apply_ipr,
+          '4d Hydraulik PTA':   _apply_pta,
+          '14 Casing Design':   _apply_casing_design}
+
+#%% derived values
+def _ipr_measurement_depth(d_wells: pd.DataFrame) -> np.ndarray:
+    '''
+    measurement depth of the IPR of each well, derived from the IPR 
+    description.
+
+    Parameters
+    ----------
+    d_wells : pd.DataFrame
+        IPR rows with the columns of the top reservoir (Z1_mMD_TR, 
+        Z1_mTVD_TR) of each well.
+
+    Returns
+    -------
+    np.ndarray
+        measurement depth [m MD], None if no description is available.
+
+    '''
+    description = d_wells.description.to_numpy()
+    is_str = np.array([isinstance(descr, str) for descr in description], 
+                      dtype = bool) #if not: nan
+    is_bds = np.array([is_str[i] and 'BDS' in descr 
+                       for i, descr in enumerate(description)], dtype = bool)
+    
+    #neglect distance from sensor to top reservoir
+    no_tr = is_bds & d_wells.Z1_mMD_TR.isna().to_numpy() & d_wells.Z1_mTVD_TR.isna().to_numpy()
+    if no_tr.any():
+        raise ValueError('no welltop found for top reservoir in well: '
+                         + d_wells.index[no_tr][0])
+    
+    depth = np.full(len(d_wells), None, dtype = object)
+    
+    #Attention: no esp intake depth is known form the data (TKP). 
+    # 700 m is just assumed.
+    depth[is_str] = 700
+    depth[is_bds] = d_wells.Z1_mMD_TR.to_numpy()[is_bds]
+    
+    return depth
+
+#%% helpers
+def _warn_unknown_uwis(sheet_name: str, uwis, known_uwis) -> None:
+    '''
+    warns if a sheet contains wells that are not in the field
+    '''
+    unknown = [uwi for uwi in uwis if uwi not in known_uwis]
+    if len(unknown) > 0:
+        warnings.warn('wells in sheet ' + sheet_name + ' not in field, '
+                      'ignored: ' + ', '.join(map(str, unknown)))
+        
+
+#%% sheet parsing (module level, so it can run in worker processes)
+_worker_workbook = None
+
+def _init_worker(data: bytes) -> None:
+    '''
+    opens the workbook once per worker process
+    '''
+    global _worker_workbook
+    _worker_workbook = _open_workbook(data)
+    
+def _parse_worker_sheet(sheet_name: str) -> tuple:
+    '''
+    parses a sheet in a worker process, returns the sheet and the parse time
+    '''
+    start = time.perf_counter()
+    d = _parse_sheet(_worker_workbook, sheet_name)
+    return d, time.perf_counter() - start
+
+def _open_workbook(data: bytes):
+    '''
+    opens a workbook read-only, formulas are read as their cached values
+    '''
+    return load_workbook(BytesIO(data), read_only = True, data_only = True)
+
+def _parse_sheet(workbook, sheet_name: str) -> pd.DataFrame:
+    '''
+    parses one sheet of the HydraulikDB. All rows are streamed from the 
+    sheet, the data ends at the last row with a filled key column (see 
+    HYDRAULIKDB_SHEETS), so the formatted but empty rows at the end of a 
+    sheet are dropped while rows after gaps are kept. The result 
+    corresponds to pd.read_excel with the correct nrows.
+
+    Parameters
+    ----------
+    workbook : openpyxl.Workbook
+        workbook opened in read-only mode.
+    sheet_name : str
+        sheet name, must be one of HYDRAULIKDB_SHEETS.
+
+    Returns
+    -------
+    d : pd.DataFrame
+
+    '''
+    params = HYDRAULIKDB_SHEETS[sheet_name]
+    na_values = _NA_VALUES.union(params.get('na_values', []))
+    
+    rows = workbook[sheet_name].iter_rows(values_only = True)
+    
+    for _ in range(params['header']):
+        next(rows, None)
+        
+    names = [_cell_value(value, na_values) for value in next(rows, ())]
+    columns = _column_names(names)
+    keys = [key if isinstance(key, int) else columns.index(key) 
+            for key in params['keys']]
+    
+    data = []
+    pending = [] #rows with empty keys, kept if more data follows
+    
+    for row in rows:
+        #fully empty rows are skipped (same as pd.read_excel)
+        if all([value is None for value in row]):
+            continue
+        
+        row = [_cell_value(value, na_values) for value in row]
+        if not any([value is not np.nan for value in row]):
+            continue
+        
+        if all([key >= len(row) or row[key] is np.nan for key in keys]):
+            pending.append(row)
+            continue
+        
+        data += pending
+        data.append(row)
+        pending = []
+    
+    #used extent: last column with a name or a value
+    width = max([_row_width(row) for row in data + [names]])
+    columns = _column_names(names[:width] + [np.nan] * (width - len(names)))
+    data = [row[:width] + [np.nan] * (width - len(row)) for row in data]
+    
+    d = pd.DataFrame(data, columns = columns).infer_objects()
+    
+    return d
+
+def _cell_value(value, na_values: set):
+    '''
+    converts a cell value the same way as pd.read_excel: empty cells and 
+    na_values are NaN, integral floats are int
+    '''
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        return np.nan if value in na_values else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _row_width(row: list) -> int:
+    '''
+    index of the last non-empty cell + 1
+    '''
+    for i in range(len(row), 0, -1):
+        if row[i - 1] is not np.nan:
+            return i
+    return 0
+
+def _column_names(names: list) -> list:
+    '''
+    column names as strings (same as pd.read_excel): empty names become 
+    'Unnamed: <position>', duplicates are numbered
+    '''
+    columns = []
+    for i, name in enumerate(names):
+        column = 'Unnamed: ' + str(i) if name is np.nan else str(name)
+        
+        base, n = column, 0
+        while column in columns:
+            n += 1
+            column = base + '.' + str(n)
+            
+        columns.append(column)
+        
+    return columns
+        
+
+#%% creation of well data from the tables of the SQLite store
+#sort order of the tables
+_SQLITE_ORDER = {'wells':           ['uwi'],
+                 'welltops':        ['uwi', 'name'],
+                 'ipr':             ['uwi'],
+                 'pta':             ['uwi'],
+                 'casing_sections': ['uwi', 'section'],
+                 'surveys':         ['uwi']}
+
+def _group_records(d: pd.DataFrame) -> dict:
+    '''
+    rows of a table as dicts, grouped by UWI
+    '''
+    groups = dict()
+    for row in d.to_dict('records'):
+        groups.setdefault(row['uwi'], []).append(row)
+    return groups
+
+def _group_frames(d: pd.DataFrame) -> dict:
+    '''
+    slices of a table sorted by UWI, one per UWI
+    '''
+    uwis = d.uwi.to_numpy()
+    starts = np.flatnonzero(np.r_[True, uwis[1:] != uwis[:-1]]) if len(d) > 0 else []
+    ends = list(starts[1:]) + [len(d)]
+    
+    return {uwis[start]: d.iloc[start:end] for start, end in zip(starts, ends)}
+
+def _sqlite_ipr(row: dict) -> IPR:
+    def _range(start, end):
+        if pd.isna(start) and pd.isna(end):
+            return None
+        return (start, end)
+    
+    return IPR(b = row['b'],
+               c = row['c'],
+               range_certain = _range(row['certain_start'], row['certain_end']),
+               range_uncertain = _range(row['uncertain_start'], row['uncertain_end']),
+               description = row['description'],
+               origin = row['origin'],
+               measurement_depth = row['measurement_depth'])
+
+def _sqlite_casing_design(d: pd.DataFrame) -> CasingDesign:
+    '''
+    casing design of the sections of one well, columns without any value 
+    are None
+    '''
+    columns = {column: (d[column].to_numpy() if d[column].notna().any() else None)
+               for column in SQLITE_CASING_COLUMNS}
+    
+    return CasingDesign(ls = columns['l'], ids = columns['id'], 
+                        ods = columns['od'], wgs = columns['wg'],
+                        z_from = columns['z_from'], z_to = columns['z_to'],
+                        descr = columns['descr'])
+
+
+#%% survey parsing (module level, so it can run in worker processes)
+#column names of survey files (lower case, without units)
+_SURVEY_COLUMNS = {'md':   ['md', 'dept', 'depth', 'measured depth', 'mdepth'],
+                   'incl': ['incl', 'inc', 'inclination', 'dev', 'devi'],
+                   'azim': ['azim', 'azi', 'azimuth', 'az', 'hazi'],
+                   'tvd':  ['tvd', 'true vertical depth']}
+
+def _file_signature(path) -> int:
+    '''
+    hash of path, size and mtime of a file
+    '''
+    stat = Path(path).stat()
+    return int(pd.util.hash_pandas_object(pd.Series([str(path), stat.st_size,
+                                                     stat.st_mtime_ns], 
+                                                    dtype = object),
+                                          index = False).sum())
+
+def _parse_survey_file(path, chunksize: int = 2**16) -> tuple:
+    '''
+    parses a survey file. The header is read line by line, the stations are
+    streamed in chunks into float arrays.
+
+    Parameters
+    ----------
+    path : str or Path
+        survey file, delimited text with a header row or LAS-style.
+    chunksize : int, optional
+        number of stations read at once. The default is 65536.
+
+    Returns
+    -------
+    md, incl, azim, tvd : np.array
+        stations sorted by MD. tvd is None if the file has no TVD column.
+
+    '''
+    with open(path, 'r', errors = 'replace') as f:
+        if Path(path).suffix.lower() == '.las':
+            names, sep, na_values = _read_las_header(f)
+        else:
+            names, sep, na_values = _read_survey_header(f)
+            
+        columns = _survey_columns(names, path)
+        usecols = [columns[key] for key in _SURVEY_COLUMNS if key in columns]
+        
+        chunks = [chunk.to_numpy(dtype = float) 
+                  for chunk in pd.read_csv(f, sep = sep, header = None, 
+                                           usecols = usecols, comment = '#',
+                                           na_values = na_values,
+                                           skipinitialspace = True,
+                                           chunksize = chunksize)]
+        
+    #usecols are returned in file order
+    stations = np.concatenate(chunks) if len(chunks) > 0 else np.empty((0, len(usecols)))
+    stations = stations[:, np.argsort(np.argsort(usecols))]
+    
+    stations = stations[~np.isnan(stations[:, 0])]
+    if np.any(np.diff(stations[:, 0]) < 0):
+        stations = stations[np.argsort(stations[:, 0], kind = 'stable')]
+        
+    tvd = stations[:, 3] if 'tvd' in columns else None
+    
+    return stations[:, 0], stations[:, 1], stations[:, 2], tvd
+
+def _read_survey_header(f) -> tuple:
+    '''
+    reads the header of a delimited survey file: comment lines (#), the 
+    header row and an optional row of units
+    '''
+    line = f.readline()
+    while line != '' and (line.strip() == '' or line.lstrip().startswith('#')):
+        line = f.readline()
+        
+    for sep in [';', ',', '\t']:
+        if sep in line:
+            break
+    else:
+        sep = r'\s+'
+        
+    names = [name.strip() for name in 
+             (line.split() if sep == r'\s+' else line.split(sep))]
+    
+    #skip a row of units
+    position = f.tell()
+    units = f.readline()
+    try:
+        float(units.replace(sep if sep != r'\s+' else ' ', ' ').split()[0])
+        f.seek(position)
+    except (ValueError, IndexError):
+        pass
+        
+    return names, sep, None
+
+def _read_las_header(f) -> tuple:
+    '''
+    reads the sections of a LAS-style file up to the ascii data (~A). 
+    Column names are the mnemonics of the curve section (~C), the null value
+    is taken from the well section (~W).
+    '''
+    names, na_values, section = [], None, None
+    
+    for line in f:
+        stripped = line.strip()
+        if stripped == '' or stripped.startswith('#'):
+            continue
+        if stripped.startswith('~'):
+            section = stripped[1].upper()
+            if section == 'A':
+                break
+            continue
+        
+        mnemonic, _, rest = stripped.partition('.')
+        if section == 'C':
+            names.append(mnemonic.strip())
+        elif section == 'W' and mnemonic.strip().upper() == 'NULL':
+            value = rest.split(':')[0].split()
+            if len(value) > 0:
+                na_values = [value[-1]]
+                
+    return names, r'\s+', na_values
+
+def _survey_columns(names: list, path) -> dict:
+    '''
+    position of the md, incl, azim and (optional) tvd column in a survey file
+    '''
+    #lower case, without units like "MD [m]" or "Incl (deg)"
+    names = [name.split('[')[0].split('(')[0].strip().lower() for name in names]
+    
+    columns = {}
+    for key, aliases in _SURVEY_COLUMNS.items():
+        for i, name in enumerate(names):
+            if name in aliases:
+                columns[key] = i
+                break
+        else:
+            if key != 'tvd':
+                raise ValueError('no ' + key + ' column in survey file ' + str(path))
             
-            self.field[i].casing_design = new_cd
\ No newline at end of file
+    return columns
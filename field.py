@@ -6,11 +6,19 @@ Created on Sun Oct  9 16:20:41 2022
 @author: mischasch
 """
 #third party imports
+import copy
+import numbers
+import numpy as np
 import pandas as pd
 from collections.abc import Iterable
+from types import MappingProxyType
 
 #local application import
 from resy.well import Well
+from resy.welltop import Welltop
+from resy.hydraulic_characterisation import IPR
+from resy.property_store import PropertyStore
+from resy.query import Predicate, Property, parse
 from resy.plotter.FieldPlotter import *
 from resy.summarizer.FieldSummarizer import *
 
@@ -18,7 +26,7 @@ class Field():
     '''
     A field contains a number of wells.
     '''
-    def __init__(self, name = None, wells = None):
+    def __init__(self, name = None, wells = None, columnar = False):
         '''
         
 
@@ -28,25 +36,45 @@ class Field():
             field name.
         wells : array of wells
             all the wells in the field.
+        columnar : bool, optional
+            if True, the scalar properties of the wells are kept in a 
+            columnar store (see columnar). The default is False.
 
         '''
         self.name = name
         
+        #columnar store of the well properties, None if not columnar
+        self._store = PropertyStore() if columnar else None
+        
+        #changes whenever wells are added or removed, so views of the field
+        #know when to update the rows of their wells (see FieldView)
+        self._version = 0
+        
+        #cached regressions (see regress)
+        self._fits = dict()
+        
+        #trend of p_res with depth, updated when wells are added or removed
+        #(see fit_pressure_trend)
+        self._pressure_trend = None
+        
         self.wells = wells if wells is not None else []
+        
+        #content hashes of the database rows per sheet and UWI, as of the 
+        #last refresh_from_database (see resy.data_loader)
+        self._row_hashes = dict()
     
     def __getitem__(self, index):
         '''
         returns the well if in list, else False.
         Identify a well by its UWI.
         '''
-        if index not in self.uwis:
-            return False
-        else:
-            getwell = None
-            for well in self.wells:
-                if well.uwi == index:
-                    getwell = well
-            return getwell
+        return self._by_uwi.get(index, False)
+    
+    def __contains__(self, uwi) -> bool:
+        return uwi in self._by_uwi
+    
+    def __len__(self) -> int:
+        return len(self._wells)
     
     def __setitem___(self, index, newwell):
         '''
@@ -68,6 +96,11 @@ class Field():
     #array of all wells
     @property
     def wells(self):
+        '''
+        list of all wells. Use add_wells and remove_wells to change the wells
+        of the field, so the indices stay up to date.
+        
+        '''
         return self._wells
     
     @wells.setter
@@ -81,14 +114,77 @@ class Field():
                     if not isinstance(welli, Well):
                         raise ValueError('not all wells are of type well')
         
-        self._wells = new_wells
+        for well in getattr(self, '_wells', []):
+            well._fields.remove(self)
+            if self._store is not None:
+                well._detach()
+                
+        if self._pressure_trend is not None:
+            self._pressure_trend.remove(self.uwis)
+                
+        if self._store is not None:
+            self._store = PropertyStore()
+            
+        self._wells = []
+        self._by_uwi = dict()
+        self._by_name = dict()
+        self._version += 1
+        
+        if new_wells is not None:
+            self.add_wells(new_wells)
     
     @property
     def uwis(self):
-        if self.wells is not None:
-            return [well.uwi for well in self.wells]
+        return [well.uwi for well in self._wells]
+    
+    @property
+    def wells_by_uwi(self):
+        '''
+        read-only mapping UWI: well
+        
+        '''
+        return MappingProxyType(self._by_uwi)
+    
+    @property
+    def pressure_trend(self):
+        '''
+        trend of the reservoir pressure with depth that gives p_regr of the
+        wells, None if not fitted (see fit_pressure_trend)
+        
+        '''
+        return self._pressure_trend
+    
+    @property
+    def columnar(self) -> bool:
+        '''
+        if True, the scalar properties of the wells (name, T_res, p_res, S, 
+        k, z_ESP, welltype, IPR b and c and the welltop depths and 
+        coordinates) are kept in a columnar store: one numpy array per 
+        property, one row per well. The wells remain the interface to their
+        properties, but field-wide properties can be read as arrays without 
+        visiting every well (see column and to_frame).
+        
+        A well can only be in one columnar field.
+        
+        '''
+        return self._store is not None
+    
+    @columnar.setter
+    def columnar(self, columnar):
+        if columnar == self.columnar:
+            return
+        
+        if columnar:
+            for well in self._wells:
+                if well._store is not None:
+                    raise ValueError('Well ' + str(well.uwi) + ' is already '
+                                     'in another columnar field')
+            self._store = PropertyStore()
+            self._attach(self._wells)
         else:
-            return []
+            for well in self._wells:
+                well._detach()
+            self._store = None
             
 # =============================================================================
 #Methods
@@ -104,11 +200,47 @@ class Field():
             well.
 
         '''
-        #type check
-        if not isinstance(new_well, Well):
-            raise ValueError('well must be of type well')
+        self.add_wells([new_well])
+        
+    def add_wells(self, new_wells) -> None:
+        '''
+        adds several wells to the field
+
+        Parameters
+        ----------
+        new_wells : list of Well
+            wells to add. UWIs must be unique and not in the field yet.
+
+        '''
+        new_wells = list(new_wells)
+        
+        #check all wells before adding any
+        uwis = set()
+        for new_well in new_wells:
+            #type check
+            if not isinstance(new_well, Well):
+                raise ValueError('well must be of type well')
+            if new_well.uwi in self._by_uwi or new_well.uwi in uwis:
+                raise ValueError('Well ' + str(new_well.uwi) + ' already in field')
+            if self._store is not None and new_well._store is not None:
+                raise ValueError('Well ' + str(new_well.uwi) + ' is already '
+                                 'in another columnar field')
+            uwis.add(new_well.uwi)
+        
+        for new_well in new_wells:
+            self._wells.append(new_well)
+            self._by_uwi[new_well.uwi] = new_well
+            self._by_name.setdefault(new_well.name, []).append(new_well)
+            new_well._fields.append(self)
+            
+        if self._store is not None:
+            self._attach(new_wells)
             
-        self._wells.append(new_well)
+        self._version += 1
+        
+        if self._pressure_trend is not None:
+            self._pressure_trend.add(self, new_wells)
+            self._assign_p_regr()
         
     def remove_wells(self, uwis):
         '''
@@ -121,22 +253,244 @@ class Field():
         #make array if only one value provided
         if isinstance(uwis, str):
             uwis = [uwis]
+            
+        for uwi in uwis:
+            if uwi not in self._by_uwi:
+                raise ValueError('Well ' + str(uwi) + ' not in field')
         
-        #remve wells
+        removed = set()
         for uwi in uwis:
-            if uwi not in self.uwis:
-                raise ValueError('Well ' + uwi + ' not in field')
-            else:
-                self.wells.remove(self[uwi])
+            well = self._by_uwi.pop(uwi, None)
+            if well is None: #duplicate in uwis
+                continue
+            
+            removed.add(id(well))
+            well._fields.remove(self)
+            
+            same_name = self._by_name[well.name]
+            same_name.remove(well)
+            if len(same_name) == 0:
+                del self._by_name[well.name]
+                
+            if self._store is not None:
+                well._detach()
+        
+        keep = np.array([id(well) not in removed for well in self._wells], 
+                        dtype = bool)
+        self._wells = [well for well in self._wells if id(well) not in removed]
+        
+        if self._store is not None:
+            self._store.compact(keep)
+            for row, well in enumerate(self._wells):
+                well._move(row)
+                
+        self._version += 1
+        
+        if self._pressure_trend is not None:
+            self._pressure_trend.remove(uwis)
+            self._assign_p_regr()
+        
+    def get_well_by_name(self, name):
+        '''
+        returns the well with a name, else False. If several wells have the
+        same name, the first one added to the field is returned.
+
+        Parameters
+        ----------
+        name : str
+            well name.
+
+        '''
+        wells = self._by_name.get(name)
+        
+        return wells[0] if wells else False
+    
+    def clone(self):
+        '''
+        copy of the field for scenario analysis, with clones of all wells 
+        (see resy.well.Well.clone). The store of a columnar field is copied
+        at once.
+
+        Returns
+        -------
+        Field
+
+        '''
+        new = Field(self.name)
         
-    def refresh_from_database(self, wells = None, do_hydraulik_db = True, do_welltops = True, do_survey = True, do_casing_design = True):
+        if self._store is not None:
+            new._store = self._store.copy()
+        new._wells = [well._clone(new._store, row) 
+                      for row, well in enumerate(self._wells)]
+        
+        for well in new._wells:
+            new._by_uwi[well.uwi] = well
+            new._by_name.setdefault(well.name, []).append(well)
+            well._fields.append(new)
+                
+        new._version = self._version
+        #the cached regressions stay valid, they are checked against the
+        #fingerprint of their inputs before use (see regress)
+        new._fits = dict(self._fits)
+        new._pressure_trend = copy.deepcopy(self._pressure_trend)
+        new._row_hashes = dict(self._row_hashes)
+        
+        return new
+    
+    def column(self, name: str) -> np.ndarray:
+        '''
+        values of a property for all wells, in the order of wells. 
+        
+        For columnar fields, the array is a read-only view of the store, 
+        no well is visited. Else, the values are collected from the wells.
+
+        Parameters
+        ----------
+        name : str
+            property of the wells, e.g. 'T_res', of their IPR, e.g. 'ipr.b',
+            or of a welltop, e.g. 'welltops.top reservoir.z_TVD'.
+
+        Returns
+        -------
+        np.ndarray
+            float array (missing values as NaN) for numeric properties, else
+            object array (missing values as None).
+
+        '''
+        if self._store is None or not _stored(name):
+            return _column(self._wells, name)
+        
+        #load the sheet of the property if loaded lazily (all wells share
+        #the loader)
+        if len(self._wells) > 0:
+            self._wells[0]._load_lazy(name.split('.')[0])
+            
+        return self._store.column(name)
+    
+    def where(self, predicate = None, **values):
+        '''
+        selects wells by conditions on their properties. Conditions are 
+        evaluated for all wells at once, as vectorized masks over the 
+        property columns (see column), which is fastest for columnar fields.
+        
+        Examples:
+            field.where("welltype == 'prod' and T_res > 120")
+            field.where(Property('T_res') > 120, welltype = 'prod')
+            field.where(has_welltop('top reservoir'))
+            
+        (Property and has_welltop are in resy.query)
+
+        Parameters
+        ----------
+        predicate : resy.query.Predicate, str or array of bool, optional
+            condition the wells have to fulfill: a predicate, a query string
+            (see query) or a mask with one value per well. The default is 
+            None (all wells).
+        **values : 
+            property: value, selects wells with these property values.
+
+        Returns
+        -------
+        FieldView
+            the selected wells. The wells are not copied.
+
+        '''
+        return FieldView(self, rows = _select(self, predicate, values))
+    
+    def query(self, expression: str, **variables):
+        '''
+        selects wells by a query string, e.g. 
+        "welltype == 'prod' and T_res > 120" or "'top reservoir' in welltops"
+        (see resy.query.parse for the syntax). The string is parsed, not 
+        evaluated.
+
+        Parameters
+        ----------
+        expression : str
+            query string.
+        **variables : 
+            values of other names used in the query, e.g. 
+            field.query('T_res > T_min', T_min = 120).
+
+        Returns
+        -------
+        FieldView
+            the selected wells.
+
+        '''
+        return self.where(parse(expression, variables))
+    
+    def view(self, uwis):
+        '''
+        read-only view of wells by UWI. Costs time and memory proportional to
+        the number of selected wells, the wells are not copied.
+
+        Parameters
+        ----------
+        uwis : str or list of str
+            UWIs of the wells, in the order of the view.
+
+        Returns
+        -------
+        FieldView
+
+        '''
+        return _view(self, uwis)
+    
+    def to_frame(self, columns: list = None) -> pd.DataFrame:
+        '''
+        properties of all wells as a table
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            properties (see column). The default is None (all stored 
+            properties).
+
+        Returns
+        -------
+        pd.DataFrame
+            one row per well, indexed by UWI.
+
+        '''
+        return _frame(self, self._store, columns)
+    
+    def _attach(self, wells: list) -> None:
+        '''
+        appends the wells to the property store
+        '''
+        first = self._store.append(len(wells))
+        for i, well in enumerate(wells):
+            well._attach(self._store, first + i)
+    
+    def _rename(self, well, attribute: str, old) -> None:
+        '''
+        updates the indices after the UWI or name of a well changed 
+        (called by Well)
+        '''
+        if attribute == 'uwi':
+            del self._by_uwi[old]
+            self._by_uwi[well.uwi] = well
+            
+        elif attribute == 'name':
+            same_name = self._by_name[old]
+            same_name.remove(well)
+            if len(same_name) == 0:
+                del self._by_name[old]
+            self._by_name.setdefault(well.name, []).append(well)
+        
+    def refresh_from_database(self, wells = None, do_hydraulik_db = True, do_welltops = True, do_survey = True, do_casing_design = True, incremental = True, lazy = False, instrumentation = None):
         '''
         Refreshes / obtains well data from the common database. This function is hardcoded and requires a correctly formatted input file.
+        
+        Refreshes are incremental: only database rows that changed, were 
+        added or were removed since the previous refresh are applied to the
+        wells.
 
         Parameters
         ----------
         wells: list of strings, optional
-            names of wells to refresh. If not set, all wells will be refreshed
+            UWIs of wells to refresh. If not set, all wells will be refreshed
         do_pres : bool, optional
             DESCRIPTION. The default is True.
         do_Tres : bool, optional
@@ -144,55 +498,216 @@ class Field():
         do_welltops : bool, optional
             DESCRIPTION. The default is True.
         do_survey : bool, optional
-            DESCRIPTION. The default is True.
+            load the surveys from the directory set with the surveys keyword
+            of the config.ini (skipped if not set). The default is True.
         do_casing_design : bool, optional
             DESCRIPTION. The default is True.
+        incremental : bool, optional
+            if False, all rows are applied, regardless whether they changed. 
+            The default is True.
+        lazy : bool, optional
+            if True, only the wells and welltops are loaded now. Every other
+            sheet is loaded on first access of a well attribute stored in it
+            (e.g. Well.ipr loads the IPR of all wells). The default is False.
+        instrumentation : resy.instrumentation.Instrumentation, optional
+            collects timings and row counts of all loaded sheets (e.g. with
+            a MemorySink). The default is an Instrumentation with the default
+            sinks.
 
         Returns
         -------
-        None.
+        changes : pd.DataFrame
+            applied changes with columns 'sheet', 'UWI' and 'change' 
+            ('added', 'changed' or 'removed'). Does not contain the changes
+            of sheets that are loaded lazily.
 
         '''
+        #import here to avoid circular import
+        from resy.data_loader import (HydraulikDBLoader, CasingDesignLoader,
+                                      LazyLoader, SurveyLoader)
+        from resy.config import config
+        from resy.instrumentation import Instrumentation
+        
+        #sheets are parsed once for all loaders, so they share the statistics
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        
+        loaders = []
         if do_hydraulik_db:
-            from resy.data_loader import HydraulikDBLoader #import here to avoid circular import 
-            HydraulikDBLoader(self).load()
+            loaders.append(HydraulikDBLoader(self, instrumentation = instrumentation))
             
         if do_welltops: 
             #TODO
             pass
-        if do_survey:
-            #TODO
-            pass
         if do_casing_design:
-            from resy.data_loader import CasingDesignLoader
-            CasingDesignLoader(self).load()
+            loaders.append(CasingDesignLoader(self, instrumentation = instrumentation))
+            
+        if not incremental:
+            self._row_hashes = dict()
+            
+        sheets = [sheet for loader in loaders for sheet in loader.sheets]
+        
+        #lazy: only the Verlauf is loaded now, as it creates the wells
+        load_now = [sheet for sheet in sheets 
+                    if not lazy or sheet == '1a Verlauf']
+            
+        changes = [pd.DataFrame(columns = ['sheet', 'UWI', 'change'])]
+            
+        if len(load_now) > 0:
+            #open the workbook once and parse all required sheets together
+            frames = loaders[0].read_sheets(load_now)
+            for loader in loaders:
+                loader_sheets = [sheet for sheet in loader.sheets 
+                                 if sheet in load_now]
+                if len(loader_sheets) > 0:
+                    changes.append(loader.load(frames, wells = wells,
+                                               sheets = loader_sheets))
+                    
+        lazy_loader = None
+        if lazy:
+            lazy_loader = LazyLoader(loaders, [sheet for sheet in sheets 
+                                               if sheet not in load_now],
+                                     wells = wells)
+        for well in self.wells:
+            well._lazy = lazy_loader
+            
+        #surveys are only loaded if a survey directory is configured
+        if do_survey and config.has_option('DataLoader', 'surveys'):
+            changes.append(SurveyLoader(self, instrumentation = instrumentation)
+                           .load(wells = wells))
+                
+        return pd.concat(changes, ignore_index = True)
+        
+    def save_snapshot(self, path) -> None:
+        '''
+        saves the field to a binary snapshot file (see resy.snapshot). 
+        Survey and casing arrays are stored as raw arrays, so loading the 
+        snapshot maps them instead of copying.
+
+        Parameters
+        ----------
+        path : str or Path
+            path of the snapshot file.
+
+        '''
+        #import here to avoid circular import
+        from resy.snapshot import write_snapshot
+        
+        write_snapshot(self, path)
         
-    def compute_distances_welltop(self, welltop_name):
+    @classmethod
+    def load_snapshot(cls, path, mmap: bool = True):
+        '''
+        loads a field from a snapshot file written by save_snapshot.
+
+        Parameters
+        ----------
+        path : str or Path
+            path of the snapshot file.
+        mmap : bool, optional
+            if True, the survey and casing arrays are memory-mapped 
+            (copy on write) instead of read. The default is True.
+
+        Returns
+        -------
+        Field
+
+        '''
+        from resy.snapshot import read_snapshot
+        
+        return read_snapshot(path, mmap = mmap)
+        
+    def compute_distances_welltop(self, welltop_name, horizontal: bool = False):
         '''
         computes a distance matrix of a welltop in all wells where the welltop is present.
+        Distances are computed from the x, y and z_TVD coordinates of the 
+        welltops. Wells without coordinates are ignored.
 
         Parameters
         ----------
         welltop_name : string
-            DESCRIPTION.
+            welltop, e.g. 'top reservoir'.
+        horizontal : bool, optional
+            if True, horizontal distances (x and y only). The default is 
+            False.
 
         Returns
         -------
         d : pd.DataFrame
-            Row and column headers are all eligible wells, cell values is distance [m].
+            Row and column headers are the UWIs of all eligible wells, cell values is distance [m].
 
         '''
-        wells_with_welltop = [] #names of well that contain this welltop
-        
-        for well in self.wells:
-            if welltop_name in well.welltops:
-                wells_with_welltop.append(well.name)
-                
-        d = pd.DataFrame(index = wells_with_welltop, columns = wells_with_welltop)
-        
-        #TODO: compute distances
+        return self.welltop_index(welltop_name, horizontal = horizontal).distances()
+    
+    def welltop_index(self, welltop_name, horizontal: bool = False):
+        '''
+        spatial index (KD-tree) of the penetrations of a welltop, for 
+        repeated nearest neighbour and radius queries (see 
+        resy.spatial.WelltopIndex). The index is a snapshot: build a new 
+        one after the wells or welltops changed.
+
+        Parameters
+        ----------
+        welltop_name : string
+            welltop, e.g. 'top reservoir'.
+        horizontal : bool, optional
+            if True, only x and y are indexed. The default is False.
+
+        Returns
+        -------
+        resy.spatial.WelltopIndex
+
+        '''
+        #import here to avoid circular import
+        from resy.spatial import WelltopIndex
         
-        return d
+        return WelltopIndex(self, welltop_name, horizontal = horizontal)
+    
+    def nearest_wells(self, uwi, welltop_name, k: int = 1, horizontal: bool = False):
+        '''
+        the k wells whose welltop is nearest to the welltop of a well
+
+        Parameters
+        ----------
+        uwi : str
+            UWI of the well.
+        welltop_name : string
+            welltop, e.g. 'top reservoir'.
+        k : int, optional
+            number of wells. The default is 1.
+        horizontal : bool, optional
+            if True, horizontal distances. The default is False.
+
+        Returns
+        -------
+        pd.Series
+            distances [m] by UWI, nearest first.
+
+        '''
+        return self.welltop_index(welltop_name, horizontal = horizontal).nearest(uwi, k = k)
+    
+    def wells_within(self, point, r: float, welltop_name, horizontal: bool = False):
+        '''
+        all wells whose welltop is within a distance of a point
+
+        Parameters
+        ----------
+        point : array of float
+            (x, y, z_TVD), or (x, y) if horizontal [m].
+        r : float
+            distance [m].
+        welltop_name : string
+            welltop, e.g. 'top reservoir'.
+        horizontal : bool, optional
+            if True, horizontal distances. The default is False.
+
+        Returns
+        -------
+        pd.Series
+            distances [m] by UWI, nearest first.
+
+        '''
+        return self.welltop_index(welltop_name, horizontal = horizontal).within(point, r)
     
     def plot_mpl(self, plottype, plotwells = None, savepath: str = None, **kwargs):
         '''
@@ -256,20 +771,486 @@ class Field():
         
         return summarizer.summarize()
     
-    def correlate(variables):
+    def correlate(self, variables, method: str = 'pearson') -> pd.DataFrame:
         '''
-        correlate two variables across all field wells
+        correlate variables across all field wells. All coefficients are 
+        computed at once from the property columns. Missing values are 
+        masked pairwise (every coefficient uses the wells where both 
+        variables are set).
 
         Parameters
         ----------
         variables : array
-            array containing the variable names that should be correlated.
-            To date, exactly two variables are accepted.
+            array containing the variable names that should be correlated,
+            e.g. ['p_res', 'T_res', 'welltops.top reservoir.z_TVD'] (see 
+            column).
+        method : str, optional
+            'pearson' (linear), 'spearman' or 'kendall' (rank correlations).
+            The default is 'pearson'.
+
+        Returns
+        -------
+        pd.DataFrame
+            correlation matrix, rows and columns are the variables.
+
+        '''
+        #import here to avoid circular import
+        from resy.field_statistics import correlation_matrix, numeric
+        
+        X = np.column_stack([numeric(self.column(name), name) for name in variables]
+                            if len(variables) > 0 else np.empty((len(self), 0)))
+        
+        return pd.DataFrame(correlation_matrix(X, method = method),
+                            index = list(variables), columns = list(variables))
+    
+    def regress(self, y: str, x, robust: bool = False):
+        '''
+        linear regression of a property on one or several other properties 
+        across all field wells with all properties set, e.g. p_res against
+        the top reservoir depth:
+            field.regress('p_res', 'welltops.top reservoir.z_TVD')
+            
+        Fits are cached. A cached fit is reused as long as the wells and 
+        their values of y and x are unchanged.
+
+        Parameters
+        ----------
+        y : str
+            dependent property (see column).
+        x : str or list of str
+            predictors.
+        robust : bool, optional
+            if True, Huber regression (iteratively reweighted), which is 
+            insensitive to outliers. The default is False (least squares).
+
+        Returns
+        -------
+        resy.field_statistics.Regression
+
+        '''
+        #import here to avoid circular import
+        from resy.field_statistics import Regression, numeric, fingerprint
+        
+        x = [x] if isinstance(x, str) else list(x)
+        
+        uwis = self.uwis
+        columns = [numeric(self.column(name), name) for name in [y] + x]
+        
+        key = (y, tuple(x), robust)
+        inputs = fingerprint(uwis, columns)
+        if key in self._fits and self._fits[key][0] == inputs:
+            return self._fits[key][1]
+        
+        values = np.column_stack(columns)
+        use = np.isfinite(values).all(axis = 1)
+        
+        regression = Regression(y, x, robust, np.array(uwis, dtype = object)[use],
+                                values[use, 0], values[use, 1:])
+        self._fits[key] = (inputs, regression)
+        
+        return regression
+    
+    def ipr_matrix(self, q):
+        '''
+        drawdowns of the IPRs of all wells at flow rates, computed for all 
+        wells and rates at once, with masks of the certain and uncertain
+        flow rate ranges. A missing coefficient (b or c) is 0, wells 
+        without IPR coefficients have NaN drawdowns.
+
+        Parameters
+        ----------
+        q : float or array of float
+            flow rates [l/s].
+
+        Returns
+        -------
+        resy.hydraulic_characterisation.IPRMatrix
+            wells x rates.
+
+        '''
+        #import here to avoid circular import
+        from resy.field_statistics import numeric
+        from resy.hydraulic_characterisation import IPRMatrix
+        
+        wells = self.wells
+        
+        return IPRMatrix(self.uwis, q, numeric(self.column('ipr.b'), 'ipr.b'),
+                         numeric(self.column('ipr.c'), 'ipr.c'),
+                         [_property(well, 'ipr.range_certain') for well in wells],
+                         [_property(well, 'ipr.range_uncertain') for well in wells])
+    
+    def rate_at_drawdown(self, dp) -> pd.Series:
+        '''
+        flow rates at which the IPRs of all wells reach a drawdown, solved
+        in closed form for all wells at once (see 
+        resy.hydraulic_characterisation.rate_at_drawdown)
+
+        Parameters
+        ----------
+        dp : float or array of float
+            allowed drawdown [bar], for all wells or one value per well.
+
+        Returns
+        -------
+        pd.Series
+            flow rates [l/s] by UWI, NaN where the drawdown is not reached 
+            or the well has no IPR coefficients.
+
+        '''
+        #import here to avoid circular import
+        from resy.field_statistics import numeric
+        from resy.hydraulic_characterisation import rate_at_drawdown, coefficients
+        
+        b, c = coefficients(numeric(self.column('ipr.b'), 'ipr.b'),
+                            numeric(self.column('ipr.c'), 'ipr.c'))
+        
+        return pd.Series(rate_at_drawdown(b, c, dp),
+                         index = pd.Index(self.uwis, name = 'UWI', dtype = object), 
+                         name = 'q')
+    
+    def fit_pressure_trend(self, method: str = 'linear', compartments = None, 
+                           clip: float = 3., welltop: str = 'top reservoir',
+                           depth: str = 'z_TVD'):
+        '''
+        fits the trend of the reservoir pressure with the depth of the top
+        reservoir across all wells (optionally per compartment) and sets 
+        p_regr of all wells to the pressure of the trend at their top 
+        reservoir.
+        
+        The trend is updated when wells are added to or removed from the
+        field, without refitting (see resy.field_statistics.PressureTrend).
+        Call fit_pressure_trend again after changing p_res or depths.
+
+        Parameters
+        ----------
+        method : str, optional
+            'linear' (least squares), 'huber' (robust) or 'clip' (least 
+            squares with iterative outlier rejection). The default is 
+            'linear'.
+        compartments : str or dict, optional
+            property giving the compartment of a well, or dict UWI: 
+            compartment, for one trend per compartment. The default is None 
+            (one trend for the field).
+        clip : float, optional
+            outlier threshold of the 'clip' method [standard deviations]. 
+            The default is 3.
+        welltop : str, optional
+            The default is 'top reservoir'.
+        depth : str, optional
+            'z_TVD' or 'z_NN'. The default is 'z_TVD'.
+
+        Returns
+        -------
+        resy.field_statistics.PressureTrend
+
+        '''
+        #import here to avoid circular import
+        from resy.field_statistics import PressureTrend
+        
+        trend = PressureTrend(method = method, compartments = compartments, 
+                              clip = clip, welltop = welltop, depth = depth)
+        trend.fit(self)
+        
+        self._pressure_trend = trend
+        self._assign_p_regr()
+        
+        return trend
+    
+    def _assign_p_regr(self) -> None:
+        '''
+        sets p_regr of all wells from the pressure trend, in one step for 
+        columnar fields
+        '''
+        p_regr = self._pressure_trend.p_regr(self)
+        
+        if self._store is not None:
+            self._store.set_column('p_regr', p_regr)
+            return
+        
+        for well, value in zip(self._wells, p_regr.tolist()):
+            well.p_regr = None if np.isnan(value) else value
+        
+def _stored(name: str) -> bool:
+    '''
+    True if a property is kept in the property store of columnar fields
+    '''
+    if name.startswith('ipr.'):
+        return name[len('ipr.'):] in IPR._stored
+    if name.startswith('welltops.'):
+        return name.rsplit('.', 1)[-1] in Welltop._stored
+    return name in Well._stored
+        
+def _property(well: Well, name: str):
+    '''
+    value of a property of a well (see Field.column), None if not set
+    '''
+    obj = well
+    if name.startswith('ipr.'):
+        obj, name = well.ipr, name[len('ipr.'):]
+    elif name.startswith('welltops.'):
+        welltop_name, name = name[len('welltops.'):].rsplit('.', 1)
+        obj = well.welltops.get(welltop_name)
+        
+    return getattr(obj, name, None) if obj is not None else None
+        
+class FieldView():
+    '''
+    read-only selection of wells of a field, e.g. returned by Field.where or
+    Field.view. The view references the wells of the field, nothing is 
+    copied, so creating a view costs time and memory proportional to the
+    number of selected wells. Wells can't be added to or removed from a 
+    view; wells removed from the field are removed from the view as well. 
+    The wells themselves are the wells of the field, changing them changes
+    the field.
+    
+    Views can be used wherever a field is read, e.g. by plotters and 
+    summarizers.
+    '''
+    def __init__(self, field: Field, rows = None, wells: list = None):
+        '''
+        
+
+        Parameters
+        ----------
+        field : Field
+            field the wells are selected from.
+        rows : array of int, optional
+            positions of the selected wells in field.wells.
+        wells : list of Well, optional
+            selected wells, if rows are not given.
 
         Returns
         -------
         None.
 
         '''
-        #TODO
-    
\ No newline at end of file
+        self.field = field
+        
+        if rows is not None:
+            rows = np.asarray(rows, dtype = np.intp)
+            wells = [field._wells[row] for row in rows]
+            
+        self._wells = tuple(wells if wells is not None else [])
+        self._version = field._version
+        
+        #positions in field.wells and index by UWI, created on first use
+        self._rows = rows
+        self._by_uwi = None
+        self._fits = dict()
+        
+    def __getitem__(self, index):
+        '''
+        returns the well if in the view, else False.
+        Identify a well by its UWI.
+        '''
+        self._update()
+        if self._by_uwi is None:
+            self._by_uwi = {well.uwi: well for well in self._wells}
+            
+        return self._by_uwi.get(index, False)
+    
+    def __contains__(self, uwi) -> bool:
+        return self[uwi] is not False
+    
+    def __len__(self) -> int:
+        self._update()
+        return len(self._wells)
+        
+    @property
+    def name(self):
+        return self.field.name
+    
+    @property
+    def wells(self) -> tuple:
+        '''
+        the selected wells
+        
+        '''
+        self._update()
+        return self._wells
+    
+    @property
+    def uwis(self):
+        return [well.uwi for well in self.wells]
+    
+    @property
+    def columnar(self) -> bool:
+        return self.field.columnar
+    
+    def add_well(self, new_well):
+        raise ValueError('field views are read-only, add wells to the field')
+        
+    def add_wells(self, new_wells):
+        raise ValueError('field views are read-only, add wells to the field')
+        
+    def remove_wells(self, uwis):
+        raise ValueError('field views are read-only, remove wells from the field')
+        
+    def get_well_by_name(self, name):
+        '''
+        returns the first selected well with a name, else False
+        
+        '''
+        for well in self.wells:
+            if well.name == name:
+                return well
+        return False
+    
+    def column(self, name: str) -> np.ndarray:
+        '''
+        values of a property for the selected wells (see Field.column)
+        
+        '''
+        self._update()
+        
+        if self.field.columnar and _stored(name):
+            return self.field.column(name)[self._get_rows()]
+        
+        return _column(self._wells, name)
+    
+    def where(self, predicate = None, **values):
+        '''
+        selects wells of the view (see Field.where)
+
+        '''
+        selected = _select(self, predicate, values)
+        
+        return FieldView(self.field, 
+                         rows = None if self._rows is None else self._rows[selected],
+                         wells = [self._wells[i] for i in selected])
+    
+    def query(self, expression: str, **variables):
+        '''
+        selects wells of the view by a query string (see Field.query)
+
+        '''
+        return self.where(parse(expression, variables))
+    
+    def view(self, uwis):
+        '''
+        view of some wells of the view by UWI (see Field.view)
+
+        '''
+        return _view(self, uwis)
+    
+    def to_frame(self, columns: list = None) -> pd.DataFrame:
+        '''
+        properties of the selected wells as a table (see Field.to_frame)
+
+        '''
+        return _frame(self, self.field._store, columns)
+    
+    #plotting, summaries, spatial queries and statistics work on views like
+    #on fields
+    plot_mpl = Field.plot_mpl
+    summary = Field.summary
+    compute_distances_welltop = Field.compute_distances_welltop
+    welltop_index = Field.welltop_index
+    nearest_wells = Field.nearest_wells
+    wells_within = Field.wells_within
+    correlate = Field.correlate
+    regress = Field.regress
+    ipr_matrix = Field.ipr_matrix
+    rate_at_drawdown = Field.rate_at_drawdown
+        
+    def _get_rows(self) -> np.ndarray:
+        '''
+        positions of the selected wells in field.wells
+        '''
+        if self._rows is None:
+            rows = {id(well): row for row, well in enumerate(self.field._wells)}
+            self._rows = np.array([rows[id(well)] for well in self._wells], 
+                                  dtype = np.intp)
+        return self._rows
+        
+    def _update(self) -> None:
+        '''
+        drops wells that were removed from the field since the view was 
+        created
+        '''
+        if self._version == self.field._version:
+            return
+        
+        by_uwi = self.field._by_uwi
+        self._wells = tuple([well for well in self._wells 
+                             if by_uwi.get(well.uwi) is well])
+        self._rows = None
+        self._by_uwi = None
+        self._version = self.field._version
+        
+def _view(wells, uwis) -> FieldView:
+    '''
+    view of the wells of a field or view with UWIs (see Field.view)
+    '''
+    if isinstance(uwis, str):
+        uwis = [uwis]
+        
+    selected = []
+    for uwi in dict.fromkeys(uwis):
+        well = wells[uwi]
+        if well is False:
+            raise ValueError('Well ' + str(uwi) + ' not in field')
+        selected.append(well)
+        
+    field = wells.field if isinstance(wells, FieldView) else wells
+    
+    return FieldView(field, wells = selected)
+        
+def _select(wells, predicate, values: dict) -> np.ndarray:
+    '''
+    positions of the wells of a field or view that fulfill a predicate and
+    have the property values (see Field.where)
+    '''
+    if isinstance(predicate, str):
+        predicate = parse(predicate)
+        
+    conditions = [Property(name) == value for name, value in values.items()]
+    if predicate is not None:
+        conditions.insert(0, predicate)
+        
+    mask = np.ones(len(wells), dtype = bool)
+    for condition in conditions:
+        if isinstance(condition, Predicate):
+            condition = condition.mask(wells)
+        condition = np.asarray(condition, dtype = bool)
+        
+        if condition.shape != mask.shape:
+            raise ValueError('mask must have one value per well')
+        mask &= condition
+        
+    return np.flatnonzero(mask)
+
+def _frame(wells, store: PropertyStore, columns: list = None) -> pd.DataFrame:
+    '''
+    table of the properties of the wells of a field or view (see 
+    Field.to_frame)
+    '''
+    if columns is None:
+        if store is not None:
+            columns = store.names
+        else:
+            welltop_names = dict.fromkeys([welltop_name for well in wells.wells
+                                           for welltop_name in well.welltops])
+            columns = (list(Well._stored) 
+                       + ['ipr.' + name for name in IPR._stored]
+                       + ['welltops.' + str(welltop_name) + '.' + name 
+                          for welltop_name in welltop_names
+                          for name in Welltop._stored])
+        
+    return pd.DataFrame({name: wells.column(name) for name in columns}, 
+                        index = pd.Index(wells.uwis, name = 'UWI'),
+                        columns = columns)
+
+def _column(wells: list, name: str) -> np.ndarray:
+    '''
+    values of a property collected from the wells (see Field.column)
+    '''
+    values = [_property(well, name) for well in wells]
+    
+    if all([value is None or (isinstance(value, numbers.Real) 
+                              and not isinstance(value, (bool, np.bool_)))
+            for value in values]):
+        return np.array([np.nan if value is None else value 
+                         for value in values], dtype = float)
+    
+    return np.array(values, dtype = object)
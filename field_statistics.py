@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:53 2026
+
+@author: mischasch
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+#tuning constant of the Huber weights (95 % efficiency for normal residuals)
+HUBER_C = 1.345
+
+def correlation_matrix(X: np.ndarray, method: str = 'pearson') -> np.ndarray:
+    '''
+    correlation matrix of the columns of X. Missing values (NaN) are masked
+    pairwise: every coefficient uses the rows where both columns are set.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        n x p array, one column per variable.
+    method : str, optional
+        'pearson' (linear), 'spearman' or 'kendall' (rank correlations).
+        The default is 'pearson'.
+
+    Returns
+    -------
+    np.ndarray
+        p x p correlation matrix. NaN where fewer than 2 rows are set.
+
+    '''
+    X = np.asarray(X, dtype = float)
+
+    if method == 'pearson':
+        return _pearson(X)
+    if method in ('spearman', 'kendall'):
+        return _rank_correlation(X, method)
+
+    raise ValueError('correlation method ' + str(method) + ' not available')
+
+def _pearson(X: np.ndarray) -> np.ndarray:
+    '''
+    pairwise Pearson correlation in one pass of matrix products over the
+    masked columns
+    '''
+    mask = np.isfinite(X)
+    m = mask.astype(float)
+
+    #center first, so the sums don't cancel for large values (e.g. depths)
+    Xz = np.where(mask, X - np.nanmean(np.where(mask, X, np.nan), axis = 0), 0.)
+
+    n = m.T @ m #rows where both columns are set
+    sx = Xz.T @ m #sum of column i over these rows
+    sxx = (Xz ** 2).T @ m
+    sxy = Xz.T @ Xz
+
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        cov = n * sxy - sx * sx.T
+        var = n * sxx - sx ** 2
+        r = cov / np.sqrt(var * var.T)
+
+    r[n < 2] = np.nan
+    return np.clip(r, -1., 1.)
+
+def _rank_correlation(X: np.ndarray, method: str) -> np.ndarray:
+    '''
+    pairwise rank correlation. Ranks depend on the rows that are set in
+    both columns, so if the columns have different missing values, every
+    pair is ranked on its own rows.
+    '''
+    mask = np.isfinite(X)
+    p = X.shape[1]
+
+    if method == 'spearman' and p > 0 and (mask == mask[:, :1]).all():
+        #same rows set in all columns: one ranking for all pairs
+        return _pearson(stats.rankdata(X[mask[:, 0]], axis = 0))
+
+    r = np.eye(p)
+    for i in range(p):
+        for j in range(i + 1, p):
+            both = mask[:, i] & mask[:, j]
+            if both.sum() < 2:
+                r[i, j] = r[j, i] = np.nan
+                continue
+
+            if method == 'spearman':
+                r[i, j] = r[j, i] = stats.spearmanr(X[both, i], X[both, j])[0]
+            else:
+                r[i, j] = r[j, i] = stats.kendalltau(X[both, i], X[both, j])[0]
+
+    return r
+
+def fit(y: np.ndarray, X: np.ndarray, robust: bool = False,
+        max_iter: int = 50, tol: float = 1e-8) -> tuple:
+    '''
+    linear least squares fit y = intercept + X @ slopes. Robust fits use
+    iteratively reweighted least squares with Huber weights, so outliers
+    get less weight.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        n values.
+    X : np.ndarray
+        n x p array of predictors. Rows must not contain NaN.
+    robust : bool, optional
+        if True, Huber regression. The default is False.
+    max_iter : int, optional
+        maximum number of reweighting iterations. The default is 50.
+    tol : float, optional
+        convergence tolerance of the coefficients. The default is 1e-8.
+
+    Returns
+    -------
+    intercept : float
+    slopes : np.ndarray
+        p values.
+    weights : np.ndarray
+        n final weights (all 1 for least squares).
+
+    '''
+    A = np.column_stack([np.ones(len(y)), X])
+    weights = np.ones(len(y))
+
+    beta = np.linalg.lstsq(A, y, rcond = None)[0]
+
+    if robust:
+        for _ in range(max_iter):
+            residuals = y - A @ beta
+            #robust scale of the residuals (normalized median absolute deviation)
+            scale = np.median(np.abs(residuals - np.median(residuals))) / 0.6745
+            if scale == 0:
+                break
+
+            u = np.abs(residuals) / (HUBER_C * scale)
+            weights = np.where(u <= 1, 1., 1. / np.maximum(u, 1.))
+
+            w = np.sqrt(weights)
+            new_beta = np.linalg.lstsq(A * w[:, None], y * w, rcond = None)[0]
+
+            converged = np.allclose(new_beta, beta, rtol = tol, atol = tol)
+            beta = new_beta
+            if converged:
+                break
+
+    return beta[0], beta[1:], weights
+
+class Regression():
+    '''
+    linear regression of a well property on other well properties across
+    the wells of a field (see resy.field.Field.regress)
+    '''
+    def __init__(self, y: str, x: list, robust: bool, uwis, y_values: np.ndarray,
+                 X: np.ndarray):
+        '''
+
+
+        Parameters
+        ----------
+        y : str
+            dependent property, e.g. 'p_res'.
+        x : list of str
+            predictors, e.g. ['welltops.top reservoir.z_TVD'].
+        robust : bool
+            if True, Huber regression, else least squares.
+        uwis : array of str
+            UWIs of the wells used (all values set).
+        y_values : np.ndarray
+            values of y of these wells.
+        X : np.ndarray
+            values of the predictors of these wells, one column per predictor.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.y = y
+        self.x = list(x)
+        self.robust = robust
+        self.uwis = np.asarray(uwis, dtype = object)
+        self.n = len(y_values)
+
+        if self.n < len(self.x) + 1:
+            raise ValueError('not enough wells with ' + ', '.join([y] + self.x)
+                             + ' for a regression (' + str(self.n) + ')')
+
+        self.intercept, self.slopes, self.weights = fit(y_values, X, robust = robust)
+
+        predicted = self.intercept + X @ self.slopes
+        self.residuals = pd.Series(y_values - predicted,
+                                   index = pd.Index(self.uwis, name = 'UWI'),
+                                   name = 'residual')
+
+        ss_tot = np.sum((y_values - y_values.mean()) ** 2)
+        ss_res = np.sum(self.residuals.values ** 2)
+        self.r2 = 1 - ss_res / ss_tot if ss_tot > 0 else np.nan
+
+        dof = self.n - len(self.x) - 1
+        self.std = np.sqrt(ss_res / dof) if dof > 0 else np.nan
+
+    def __repr__(self):
+        terms = ' + '.join(['{:.6g}'.format(self.intercept)]
+                           + ['{:.6g} * {}'.format(slope, name)
+                              for slope, name in zip(self.slopes, self.x)])
+        return ('{} regression: {} = {} (n = {}, r2 = {:.3f})'
+                .format('robust' if self.robust else 'linear', self.y, terms,
+                        self.n, self.r2))
+
+    @property
+    def coefficients(self) -> pd.Series:
+        '''
+        intercept and slopes
+        '''
+        return pd.Series([self.intercept] + list(self.slopes),
+                         index = ['intercept'] + self.x)
+
+    def predict(self, X):
+        '''
+        predicted values of y
+
+        Parameters
+        ----------
+        X : float or array
+            values of the predictors: a float or an array of floats for a
+            single predictor, else an n x p array.
+
+        Returns
+        -------
+        float or np.ndarray
+
+        '''
+        X = np.asarray(X, dtype = float)
+
+        if len(self.x) == 1 and (X.ndim == 0 or X.ndim == 1):
+            return self.intercept + X * self.slopes[0]
+        return self.intercept + X @ self.slopes
+
+def numeric(values: np.ndarray, name: str) -> np.ndarray:
+    '''
+    property column as float array (None as NaN)
+    '''
+    if values.dtype != object:
+        return np.asarray(values, dtype = float)
+    
+    try:
+        return np.array([np.nan if value is None else value for value in values],
+                        dtype = float)
+    except (TypeError, ValueError):
+        raise ValueError('property ' + name + ' is not numeric')
+
+def fingerprint(uwis, columns: list) -> str:
+    '''
+    hash of the UWIs and the values of property columns, identifies the
+    inputs of a cached fit
+    '''
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(repr(list(uwis)).encode('utf-8'))
+
+    for column in columns:
+        column = np.asarray(column)
+        if column.dtype == object:
+            h.update(repr(column.tolist()).encode('utf-8'))
+        else:
+            h.update(np.ascontiguousarray(column, dtype = float).tobytes())
+
+    return h.hexdigest()
+
+class PressureTrend():
+    '''
+    field-wide trend of the reservoir pressure with depth,
+        p_res = intercept + gradient * (z - z_ref)
+    fitted to p_res and the depth of the top reservoir of all wells, 
+    optionally per compartment. The trend gives the regression pressure 
+    Well.p_regr.
+
+    The fit is kept as weighted sums per compartment, so wells can be added
+    and removed without refitting: a new well is weighted by its residual 
+    against the current trend (Huber weight, or 0 if rejected as outlier) 
+    and its sums are added. Refit after changing p_res or depths of wells.
+    '''
+    def __init__(self, method: str = 'linear', compartments = None,
+                 clip: float = 3., welltop: str = 'top reservoir',
+                 depth: str = 'z_TVD'):
+        '''
+
+
+        Parameters
+        ----------
+        method : str, optional
+            'linear' (least squares), 'huber' (robust, outliers get less 
+            weight) or 'clip' (least squares after iteratively rejecting
+            wells with residuals larger than clip standard deviations). 
+            The default is 'linear'.
+        compartments : str or dict, optional
+            compartment of every well, for one trend per compartment: a 
+            well property (see resy.field.Field.column) or a dict UWI: 
+            compartment. Wells without compartment are not used. The 
+            default is None (one trend for the field).
+        clip : float, optional
+            rejection threshold of the 'clip' method [standard deviations].
+            The default is 3.
+        welltop : str, optional
+            welltop the pressure refers to. The default is 'top reservoir'.
+        depth : str, optional
+            depth of the welltop, 'z_TVD' or 'z_NN'. The default is 'z_TVD'.
+
+        Returns
+        -------
+        None.
+
+        '''
+        if method not in ('linear', 'huber', 'clip'):
+            raise ValueError('method must be linear, huber or clip')
+
+        self.method = method
+        self.compartments = compartments
+        self.clip = clip
+        self.welltop = welltop
+        self.depth = depth
+
+        self.z_ref = 0.
+
+        #compartment: code, sums per code: weight, w*x, w*y, w*x^2, w*x*y
+        self._codes = dict()
+        self._sums = np.zeros((0, 5))
+        #residual scale per code (robust scale for huber, std for clip)
+        self._scale = np.zeros(0)
+        #UWI: (code, weight, x, y) of the wells in the sums
+        self._wells = dict()
+
+    @property
+    def depth_column(self) -> str:
+        return 'welltops.' + self.welltop + '.' + self.depth
+
+    @property
+    def coefficients(self) -> pd.DataFrame:
+        '''
+        intercept [bara] at z_ref, gradient [bar/m] and number of wells (sum
+        of weights) per compartment
+
+        '''
+        intercept, gradient = self._coefficients()
+        return pd.DataFrame({'intercept': intercept, 'gradient': gradient,
+                             'n': self._sums[:, 0]},
+                            index = pd.Index(list(self._codes), name = 'compartment'))
+
+    def fit(self, field) -> None:
+        '''
+        fits the trend to all wells of a field
+
+        '''
+        uwis, labels, x, y = self._inputs(field)
+
+        self.z_ref = float(np.mean(x)) if len(x) > 0 else 0.
+        self._codes = dict()
+        codes = self._encode(labels)
+
+        n_codes = len(self._codes)
+        self._sums = np.zeros((n_codes, 5))
+        self._scale = np.full(n_codes, np.nan)
+        self._wells = dict()
+
+        weights = np.ones(len(x))
+        for code in range(n_codes):
+            rows = codes == code
+            weights[rows], self._scale[code] = self._fit_weights(x[rows] - self.z_ref,
+                                                                 y[rows])
+
+        self._add(uwis, codes, weights, x, y)
+
+    def add(self, field, wells: list) -> None:
+        '''
+        adds wells to the trend without refitting. Wells already in the 
+        trend are ignored.
+
+        '''
+        wells = [well for well in wells if well.uwi not in self._wells]
+        uwis, labels, x, y = self._inputs(field, wells)
+        codes = self._encode(labels)
+
+        #new compartments
+        n_new = len(self._codes) - len(self._sums)
+        self._sums = np.vstack([self._sums, np.zeros((n_new, 5))])
+        self._scale = np.concatenate([self._scale, np.full(n_new, np.nan)])
+
+        #weight by the residual against the current trend
+        intercept, gradient = self._coefficients()
+        residuals = y - (intercept[codes] + gradient[codes] * (x - self.z_ref))
+        weights = self._weights(residuals, self._scale[codes])
+
+        self._add(uwis, codes, weights, x, y)
+
+    def remove(self, uwis) -> None:
+        '''
+        removes wells from the trend without refitting
+
+        '''
+        for uwi in uwis:
+            if uwi in self._wells:
+                code, w, x, y = self._wells.pop(uwi)
+                self._sums[code] -= w * np.array([1., x, y, x * x, x * y])
+
+    def predict(self, z, compartment = None):
+        '''
+        pressure of the trend at depths
+
+        Parameters
+        ----------
+        z : float or array of float
+            depths of the welltop.
+        compartment : optional
+            compartment, if fitted per compartment. The default is None.
+
+        Returns
+        -------
+        float or np.ndarray
+            NaN if the compartment has no trend.
+
+        '''
+        intercept, gradient = self._coefficients()
+        code = self._codes.get(compartment)
+        if code is None:
+            return np.full(np.shape(z), np.nan) if np.ndim(z) else np.nan
+
+        return intercept[code] + gradient[code] * (np.asarray(z, dtype = float)
+                                                   - self.z_ref)
+
+    def p_regr(self, field) -> np.ndarray:
+        '''
+        regression pressure of all wells of a field, NaN for wells without
+        welltop depth or compartment trend
+
+        '''
+        x = numeric(field.column(self.depth_column), self.depth_column)
+
+        if self.compartments is None:
+            codes = np.zeros(len(x), dtype = np.intp)
+        else:
+            codes = np.array([self._codes.get(label, -1) 
+                              for label in self._labels(field)], dtype = np.intp)
+
+        #code -1 (no trend) selects the appended NaN
+        intercept, gradient = self._coefficients()
+        intercept, gradient = np.append(intercept, np.nan), np.append(gradient, np.nan)
+
+        return intercept[codes] + gradient[codes] * (x - self.z_ref)
+
+    def _coefficients(self) -> tuple:
+        w, wx, wy, wxx, wxy = self._sums.T
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            gradient = (w * wxy - wx * wy) / (w * wxx - wx ** 2)
+            intercept = (wy - gradient * wx) / w
+        return intercept, gradient
+
+    def _add(self, uwis, codes, weights, x, y) -> None:
+        '''
+        adds weighted sums of wells, vectorized per compartment
+        '''
+        xr = x - self.z_ref
+        n = len(self._sums)
+        for column, values in enumerate([weights, weights * xr, weights * y,
+                                         weights * xr * xr, weights * xr * y]):
+            self._sums[:, column] += np.bincount(codes, weights = values,
+                                                 minlength = n)
+
+        self._wells.update(zip(uwis, zip(codes.tolist(), weights.tolist(),
+                                         xr.tolist(), y.tolist())))
+
+    def _fit_weights(self, x: np.ndarray, y: np.ndarray) -> tuple:
+        '''
+        weights and residual scale of a full fit of one compartment
+        '''
+        if len(x) < 2:
+            return np.ones(len(x)), np.nan
+
+        if self.method == 'huber':
+            intercept, slopes, weights = fit(y, x[:, None], robust = True)
+            residuals = y - intercept - slopes[0] * x
+            return weights, np.median(np.abs(residuals - np.median(residuals))) / 0.6745
+
+        weights = np.ones(len(x))
+        intercept, slopes, _ = fit(y, x[:, None])
+        scale = np.std(y - intercept - slopes[0] * x, ddof = min(2, len(x) - 1))
+
+        if self.method == 'clip':
+            #reject outliers until no more wells are rejected
+            for _ in range(len(x)):
+                keep = weights > 0
+                intercept, slopes, _ = fit(y[keep], x[keep, None])
+                residuals = y - intercept - slopes[0] * x
+                scale = np.std(residuals[keep], ddof = min(2, keep.sum() - 1))
+
+                new_weights = (np.abs(residuals) <= self.clip * scale).astype(float)
+                if (new_weights == weights).all() or new_weights.sum() < 2:
+                    break
+                weights = new_weights
+
+        return weights, scale
+
+    def _weights(self, residuals: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        '''
+        weights of new wells by their residuals against the trend
+        '''
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            u = np.abs(residuals) / scale
+
+            if self.method == 'huber':
+                weights = np.minimum(1., HUBER_C / u)
+            elif self.method == 'clip':
+                weights = (u <= self.clip).astype(float)
+            else:
+                weights = np.ones(len(residuals))
+
+        #no trend yet (e.g. new compartment): no rejection
+        return np.where(np.isfinite(u) | (self.method == 'linear'), weights, 1.)
+
+    def _column(self, field, wells, name: str) -> np.ndarray:
+        '''
+        property column of all wells of the field (wells None) or of some
+        wells
+        '''
+        from resy.field import _column #avoid circular import
+        
+        return field.column(name) if wells is None else _column(wells, name)
+
+    def _labels(self, field, wells = None) -> list:
+        '''
+        compartments of the wells of the field (wells None) or of some wells
+        '''
+        if wells is None:
+            wells = field.wells
+            
+        if self.compartments is None:
+            return [None] * len(wells)
+        if isinstance(self.compartments, str):
+            return list(self._column(field, wells, self.compartments))
+        return [self.compartments.get(well.uwi) for well in wells]
+
+    def _inputs(self, field, wells = None) -> tuple:
+        '''
+        UWIs, compartments, depths and pressures of the wells of the field
+        (wells None) or of some wells with all of them set
+        '''
+        labels = self._labels(field, wells)
+        x = numeric(self._column(field, wells, self.depth_column), self.depth_column)
+        y = numeric(self._column(field, wells, 'p_res'), 'p_res')
+
+        #compartment set (None and NaN are not set)
+        compartment = np.array([label is not None and label == label 
+                                for label in labels], dtype = bool)
+        use = np.isfinite(x) & np.isfinite(y) & (compartment | (self.compartments is None))
+
+        uwis = np.array(field.uwis if wells is None else [well.uwi for well in wells],
+                        dtype = object)[use]
+        labels = [label for label, used in zip(labels, use) if used]
+
+        return list(uwis), labels, x[use], y[use]
+
+    def _encode(self, labels: list) -> np.ndarray:
+        '''
+        compartment codes, new compartments get new codes
+        '''
+        codes = np.empty(len(labels), dtype = np.intp)
+        for i, label in enumerate(labels):
+            codes[i] = self._codes.setdefault(label, len(self._codes))
+        return codes
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:41:12 2026
+
+@author: mischasch
+"""
+import warnings
+
+import numpy as np
+
+#Reynolds number below which flow is laminar
+RE_LAMINAR = 2300
+
+#convergence tolerance of 1 / sqrt(f) and iteration cap of the 
+#Colebrook-White solver
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 20
+
+def friction_losses(q, ids, ls, k: float, rho: float, mu: float,
+                    sections: bool = False) -> np.ndarray:
+    '''
+    Darcy-Weisbach friction losses of a casing design at flow rates. All
+    sections and rates are evaluated in one array operation.
+
+    Parameters
+    ----------
+    q : float or array of float
+        flow rate(s) [l/s]. The sign is ignored.
+    ids : array of float
+        inner diameter of each section [m].
+    ls : array of float
+        length of each section [m].
+    k : float
+        roughness [m].
+    rho : float or np.ndarray
+        fluid density [kg/m3]. Arrays of shape (..., 1, 1) give the losses
+        for several fluids at once.
+    mu : float or np.ndarray
+        fluid dynamic viscosity [Pa s], of the same shape as rho.
+    sections : bool, optional
+        if True, the losses of each section are returned. The default is
+        False (sum over all sections).
+
+    Returns
+    -------
+    np.ndarray
+        friction losses [bar], one value per rate, or sections x rates if
+        sections is True (with the leading dimensions of rho and mu).
+
+    '''
+    q = np.abs(np.atleast_1d(np.asarray(q, dtype = float))) / 1000 #m3/s
+    d = np.asarray(ids, dtype = float)[:, None]
+    l = np.asarray(ls, dtype = float)[:, None]
+
+    if d.shape != l.shape:
+        raise ValueError('Number of ids must correspond to number of lengths')
+
+    v = q / (np.pi / 4 * d**2) #sections x rates
+    Re = rho * v * d / mu
+
+    dp = friction_factor(Re, k / d) * l / d * rho * v**2 / 2 / 1e5
+
+    return dp if sections else dp.sum(axis = -2)
+
+def friction_factor(Re, relative_roughness, tol: float = TOLERANCE,
+                    max_iter: int = MAX_ITERATIONS) -> np.ndarray:
+    '''
+    Darcy friction factor: 64 / Re for laminar flow, else the solution of
+    the Colebrook-White equation (see colebrook). 0 for Re = 0.
+
+    Parameters
+    ----------
+    Re : float or array of float
+        Reynolds number.
+    relative_roughness : float or array of float
+        roughness / inner diameter, broadcast against Re.
+    tol : float, optional
+        convergence tolerance of 1 / sqrt(f). The default is TOLERANCE.
+    max_iter : int, optional
+        maximum number of Newton iterations. The default is MAX_ITERATIONS.
+
+    Returns
+    -------
+    np.ndarray
+
+    '''
+    Re, relative_roughness = np.broadcast_arrays(np.asarray(Re, dtype = float),
+                                                 np.asarray(relative_roughness, 
+                                                            dtype = float))
+    
+    f = np.zeros(Re.shape)
+    
+    laminar = (Re > 0) & (Re < RE_LAMINAR)
+    f[laminar] = 64 / Re[laminar]
+    
+    turbulent = Re >= RE_LAMINAR
+    f[turbulent] = colebrook(Re[turbulent], relative_roughness[turbulent], 
+                             tol = tol, max_iter = max_iter)
+    
+    return f
+
+def colebrook(Re, relative_roughness, tol: float = TOLERANCE,
+              max_iter: int = MAX_ITERATIONS) -> np.ndarray:
+    '''
+    solves the implicit Colebrook-White equation
+        1 / sqrt(f) = -2 log10(relative_roughness / 3.7 + 2.51 / (Re sqrt(f)))
+    for all pairs of Reynolds number and relative roughness at once. Newton
+    iterations on x = 1 / sqrt(f) start from the Swamee-Jain approximation
+    and continue for the pairs that have not converged yet (usually 2 - 3
+    iterations).
+
+    Parameters
+    ----------
+    Re : array of float
+        Reynolds numbers (turbulent, > 0).
+    relative_roughness : array of float
+        roughness / inner diameter, broadcast against Re.
+    tol : float, optional
+        convergence tolerance of x. The default is TOLERANCE.
+    max_iter : int, optional
+        maximum number of iterations. Pairs that have not converged then 
+        are returned with a warning. The default is MAX_ITERATIONS.
+
+    Returns
+    -------
+    np.ndarray
+        Darcy friction factors.
+
+    '''
+    Re, relative_roughness = np.broadcast_arrays(np.asarray(Re, dtype = float),
+                                                 np.asarray(relative_roughness, 
+                                                            dtype = float))
+    
+    shape = Re.shape
+    Re, relative_roughness = Re.ravel(), relative_roughness.ravel()
+    
+    x = 1 / np.sqrt(swamee_jain(Re, relative_roughness))
+    a = relative_roughness / 3.7
+    b = 2.51 / Re
+    
+    #indices of the pairs that have not converged yet
+    active = np.flatnonzero(np.isfinite(x))
+    for _ in range(max_iter):
+        if len(active) == 0:
+            break
+        if len(active) < len(x):
+            xi, ai, bi = x[active], a[active], b[active]
+        else:
+            xi, ai, bi = x, a, b
+        
+        #g(x) = x + 2 log10(a + b x), g'(x) = 1 + 2 b / ((a + b x) ln 10)
+        inner = ai + bi * xi
+        step = (xi + 2 * np.log10(inner)) / (1 + 2 * bi / (inner * np.log(10)))
+        x[active] = xi - step
+        
+        active = active[np.abs(step) > tol]
+    else:
+        if len(active) > 0:
+            warnings.warn('Colebrook-White did not converge for ' + str(len(active))
+                          + ' Reynolds numbers within ' + str(max_iter) + ' iterations')
+        
+    return (1 / x**2).reshape(shape)
+
+def swamee_jain(Re, relative_roughness) -> np.ndarray:
+    '''
+    explicit approximation of the Colebrook-White friction factor (within
+    about 1 % for 5e3 < Re < 1e8 and relative roughness < 1e-2)
+    '''
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return 0.25 / np.log10(np.asarray(relative_roughness) / 3.7 
+                               + 5.74 / np.asarray(Re)**0.9)**2
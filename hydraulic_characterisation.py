@@ -7,10 +7,20 @@ Created on Sat Dec 24 08:33:08 2022
 """
 import warnings
 
+import numpy as np
+import pandas as pd
+
+from resy.property_store import StoredProperties
+
 class PTA():
     '''
     pressure transient analysis
     '''
+    #slots instead of an attribute dict per object
+    __slots__ = ('k', 'phi', 'aquifer_thickness', 'kh', 'Kh', 'phih', 'Sc', 
+                 'wbs_type', 'well_model', 'skin_type', 'skin', 
+                 'reservoir_model', 'boundary_model', 'm_d_comp')
+    
     def __init__(self, k :float = None, phi:float = None,
                  aquifer_thickness:float = None,
                  kh:float = None,
@@ -78,7 +88,13 @@ class PTA():
         self.m_d_comp = m_d_comp
         
         
-class IPR():
+class IPR(StoredProperties):
+    #properties kept in the property store of a columnar field
+    _stored = ['b', 'c']
+    
+    __slots__ = ('_b', '_c', 'range_certain', 'range_uncertain', 'description', 
+                 'origin', 'measurement_depth')
+    
     def __init__(self, b: float = None , c: float = None, 
                  measurement_depth = None,
                  range_certain: tuple = None, 
@@ -112,10 +128,192 @@ class IPR():
         None.
 
         '''
+        self._init_storage()
+        
         self.b = b
         self.c = c
         self.range_certain = range_certain
         self.range_uncertain = range_uncertain
         self.description = description
         self.origin = origin
-        self.measurement_depth = measurement_depth
\ No newline at end of file
+        self.measurement_depth = measurement_depth
+
+    @property
+    def b(self):
+        '''
+        b-coefficient
+        
+        '''
+        return self._get('b')
+    
+    @b.setter
+    def b(self, new_b):
+        self._set('b', new_b)
+        
+    @property
+    def c(self):
+        '''
+        c-coefficient
+        
+        '''
+        return self._get('c')
+    
+    @c.setter
+    def c(self, new_c):
+        self._set('c', new_c)
+        
+    def get_dp_at_q(self, q):
+        '''
+        drawdown at one or many flow rates (see drawdown)
+
+        Parameters
+        ----------
+        q : float or array of float
+            flow rate(s) [l/s].
+
+        Returns
+        -------
+        dp : float or array of float
+            drawdown(s) [bar], NaN if the IPR has no coefficients.
+
+        '''
+        b, c = coefficients(self.b, self.c)
+        return drawdown(b, c, q)
+    
+    def get_q_at_dp(self, dp):
+        '''
+        flow rate at one or many drawdowns (see rate_at_drawdown)
+
+        Parameters
+        ----------
+        dp : float or array of float
+            drawdown(s) [bar].
+
+        Returns
+        -------
+        q : float or array of float
+            flow rate(s) [l/s].
+
+        '''
+        b, c = coefficients(self.b, self.c)
+        return rate_at_drawdown(b, c, dp)
+    
+class IPRMatrix():
+    '''
+    drawdowns of the IPRs of several wells at several flow rates, row i
+    belongs to well uwis[i], column j to rate q[j] (see 
+    resy.field.Field.ipr_matrix).
+    
+    certain is True where a rate lies in the certain flow rate range of the
+    IPR of the well, uncertain where it lies in the uncertain range but not 
+    in the certain one. Both are False for wells without ranges.
+    '''
+    def __init__(self, uwis, q, b, c, ranges_certain: list, ranges_uncertain: list):
+        '''
+        
+
+        Parameters
+        ----------
+        uwis : array of str
+            UWIs of the wells.
+        q : float or array of float
+            flow rates [l/s].
+        b : np.ndarray
+            b-coefficients of the wells, NaN if missing.
+        c : np.ndarray
+            c-coefficients of the wells, NaN if missing.
+        ranges_certain : list of tuple
+            certain flow rate range of each well, None if not set.
+        ranges_uncertain : list of tuple
+            uncertain flow rate range of each well, None if not set.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.uwis = np.asarray(uwis, dtype = object)
+        self.q = np.atleast_1d(np.asarray(q, dtype = float))
+        
+        b, c = coefficients(b, c)
+        self.dp = drawdown(b[:, None], c[:, None], self.q)
+        
+        self.certain = _in_ranges(ranges_certain, self.q)
+        self.uncertain = _in_ranges(ranges_uncertain, self.q) & ~self.certain
+        
+    def to_frame(self, certain: bool = False) -> pd.DataFrame:
+        '''
+        drawdowns as a table
+
+        Parameters
+        ----------
+        certain : bool, optional
+            if True, drawdowns outside of the certain flow rate range are 
+            NaN. The default is False.
+
+        Returns
+        -------
+        pd.DataFrame
+            one row per well (UWI), one column per flow rate.
+
+        '''
+        dp = np.where(self.certain, self.dp, np.nan) if certain else self.dp
+        
+        return pd.DataFrame(dp, index = pd.Index(self.uwis, name = 'UWI'), 
+                            columns = pd.Index(self.q, name = 'q'))
+    
+# =============================================================================
+# IPR equation dp = b * q + c * q**2, for any number of wells and rates at 
+# once. Arrays broadcast, e.g. coefficients of n wells as n x 1 arrays and m
+# rates give n x m drawdowns.
+# =============================================================================
+def drawdown(b, c, q):
+    '''
+    drawdown [bar] of IPRs at flow rates q [l/s]
+    '''
+    q = np.asarray(q, dtype = float)
+    return b * q + c * q**2
+
+def rate_at_drawdown(b, c, dp):
+    '''
+    flow rate [l/s] at which IPRs reach a drawdown dp [bar], the positive 
+    root of c * q**2 + b * q - dp = 0 in closed form. NaN where the drawdown
+    is never reached (negative drawdowns, b = c = 0, or c < 0 and dp beyond
+    the maximum of the IPR).
+    '''
+    b, c, dp = [np.asarray(value, dtype = float) for value in (b, c, dp)]
+    
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        #2 dp / (b + sqrt(b² + 4 c dp)) is (-b + sqrt(b² + 4 c dp)) / 2c
+        #without cancellation for small c, and valid for c = 0
+        denominator = b + np.sqrt(b**2 + 4 * c * dp)
+        q = np.where(denominator > 0, 2 * dp / denominator, np.nan)
+        
+    q = np.where(dp == 0, 0., q)
+    q = np.where(dp < 0, np.nan, q)
+    
+    return q if q.ndim > 0 else float(q)
+
+def coefficients(b, c) -> tuple:
+    '''
+    b- and c-coefficients as float arrays for drawdown and 
+    rate_at_drawdown. A missing coefficient (None or NaN) is 0 if the other
+    one is set, else both are NaN.
+    '''
+    b = np.asarray(np.nan if b is None else b, dtype = float)
+    c = np.asarray(np.nan if c is None else c, dtype = float)
+    
+    missing = np.isnan(b) & np.isnan(c)
+    return (np.where(np.isnan(b) & ~missing, 0., b), 
+            np.where(np.isnan(c) & ~missing, 0., c))
+
+def _in_ranges(ranges: list, q: np.ndarray) -> np.ndarray:
+    '''
+    n x m mask, True where rate j lies in range i (bounds included)
+    '''
+    bounds = np.full((len(ranges), 2), np.nan)
+    for i, bound in enumerate(ranges):
+        if bound is not None:
+            bounds[i] = bound
+            
+    return (q >= bounds[:, :1]) & (q <= bounds[:, 1:])
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:09 2026
+
+@author: mischasch
+"""
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+class Sink(ABC):
+    '''
+    ABC for receivers of loader statistics
+    '''
+    @abstractmethod
+    def emit(self, record: dict) -> None:
+        '''
+        receives the statistics of one sheet (see Instrumentation.flush)
+
+        '''
+        ...
+
+class LoggingSink(Sink):
+    '''
+    writes statistics to a logger
+    '''
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        '''
+
+
+        Parameters
+        ----------
+        logger : logging.Logger, optional
+            logger to write to. The default is the logger of resy.data_loader.
+        level : int, optional
+            log level. The default is logging.INFO.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.logger = logger if logger is not None else logging.getLogger('resy.data_loader')
+        self.level = level
+
+    def emit(self, record: dict) -> None:
+        self.logger.log(self.level,
+                        '%s %s: %.3f s (parse %.3f s, construction %.3f s), '
+                        '%s rows read, %s accepted, %.0f rows/s',
+                        record['loader'], record['sheet'], record['wall_time'],
+                        record['parse_time'], record['construction_time'],
+                        record['rows_read'], record['rows_accepted'],
+                        record['rows_per_s'])
+
+class MemorySink(Sink):
+    '''
+    collects statistics in memory, e.g. to compare loads in a notebook
+    '''
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record: dict) -> None:
+        self.records.append(record)
+
+    def to_frame(self) -> pd.DataFrame:
+        '''
+        collected statistics, one row per loaded sheet
+
+        '''
+        return pd.DataFrame(self.records)
+
+    def clear(self) -> None:
+        self.records = []
+
+class JSONLinesSink(Sink):
+    '''
+    appends statistics to a JSON lines file, one line per loaded sheet
+    '''
+    def __init__(self, path):
+        '''
+
+
+        Parameters
+        ----------
+        path : str or Path
+            JSON lines file. Created if it doesn't exist.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.path = path
+
+    def emit(self, record: dict) -> None:
+        with open(self.path, 'a', encoding = 'utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+class Instrumentation():
+    '''
+    collects timings and row counts per sheet while loaders run. Times are
+    accumulated per phase:
+        - parse: reading the sheet (from the workbook, the cache, a file or
+          a database table)
+        - construction: filtering the sheet and creating and updating wells
+          and their objects
+    Once a sheet is loaded, its statistics are sent to all sinks.
+    '''
+    def __init__(self, sinks: list = None):
+        '''
+
+
+        Parameters
+        ----------
+        sinks : list of Sink, optional
+            receivers of the statistics. The default is a LoggingSink and,
+            if the stats keyword of the config.ini is set, a JSONLinesSink
+            writing to that path.
+
+        Returns
+        -------
+        None.
+
+        '''
+        if sinks is None:
+            from resy.config import config
+            sinks = [LoggingSink()]
+            if config.has_option('DataLoader', 'stats'):
+                sinks.append(JSONLinesSink(config.get('DataLoader', 'stats')))
+
+        self.sinks = sinks
+        self._records = dict()
+
+    @contextmanager
+    def timer(self, sheet_name: str, phase: str):
+        '''
+        context manager that adds the elapsed time to a phase ('parse' or
+        'construction') of a sheet
+
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(sheet_name, phase, time.perf_counter() - start)
+
+    def add_time(self, sheet_name: str, phase: str, seconds: float) -> None:
+        '''
+        adds a time measured elsewhere (e.g. in a worker process) to a phase
+        of a sheet
+
+        '''
+        self._record(sheet_name)[phase + '_time'] += seconds
+
+    def count(self, sheet_name: str, **values) -> None:
+        '''
+        sets counts or other values of a sheet, e.g. rows_read, rows_accepted
+        or source
+
+        '''
+        self._record(sheet_name).update(values)
+
+    def flush(self, loader, sheet_names: list = None) -> None:
+        '''
+        sends the statistics of loaded sheets to the sinks and forgets them
+
+        Parameters
+        ----------
+        loader : DataLoader
+            loader that loaded the sheets.
+        sheet_names : list of str, optional
+            loaded sheets. The default is None (all sheets with statistics).
+
+        '''
+        if sheet_names is None:
+            sheet_names = list(self._records)
+
+        for sheet_name in sheet_names:
+            if sheet_name not in self._records:
+                continue
+
+            record = self._records.pop(sheet_name)
+            record['wall_time'] = record['parse_time'] + record['construction_time']
+            record['rows_per_s'] = (record['rows_read'] / record['wall_time']
+                                    if record['rows_read'] and record['wall_time'] > 0
+                                    else 0.)
+
+            record = {'timestamp': datetime.now(timezone.utc).isoformat(),
+                      'loader': type(loader).__name__,
+                      'sheet': sheet_name, **record}
+
+            for sink in self.sinks:
+                sink.emit(record)
+
+    def _record(self, sheet_name: str) -> dict:
+        if sheet_name not in self._records:
+            self._records[sheet_name] = {'source': None,
+                                         'parse_time': 0.,
+                                         'construction_time': 0.,
+                                         'rows_read': None,
+                                         'rows_accepted': None}
+        return self._records[sheet_name]
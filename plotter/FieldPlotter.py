@@ -10,7 +10,6 @@ from matplotlib import pyplot as plt
 from matplotlib.pyplot import cm
 
 import numpy as np
-import copy
 
 from resy.plotter.Plotter import MplPlotterABC
 from resy.plotter.WellPlotter import *
@@ -21,33 +20,27 @@ class FieldWellSelector():
     selects wells from a field based on a lsit of UWI
     '''
     def __init__(self, field, well_list: list = None):
-        self.field = copy.deepcopy(field) #deepcopy to avoid loosing wells by selections
+        self.field = field
         self.well_list = well_list
-        
-        from resy.field import Field #avoid circular import
     
     def select(self):
         
         '''
-        removes wells from a field that are not within a selection list
+        selects the wells of the field that are within the selection list. 
+        UWIs that are not in the field are ignored.
 
         Returns
         -------
-        a Field containing only the wells that are selected
+        a read-only view of the field containing only the wells that are 
+        selected (see resy.field.FieldView). The wells are not copied.
 
         '''
+        if self.well_list is None:
+            return self.field
         
-        #remove wells from field that should not be plotted
-        if self.well_list is not None:
-            missing_wells = np.isin(np.array(self.field.uwis),
-                                    np.array(self.well_list),
-                                    invert = True)
-            
-            missing_wells = np.array(self.field.uwis)[missing_wells]
+        well_list = [self.well_list] if isinstance(self.well_list, str) else self.well_list
         
-            self.field.remove_wells(missing_wells)  
-        
-        return self.field
+        return self.field.view([uwi for uwi in well_list if uwi in self.field])
         
 class MplFieldPlotterABC(MplPlotterABC, ABC):
     '''
@@ -70,6 +63,8 @@ class MplFieldPlotterABC(MplPlotterABC, ABC):
         plotwells: list, optional
             If not None, plots only the wells corresponding to the UWIs in the 
             provided list. If None, all wells are plotted.
+        field: Field or FieldView
+            field to plot.
     
         
 
@@ -90,28 +85,55 @@ class MplFieldIPRPlotter(MplFieldPlotterABC):
     '''
     plot all IPR of wells in a field
     '''
-    def plot(self, **kwargs):
+    def plot(self, q: tuple = (0,150), **kwargs):
         '''
-        plots IPR for the selected wells
+        plots IPR for the selected wells. The drawdowns of all wells are 
+        computed at once (see resy.field.Field.ipr_matrix).
 
         Parameters
         ----------
+        q : tuple, optional
+            flow rate range [l/s], arguments of np.arange. The default is 
+            (0,150).
         **kwargs : named arguments
-            forwarded to the pyplot plotting function.
+            forwarded to the pyplot plotting function. legend = True adds
+            a legend.
 
         Returns
         -------
         None.
 
         '''
-        #_, ax = plt.subplots()
-        color = iter(cm.rainbow(np.linspace(0, 1, len(self.field.wells))))
+        legend = kwargs.pop('legend', False)
+        
+        ipr = self.field.ipr_matrix(np.arange(*q))
+        color = iter(cm.rainbow(np.linspace(0, 1, len(ipr.uwis))))
+        
+        for uwi, dp, certain, uncertain in zip(ipr.uwis, ipr.dp, ipr.certain, 
+                                               ipr.uncertain):
+            if np.isnan(dp).all():
+                continue
+            
+            plot_kwargs = dict(color = next(color), alpha = 0.5)
+            plot_kwargs.update(kwargs)
+            
+            #no ranges are set
+            if not (certain.any() or uncertain.any()):
+                self.ax.plot(ipr.q, dp, **plot_kwargs)
+                continue
+            
+            #NaN outside of a range interrupts the line
+            self.ax.plot(ipr.q, np.where(uncertain | certain, dp, np.nan), 
+                         ls = '--', **plot_kwargs)
+            self.ax.plot(ipr.q, np.where(certain, dp, np.nan), ls = '-', 
+                         label = uwi, **plot_kwargs)
+            
+        self.ax.set_xlabel('q [l/s]')
+        self.ax.set_ylabel('dP [bar]')
+        self.ax.grid(ls = '--')
         
-        for well in self.field.wells:
-            if any([well.ipr.b, well.ipr.c]):
-                (MplWellIPRPlotter(well = well, ax = self.ax)
-                    .plot(color = next(color), 
-                    alpha = 0.5, **kwargs))
+        if legend:
+            self.ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
 
 #class MplFieldWellPropertyCorrelator(MplFieldPlotterABC)            
         #plt.show()
@@ -74,7 +74,7 @@ class MplWellIPRPlotter(MplWellPlotterABC):
         q = np.arange(*q)
         
         
-        dp = self.well.ipr.b * q + self.well.ipr.c * q**2
+        dp = self.well.ipr.get_dp_at_q(q)
         
         #no ranges are set
         if all([self.well.ipr.range_certain is None,
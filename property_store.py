@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:30:05 2026
+
+@author: mischasch
+"""
+import copy
+import numbers
+
+import numpy as np
+
+class PropertyStore():
+    '''
+    columnar (struct-of-arrays) store of the scalar properties of the wells
+    of a field. Row i holds the properties of the i-th well of the field,
+    every property is one numpy array. Properties of objects of a well are
+    stored in columns with a prefix, e.g. 'ipr.b' or
+    'welltops.top reservoir.z_TVD'.
+
+    Numeric columns are float arrays, missing values (None) are NaN. Columns
+    that receive non-numeric values become object arrays.
+    '''
+    def __init__(self):
+        self.n = 0 #number of rows
+        self._capacity = 0
+
+        self._columns = dict()
+        self._none = dict() #True where a numeric value is None
+
+    @property
+    def names(self) -> list:
+        '''
+        names of all columns
+        '''
+        return list(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        '''
+        values of a column for all rows (read-only view). Unknown columns
+        are all NaN.
+
+        Parameters
+        ----------
+        name : str
+            column name.
+
+        Returns
+        -------
+        np.ndarray
+            float array (None as NaN) or object array.
+
+        '''
+        if name not in self._columns:
+            return np.full(self.n, np.nan)
+
+        values = self._columns[name][:self.n]
+        values.flags.writeable = False
+        return values
+
+    def get(self, row: int, name: str):
+        '''
+        value of a cell, None if missing
+        '''
+        if name not in self._columns:
+            return None
+
+        values = self._columns[name]
+        if name in self._none:
+            return None if self._none[name][row] else values[row].item()
+        return values[row]
+
+    def set(self, row: int, name: str, value) -> None:
+        '''
+        sets the value of a cell. Unknown columns are created.
+        '''
+        if name not in self._columns:
+            self._add_column(name)
+
+        values = self._columns[name]
+
+        if name in self._none:
+            if value is None:
+                values[row] = np.nan
+                self._none[name][row] = True
+                return
+            if isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_)):
+                values[row] = value
+                self._none[name][row] = False
+                return
+
+            self._to_object(name)
+            values = self._columns[name]
+
+        values[row] = value
+
+    def set_column(self, name: str, values: np.ndarray) -> None:
+        '''
+        sets a numeric column for all rows at once, NaN values are missing
+        '''
+        values = np.asarray(values, dtype = float)
+        if len(values) != self.n:
+            raise ValueError('column must have one value per row')
+
+        if name in self._columns and name not in self._none:
+            #object column
+            self._columns[name][:self.n] = [None if np.isnan(value) else value
+                                            for value in values.tolist()]
+            return
+
+        if name not in self._columns:
+            self._add_column(name)
+
+        self._columns[name][:self.n] = values
+        self._none[name][:self.n] = np.isnan(values)
+
+    def append(self, n: int) -> int:
+        '''
+        adds n empty rows, returns the first new row
+        '''
+        first = self.n
+
+        if self.n + n > self._capacity:
+            self._resize(max(self.n + n, 2 * self._capacity, 16))
+        self.n += n
+
+        return first
+
+    def compact(self, keep: np.ndarray) -> None:
+        '''
+        removes rows. The remaining rows keep their order.
+
+        Parameters
+        ----------
+        keep : np.ndarray of bool
+            True for the rows to keep, one value per row.
+
+        '''
+        n = int(np.count_nonzero(keep))
+
+        for name, values in self._columns.items():
+            values[:n] = values[:self.n][keep]
+            values[n:self.n] = np.nan if name in self._none else None
+
+            if name in self._none:
+                none = self._none[name]
+                none[:n] = none[:self.n][keep]
+                none[n:self.n] = True
+
+        self.n = n
+
+    def copy(self):
+        '''
+        copy of the store with copies of all columns
+        '''
+        new = PropertyStore()
+        new.n, new._capacity = self.n, self._capacity
+        new._columns = {name: values.copy() for name, values in self._columns.items()}
+        new._none = {name: none.copy() for name, none in self._none.items()}
+        
+        return new
+
+    def _add_column(self, name: str) -> None:
+        self._columns[name] = np.full(self._capacity, np.nan)
+        self._none[name] = np.ones(self._capacity, dtype = bool)
+
+    def _to_object(self, name: str) -> None:
+        '''
+        converts a numeric column to an object column
+        '''
+        values = self._columns[name].astype(object)
+        values[self._none.pop(name)] = None
+        self._columns[name] = values
+
+    def _resize(self, capacity: int) -> None:
+        for name, values in self._columns.items():
+            if name in self._none:
+                new = np.full(capacity, np.nan)
+                none = np.ones(capacity, dtype = bool)
+                none[:self.n] = self._none[name][:self.n]
+                self._none[name] = none
+            else:
+                new = np.full(capacity, None, dtype = object)
+            new[:self.n] = values[:self.n]
+            self._columns[name] = new
+
+        self._capacity = capacity
+
+class StoredProperties():
+    '''
+    mixin for objects whose scalar properties can be stored in a
+    PropertyStore. While an object is not attached to a store, its values
+    are kept in the object itself, in the slots '_' + property name. 
+    Attached objects are views onto one row of the store.
+
+    Classes list their stored properties in _stored, declare the slots, 
+    call _init_storage first in __init__ and access the values with _get 
+    and _set.
+    '''
+    __slots__ = ('_store', '_row', '_prefix')
+    
+    _stored = []
+
+    def _init_storage(self) -> None:
+        self._store = None
+        self._row = None
+        self._prefix = ''
+
+    def _get(self, name: str):
+        if self._store is None:
+            return getattr(self, '_' + name, None)
+        return self._store.get(self._row, self._prefix + name)
+
+    def _set(self, name: str, value) -> None:
+        if self._store is None:
+            setattr(self, '_' + name, value)
+        else:
+            self._store.set(self._row, self._prefix + name, value)
+
+    def _attach(self, store: PropertyStore, row: int, prefix: str = '') -> None:
+        '''
+        moves the values into a row of a store
+        '''
+        values = {name: self._get(name) for name in self._stored}
+
+        self._store, self._row, self._prefix = store, row, prefix
+        for name, value in values.items():
+            self._set(name, value)
+            #the local value is not used while attached
+            setattr(self, '_' + name, None)
+
+    def _bind(self, store: PropertyStore, row: int, prefix: str = '') -> None:
+        '''
+        attaches the object to a row of a store that already holds its 
+        values, e.g. a copy of the store
+        '''
+        self._store, self._row, self._prefix = store, row, prefix
+        for name in self._stored:
+            setattr(self, '_' + name, None)
+            
+    def _detach(self) -> None:
+        '''
+        moves the values out of the store and clears them in the store
+        '''
+        if self._store is None:
+            return
+
+        values = {name: self._get(name) for name in self._stored}
+        for name in self._stored:
+            self._set(name, None)
+
+        self._store, self._row, self._prefix = None, None, ''
+        for name, value in values.items():
+            self._set(name, value)
+            
+    def _copy(self, store: PropertyStore = None, row: int = None):
+        '''
+        shallow copy that is not attached to a store. If a store is given,
+        the copy is bound to a row of it instead (see _bind).
+        '''
+        new = copy.copy(self)
+        if store is not None:
+            new._bind(store, row, self._prefix)
+        elif self._store is not None:
+            new._init_storage()
+            for name in self._stored:
+                new._set(name, self._get(name))
+        return new
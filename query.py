@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:04:16 2026
+
+@author: mischasch
+"""
+import ast
+import numbers
+import operator
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+class Predicate(ABC):
+    '''
+    ABC for conditions on the wells of a field. Predicates are evaluated to
+    a boolean mask over all wells at once, from the property columns of the
+    field (see resy.field.Field.column). Combine predicates with & (and),
+    | (or) and ~ (not).
+    '''
+    @abstractmethod
+    def mask(self, field) -> np.ndarray:
+        '''
+        True for the wells of the field that fulfill the predicate
+
+        Parameters
+        ----------
+        field : Field or FieldView
+
+        Returns
+        -------
+        np.ndarray of bool
+            one value per well, in the order of the wells.
+
+        '''
+        ...
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+class Property():
+    '''
+    a property of the wells, e.g. Property('T_res') > 120. Names as for
+    resy.field.Field.column, e.g. 'ipr.b' or 'welltops.top reservoir.z_TVD'.
+    '''
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other):
+        return Comparison(self.name, '==', other)
+
+    def __ne__(self, other):
+        return Comparison(self.name, '!=', other)
+
+    def __lt__(self, other):
+        return Comparison(self.name, '<', other)
+
+    def __le__(self, other):
+        return Comparison(self.name, '<=', other)
+
+    def __gt__(self, other):
+        return Comparison(self.name, '>', other)
+
+    def __ge__(self, other):
+        return Comparison(self.name, '>=', other)
+
+    __hash__ = None
+
+    def isin(self, values):
+        '''
+        predicate: value is one of values
+        '''
+        return IsIn(self.name, values)
+
+    def between(self, low, high):
+        '''
+        predicate: low <= value <= high
+        '''
+        return (self >= low) & (self <= high)
+
+    def isna(self):
+        '''
+        predicate: value is missing (None or NaN)
+        '''
+        return IsNA(self.name)
+
+    def notna(self):
+        '''
+        predicate: value is set
+        '''
+        return ~IsNA(self.name)
+
+def has_welltop(name: str) -> Predicate:
+    '''
+    predicate: the well has a welltop, e.g. has_welltop('top reservoir')
+    '''
+    return ~IsNA('welltops.' + name + '.name')
+
+_OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt,
+              '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+class Comparison(Predicate):
+    '''
+    compares a property to a value. Missing values only fulfill != (and ==
+    None).
+    '''
+    def __init__(self, name: str, op: str, value):
+        if op not in _OPERATORS:
+            raise ValueError('unknown operator ' + str(op))
+
+        self.name = name
+        self.op = op
+        self.value = value
+
+    def mask(self, field) -> np.ndarray:
+        if self.value is None and self.op in ('==', '!='):
+            missing = IsNA(self.name).mask(field)
+            return missing if self.op == '==' else ~missing
+
+        values = field.column(self.name)
+        compare = _OPERATORS[self.op]
+
+        if values.dtype != object:
+            with np.errstate(invalid = 'ignore'):
+                return np.asarray(compare(values, self.value), dtype = bool)
+
+        #object columns: compare only the values that are set, as None can't
+        #be ordered
+        notna = pd.notna(values)
+        mask = np.full(len(values), self.op == '!=')
+        if notna.any():
+            mask[notna] = compare(values[notna], self.value)
+        return mask
+
+class IsIn(Predicate):
+    def __init__(self, name: str, values):
+        self.name = name
+        self.values = list(values)
+
+    def mask(self, field) -> np.ndarray:
+        values = field.column(self.name)
+
+        #one vectorized comparison per value, as np.isin can't sort columns
+        #with None
+        mask = np.zeros(len(values), dtype = bool)
+        for value in self.values:
+            if values.dtype == object or isinstance(value, numbers.Real):
+                mask |= np.asarray(values == value, dtype = bool)
+        return mask
+
+class IsNA(Predicate):
+    def __init__(self, name: str):
+        self.name = name
+
+    def mask(self, field) -> np.ndarray:
+        return np.asarray(pd.isna(field.column(self.name)), dtype = bool)
+
+class And(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def mask(self, field) -> np.ndarray:
+        return np.logical_and.reduce([predicate.mask(field)
+                                      for predicate in self.predicates])
+
+class Or(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def mask(self, field) -> np.ndarray:
+        return np.logical_or.reduce([predicate.mask(field)
+                                     for predicate in self.predicates])
+
+class Not(Predicate):
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def mask(self, field) -> np.ndarray:
+        return ~self.predicate.mask(field)
+
+# =============================================================================
+# Query strings, e.g. "welltype == 'prod' and T_res > 120", are parsed into
+# predicates. The expression is never evaluated.
+# =============================================================================
+_AST_OPERATORS = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=',
+                  ast.Gt: '>', ast.GtE: '>='}
+_FLIPPED = {'==': '==', '!=': '!=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+def parse(expression: str, variables: dict = None) -> Predicate:
+    '''
+    parses a query string into a predicate. Supported are:
+        - comparisons of properties with values, e.g. "T_res > 120",
+          "welltype == 'prod'", "100 < T_res <= 150", "S == None"
+        - membership, e.g. "welltype in ['prod', 'inj']"
+        - welltops, e.g. "'top reservoir' in welltops" or
+          "welltops['top reservoir'].z_TVD > 3000"
+        - IPR coefficients, e.g. "ipr.b < 0.5"
+        - and, or, not and parentheses
+
+    Parameters
+    ----------
+    expression : str
+        query string.
+    variables : dict, optional
+        values of names used in the expression that are not well
+        properties. The default is None.
+
+    Returns
+    -------
+    Predicate
+
+    '''
+    try:
+        tree = ast.parse(expression, mode = 'eval')
+    except SyntaxError as e:
+        raise ValueError('invalid query ' + repr(expression) + ': ' + str(e))
+
+    return _Parser(expression, variables or dict()).predicate(tree.body)
+
+class _Parser():
+    def __init__(self, expression: str, variables: dict):
+        self.expression = expression
+        self.variables = variables
+
+    def predicate(self, node) -> Predicate:
+        if isinstance(node, ast.BoolOp):
+            predicates = [self.predicate(value) for value in node.values]
+            return And(*predicates) if isinstance(node.op, ast.And) else Or(*predicates)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return Not(self.predicate(node.operand))
+
+        if isinstance(node, ast.Compare):
+            #chained comparisons: a < b < c is a < b and b < c
+            operands = [node.left] + node.comparators
+            predicates = [self.comparison(left, op, right) for left, op, right
+                          in zip(operands[:-1], node.ops, operands[1:])]
+            return predicates[0] if len(predicates) == 1 else And(*predicates)
+
+        raise self.error(node)
+
+    def comparison(self, left, op, right) -> Predicate:
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if isinstance(right, ast.Name) and right.id == 'welltops':
+                predicate = has_welltop(self.value(left))
+            else:
+                predicate = IsIn(self.property(left), self.value(right))
+            return Not(predicate) if isinstance(op, ast.NotIn) else predicate
+
+        if type(op) not in _AST_OPERATORS:
+            raise self.error(op)
+        op = _AST_OPERATORS[type(op)]
+
+        if self.is_property(left):
+            return Comparison(self.property(left), op, self.value(right))
+        return Comparison(self.property(right), _FLIPPED[op], self.value(left))
+
+    def is_property(self, node) -> bool:
+        while isinstance(node, (ast.Attribute, ast.Subscript)):
+            node = node.value
+        return isinstance(node, ast.Name) and node.id not in self.variables
+
+    def property(self, node) -> str:
+        '''
+        column name of a property, e.g. welltops['top reservoir'].z_TVD is
+        'welltops.top reservoir.z_TVD'
+        '''
+        if isinstance(node, ast.Name) and node.id not in self.variables:
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return self.property(node.value) + '.' + node.attr
+        if isinstance(node, ast.Subscript):
+            return self.property(node.value) + '.' + str(self.value(node.slice))
+
+        raise self.error(node)
+
+    def value(self, node):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in self.variables:
+            return self.variables[node.id]
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return [self.value(element) for element in node.elts]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = self.value(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+
+        raise self.error(node)
+
+    def error(self, node) -> ValueError:
+        return ValueError('unsupported expression in query ' + repr(self.expression)
+                          + ': ' + ast.dump(node))
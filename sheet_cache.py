@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:12:40 2026
+
+@author: mischasch
+"""
+import datetime
+import hashlib
+import json
+import os
+import warnings
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError: #cache is optional, loaders fall back to excel
+    pa = None
+
+class SheetCache():
+    '''
+    on-disk cache for the parsed sheets of an excel workbook. Every sheet is
+    stored as a feather (arrow ipc) file in a cache directory next to the
+    workbook, so warm loads don't need to open the workbook at all.
+
+    The cache is keyed on the path, size, mtime and content hash of the
+    workbook. If size or mtime changed, the content hash decides whether the
+    cached sheets are still valid. If the content changed, sheets whose xml 
+    (and shared strings and styles) are unchanged stay valid, all other 
+    sheets are removed from the cache.
+    '''
+    manifest_name = 'manifest.json'
+
+    def __init__(self, workbook, cache_dir = None):
+        '''
+
+
+        Parameters
+        ----------
+        workbook : str or Path
+            path to the excel workbook.
+        cache_dir : str or Path, optional
+            directory to store the cached sheets in. The default is
+            .resy_cache/<workbook name> in the directory of the workbook.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.workbook = Path(workbook)
+
+        if cache_dir is None:
+            cache_dir = self.workbook.parent / '.resy_cache' / self.workbook.stem
+        self.cache_dir = Path(cache_dir)
+
+        self._manifest = None #set on first validation
+        self._fingerprints = None
+
+# =============================================================================
+#Properties
+# =============================================================================
+    @property
+    def available(self):
+        '''
+        True if pyarrow is installed and the cache can be used
+        '''
+        return pa is not None
+
+    @property
+    def fingerprints(self):
+        '''
+        dict sheet name: fingerprint of the sheet in the current workbook
+        '''
+        if self._fingerprints is None:
+            self._fingerprints = _sheet_fingerprints(self.workbook)
+        return self._fingerprints
+    
+    @property
+    def manifest(self):
+        '''
+        manifest of the cache, validated against the current workbook
+        '''
+        if self._manifest is None:
+            self._manifest = self._validate()
+        return self._manifest
+
+# =============================================================================
+#Methods
+# =============================================================================
+    def get(self, sheet_name, params: dict = None):
+        '''
+        returns a cached sheet.
+
+        Parameters
+        ----------
+        sheet_name : str
+            name of the sheet.
+        params : dict, optional
+            parameters the sheet was parsed with. A cached sheet is only
+            returned if it was parsed with the same parameters.
+
+        Returns
+        -------
+        pd.DataFrame or None if the sheet is not cached.
+
+        '''
+        if not self.available:
+            return None
+
+        entry = self.manifest['sheets'].get(sheet_name)
+
+        if entry is None or entry['params'] != _params_key(params):
+            return None
+
+        try:
+            table = feather.read_table(self.cache_dir / entry['file'])
+        except (OSError, pa.ArrowException):
+            return None
+
+        return _decode(table)
+
+    def put(self, sheet_name, d, params: dict = None) -> None:
+        '''
+        stores a parsed sheet in the cache. Failing to write the cache (e.g.
+        no write permission next to the workbook) only issues a warning.
+
+        Parameters
+        ----------
+        sheet_name : str
+            name of the sheet.
+        d : pd.DataFrame
+            parsed sheet.
+        params : dict, optional
+            parameters the sheet was parsed with.
+
+        '''
+        if not self.available:
+            return
+
+        manifest = self.manifest
+        file = hashlib.sha1(sheet_name.encode('utf-8')).hexdigest()[:16] + '.feather'
+
+        try:
+            self.cache_dir.mkdir(parents = True, exist_ok = True)
+            feather.write_feather(_encode(d), self.cache_dir / file,
+                                  compression = 'zstd')
+
+            manifest['sheets'][sheet_name] = {'file': file,
+                                              'params': _params_key(params),
+                                              'fingerprint': self.fingerprints.get(sheet_name)}
+            self._write_manifest(manifest)
+
+        except (OSError, pa.ArrowException) as e:
+            warnings.warn('sheet ' + sheet_name + ' could not be cached: ' + str(e))
+
+    def refresh(self) -> None:
+        '''
+        forgets the validated manifest and the fingerprints if the size or
+        mtime of the workbook changed since the manifest was validated, so 
+        long-lived loaders (see resy.data_loader.LazyLoader) don't serve 
+        sheets of an outdated workbook
+        
+        '''
+        if self._manifest is None:
+            self._fingerprints = None
+            return
+        
+        stat = self.workbook.stat()
+        if (self._manifest.get('size') != stat.st_size or 
+            self._manifest.get('mtime') != stat.st_mtime_ns):
+            self._manifest = None
+            self._fingerprints = None
+
+    def clear(self) -> None:
+        '''
+        removes all cached sheets
+
+        '''
+        if self.cache_dir.exists():
+            for file in self.cache_dir.iterdir():
+                if file.suffix in ('.feather', '.json'):
+                    file.unlink()
+
+        self._manifest = None
+
+    def _validate(self) -> dict:
+        '''
+        compares the stored manifest to the current state of the workbook and
+        removes the sheets that were modified from the cache
+
+        Returns
+        -------
+        manifest : dict
+
+        '''
+        stat = self.workbook.stat()
+        state = {'path': str(self.workbook.resolve()),
+                 'size': stat.st_size,
+                 'mtime': stat.st_mtime_ns}
+
+        try:
+            with open(self.cache_dir / self.manifest_name, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+        if manifest is not None and all([manifest.get(key) == state[key]
+                                         for key in state]):
+            return manifest
+
+        #size or mtime changed (or no cache yet): content hash decides
+        state['sha256'] = _file_hash(self.workbook)
+
+        if manifest is not None and (manifest.get('path') == state['path'] and
+                                     manifest.get('sha256') == state['sha256']):
+            #workbook touched, but not modified
+            manifest.update(state)
+            self._write_manifest(manifest)
+            return manifest
+
+        state['sheets'] = {}
+
+        if manifest is not None and manifest.get('path') == state['path']:
+            #keep the sheets that didn't change
+            for sheet_name, entry in manifest.get('sheets', {}).items():
+                fingerprint = entry.get('fingerprint')
+                if (fingerprint is not None and 
+                    fingerprint == self.fingerprints.get(sheet_name)):
+                    state['sheets'][sheet_name] = entry
+                else:
+                    (self.cache_dir / entry['file']).unlink(missing_ok = True)
+
+            self._write_manifest(state)
+
+        elif manifest is not None:
+            self.clear()
+
+        return state
+
+    def _write_manifest(self, manifest) -> None:
+        self.cache_dir.mkdir(parents = True, exist_ok = True)
+
+        #write to temporary file first, so readers never see partial manifests
+        tmp = self.cache_dir / (self.manifest_name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.cache_dir / self.manifest_name)
+
+
+def _file_hash(path, chunksize = 2**20) -> str:
+    '''
+    sha256 of a file, read in chunks
+    '''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _sheet_fingerprints(path) -> dict:
+    '''
+    fingerprints of all sheets of an xlsx workbook, read from the crc32 in the
+    zip directory (no sheet is decompressed). A fingerprint changes if the 
+    sheet, the shared strings or the styles of the workbook change.
+
+    Returns
+    -------
+    dict
+        sheet name: fingerprint. Empty if the workbook is not an xlsx file.
+
+    '''
+    try:
+        with zipfile.ZipFile(path) as z:
+            crcs = {info.filename: info.CRC for info in z.infolist()}
+            workbook = ElementTree.fromstring(z.read('xl/workbook.xml'))
+            rels = ElementTree.fromstring(z.read('xl/_rels/workbook.xml.rels'))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return {}
+
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+    common = '{}:{}'.format(crcs.get('xl/sharedStrings.xml'),
+                            crcs.get('xl/styles.xml'))
+
+    fingerprints = {}
+    for sheet in workbook.iter('{%s}sheet' % _NS_MAIN):
+        target = targets.get(sheet.get('{%s}id' % _NS_REL), '')
+        target = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+        
+        if target in crcs:
+            fingerprints[sheet.get('name')] = '{}:{}'.format(crcs[target], common)
+
+    return fingerprints
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+def _params_key(params) -> str:
+    return json.dumps(params, sort_keys = True, default = str)
+
+#value kinds of columns that contain mixed types (excel columns often mix
+#numbers and strings, which arrow can't store in one column)
+_KINDS = {'nan': 0, 'str': 1, 'float': 2, 'int': 3, 'bool': 4, 'datetime': 5,
+          'date': 6, 'time': 7}
+
+#kinds stored as iso strings
+_ISO_KINDS = [_KINDS['datetime'], _KINDS['date'], _KINDS['time']]
+
+def _encode(d: pd.DataFrame):
+    '''
+    converts a sheet to an arrow table. Mixed type columns are stored as a
+    string column plus a column with the original value kind.
+    '''
+    arrays, names, mixed = [], [], []
+
+    for name in d.columns:
+        col = d[name]
+        try:
+            arrays.append(pa.Array.from_pandas(col))
+            names.append(str(name))
+        except pa.ArrowException:
+            kinds = np.array([_kind(v) for v in col], dtype = np.int8)
+            values = [None if k == _KINDS['nan']
+                      else v.isoformat() if k in _ISO_KINDS
+                      else str(v)
+                      for v, k in zip(col, kinds)]
+            arrays += [pa.array(values, type = pa.string()), pa.array(kinds)]
+            names += [str(name), str(name) + '\x00kind']
+            mixed.append(str(name))
+
+    return pa.Table.from_arrays(arrays, names = names,
+                                metadata = {'resy_mixed': json.dumps(mixed)})
+
+def _decode(table) -> pd.DataFrame:
+    '''
+    inverse of _encode
+    '''
+    mixed = json.loads((table.schema.metadata or {})
+                       .get(b'resy_mixed', b'[]'))
+    d = table.to_pandas()
+
+    for name in mixed:
+        kinds = d.pop(name + '\x00kind').to_numpy()
+        d[name] = [_unkind(v, k) for v, k in zip(d[name], kinds)]
+
+    return d
+
+def _kind(value) -> int:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return _KINDS['nan']
+    if isinstance(value, (bool, np.bool_)):
+        return _KINDS['bool']
+    if isinstance(value, (int, np.integer)):
+        return _KINDS['int']
+    if isinstance(value, (float, np.floating)):
+        return _KINDS['float']
+    #datetime is a subclass of date, so it is checked first
+    if isinstance(value, (datetime.datetime, pd.Timestamp)):
+        return _KINDS['datetime']
+    if isinstance(value, datetime.date):
+        return _KINDS['date']
+    if isinstance(value, datetime.time):
+        return _KINDS['time']
+    return _KINDS['str']
+
+def _unkind(value, kind):
+    if kind == _KINDS['nan']:
+        return np.nan
+    if kind == _KINDS['bool']:
+        return value == 'True'
+    if kind == _KINDS['int']:
+        return int(value)
+    if kind == _KINDS['float']:
+        return float(value)
+    if kind == _KINDS['datetime']:
+        return pd.Timestamp(value)
+    if kind == _KINDS['date']:
+        return datetime.date.fromisoformat(value)
+    if kind == _KINDS['time']:
+        return datetime.time.fromisoformat(value)
+    return value
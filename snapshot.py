@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:22:51 2026
+
+@author: mischasch
+"""
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from resy.field import Field
+from resy.well import Well
+from resy.welltop import Welltop
+from resy.casing_design import CasingDesign
+from resy.survey import Survey
+from resy.hydraulic_characterisation import PTA, IPR
+
+# =============================================================================
+# Snapshot file layout (all numbers little endian):
+#     magic           8 bytes  b'RESYSNAP'
+#     version         uint32
+#     header length   uint32   length of the json header [bytes]
+#     data offset     uint64   start of the array data, aligned to 64 bytes
+#     header          json     field and well data, array directory
+#     data            arrays   float64, each aligned to 64 bytes
+#
+# Survey and casing columns of all wells are concatenated into one array per
+# column. Wells refer to their rows by offset and number of rows.
+# =============================================================================
+MAGIC = b'RESYSNAP'
+VERSION = 1
+
+_PREFIX = struct.Struct('<8sIIQ')
+_ALIGN = 64
+
+#the stored properties of the wells, so new properties are written too
+WELL_ATTRIBUTES = Well._stored
+WELLTOP_ATTRIBUTES = ['z_MD', 'z_TVD', 'z_NN', 'x', 'y']
+IPR_ATTRIBUTES = ['b', 'c', 'measurement_depth', 'range_certain',
+                  'range_uncertain', 'description', 'origin']
+PTA_ATTRIBUTES = ['k', 'phi', 'aquifer_thickness', 'kh', 'Kh', 'phih', 'Sc',
+                  'skin', 'wbs_type', 'well_model', 'skin_type',
+                  'reservoir_model', 'boundary_model', 'm_d_comp']
+SURVEY_ARRAYS = ['md', 'incl', 'azim', 'tvd']
+CASING_ARRAYS = ['ls', 'ids', 'ods', 'wgs', 'z_from', 'z_to']
+
+def write_snapshot(field: Field, path) -> None:
+    '''
+    writes a field to a snapshot file. The file is written to a temporary
+    file first, so an existing snapshot is only replaced by a complete one.
+
+    Parameters
+    ----------
+    field : Field
+        field to write.
+    path : str or Path
+        path of the snapshot file.
+
+    Returns
+    -------
+    None.
+
+    '''
+    wells = []
+    columns = {'survey/' + name: [] for name in SURVEY_ARRAYS}
+    columns.update({'casing/' + name: [] for name in CASING_ARRAYS})
+    rows = {'survey': 0, 'casing': 0}
+
+    for well in field.wells:
+        entry = {'uwi': well.uwi}
+        entry.update({attribute: getattr(well, attribute)
+                      for attribute in WELL_ATTRIBUTES})
+
+        entry['welltops'] = {name: {attribute: getattr(welltop, attribute)
+                                    for attribute in WELLTOP_ATTRIBUTES}
+                             for name, welltop in well.welltops.items()}
+
+        if well.ipr is not None:
+            entry['ipr'] = {attribute: getattr(well.ipr, attribute)
+                            for attribute in IPR_ATTRIBUTES}
+        if well.pta is not None:
+            entry['pta'] = {attribute: getattr(well.pta, attribute)
+                            for attribute in PTA_ATTRIBUTES}
+
+        if well.survey is not None:
+            entry['survey'] = _add_rows(columns, rows, 'survey', well.survey,
+                                        SURVEY_ARRAYS, len(well.survey.md))
+
+        casing_design = well.casing_design
+        if casing_design is not None:
+            entry['casing'] = _add_rows(columns, rows, 'casing', casing_design,
+                                        CASING_ARRAYS, len(casing_design.ls))
+            entry['casing']['descr'] = (None if casing_design.descr is None
+                                        else list(casing_design.descr))
+
+        wells.append(entry)
+
+    #array directory, offsets relative to the data offset
+    arrays, offset = {}, 0
+    for name, parts in columns.items():
+        length = sum([len(part) for part in parts])
+        arrays[name] = {'offset': offset, 'length': length}
+        offset = _aligned(offset + length * 8)
+
+    header = json.dumps({'name': field.name,
+                         'wells': wells,
+                         'arrays': arrays,
+                         'row_hashes': {sheet_name: [list(hashes.index),
+                                                     [int(h) for h in hashes]]
+                                        for sheet_name, hashes
+                                        in field._row_hashes.items()}},
+                        default = _json_default).encode('utf-8')
+
+    data_offset = _aligned(_PREFIX.size + len(header))
+
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header), data_offset))
+        f.write(header)
+
+        for name, parts in columns.items():
+            f.seek(data_offset + arrays[name]['offset'])
+            for part in parts:
+                f.write(np.ascontiguousarray(part, dtype = '<f8').tobytes())
+
+        #pad the file to the end of the last array
+        f.truncate(data_offset + offset)
+
+    os.replace(tmp, path)
+
+def read_snapshot(path, mmap: bool = True) -> Field:
+    '''
+    reads a field from a snapshot file.
+
+    Parameters
+    ----------
+    path : str or Path
+        path of the snapshot file.
+    mmap : bool, optional
+        if True, the survey and casing arrays are memory-mapped instead of
+        read into memory. Pages are loaded on first access and shared with
+        other processes mapping the same snapshot. The mapping is copy on
+        write: modifying an array never changes the file. The default is True.
+
+    Returns
+    -------
+    Field
+
+    '''
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+
+        if len(prefix) < _PREFIX.size or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(str(path) + ' is not a resy snapshot')
+        
+        _, version, header_length, data_offset = _PREFIX.unpack(prefix)
+        if version > VERSION:
+            raise ValueError('snapshot version ' + str(version) + ' is not '
+                             'supported (supported up to ' + str(VERSION) + ')')
+
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+        size = os.fstat(f.fileno()).st_size - data_offset
+        if size == 0:
+            data = np.empty(0, dtype = np.uint8)
+        elif mmap:
+            data = np.memmap(f, dtype = np.uint8, mode = 'c', offset = data_offset)
+        else:
+            f.seek(data_offset)
+            data = np.fromfile(f, dtype = np.uint8)
+
+    arrays = {name: data[entry['offset']:entry['offset'] + entry['length'] * 8].view('<f8')
+              for name, entry in header['arrays'].items()}
+
+    wells = [_well(entry, arrays) for entry in header['wells']]
+
+    field = Field(header['name'], wells = wells)
+    field._row_hashes = {sheet_name: pd.Series(hashes, index = pd.Index(uwis, name = 'UWI'),
+                                               dtype = 'uint64')
+                         for sheet_name, (uwis, hashes) in header['row_hashes'].items()}
+
+    return field
+
+def _well(entry: dict, arrays: dict) -> Well:
+    '''
+    well of an entry of the snapshot header
+    '''
+    #properties missing in older snapshots are None
+    well = Well(entry['uwi'], **{attribute: entry.get(attribute)
+                                 for attribute in WELL_ATTRIBUTES})
+
+    well.welltops = {name: Welltop(name, **welltop)
+                     for name, welltop in entry['welltops'].items()}
+
+    if 'ipr' in entry:
+        ipr = dict(entry['ipr'])
+        for attribute in ['range_certain', 'range_uncertain']:
+            if ipr[attribute] is not None:
+                ipr[attribute] = tuple(ipr[attribute])
+        well.ipr = IPR(**ipr)
+    else:
+        well.ipr = None
+
+    well.pta = PTA(**entry['pta']) if 'pta' in entry else None
+
+    if 'survey' in entry:
+        well.survey = Survey(*_get_rows(arrays, 'survey', entry['survey'],
+                                        SURVEY_ARRAYS))
+
+    if 'casing' in entry:
+        ls, ids, ods, wgs, z_from, z_to = _get_rows(arrays, 'casing',
+                                                    entry['casing'], CASING_ARRAYS)
+        descr = entry['casing']['descr']
+        well.casing_design = CasingDesign(ls, ids = ids, ods = ods, wgs = wgs,
+                                          z_from = z_from, z_to = z_to,
+                                          descr = None if descr is None
+                                          else np.array(descr, dtype = object))
+
+    return well
+
+def _add_rows(columns: dict, rows: dict, table: str, obj, names: list,
+              n: int) -> dict:
+    '''
+    appends the arrays of an object (survey or casing design) to the
+    columns of a table. Arrays that are None are stored as NaN rows and
+    flagged as missing.
+    '''
+    missing = []
+    for name in names:
+        values = getattr(obj, name)
+        if values is None:
+            missing.append(name)
+            values = np.full(n, np.nan)
+        columns[table + '/' + name].append(np.asarray(values, dtype = float))
+
+    entry = {'offset': rows[table], 'rows': n, 'missing': missing}
+    rows[table] += n
+
+    return entry
+
+def _get_rows(arrays: dict, table: str, entry: dict, names: list) -> list:
+    '''
+    views of the rows of an object (survey or casing design) in the columns
+    of a table
+    '''
+    start, end = entry['offset'], entry['offset'] + entry['rows']
+
+    return [None if name in entry['missing']
+            else arrays[table + '/' + name][start:end]
+            for name in names]
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+def _json_default(value):
+    '''
+    json representation of numpy values
+    '''
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('value of type ' + type(value).__name__ + ' can not be '
+                    'stored in a snapshot')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 08:41:27 2026
+
+@author: mischasch
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist, squareform
+
+class WelltopIndex():
+    '''
+    spatial index (KD-tree) of the penetrations of a welltop in the wells of
+    a field. Answers nearest neighbour and radius queries without computing
+    all pairwise distances.
+
+    Coordinates are x, y and z_TVD of the welltop, all in m. Wells without
+    the welltop are not indexed, wells with incomplete coordinates are not
+    indexed either (with a warning).
+    '''
+    def __init__(self, field, welltop_name: str, horizontal: bool = False):
+        '''
+
+
+        Parameters
+        ----------
+        field : Field or FieldView
+            wells to index.
+        welltop_name : str
+            welltop, e.g. 'top reservoir'.
+        horizontal : bool, optional
+            if True, only x and y are used (horizontal distances, e.g. for
+            doublet spacing). The default is False (x, y and z_TVD).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.welltop_name = welltop_name
+        self.horizontal = horizontal
+
+        prefix = 'welltops.' + welltop_name + '.'
+        dims = ['x', 'y'] if horizontal else ['x', 'y', 'z_TVD']
+
+        present = np.asarray(pd.notna(field.column(prefix + 'name')), dtype = bool)
+        points = np.column_stack([np.asarray(field.column(prefix + dim), dtype = float)
+                                  for dim in dims])
+        complete = present & np.isfinite(points).all(axis = 1)
+
+        uwis = np.array(field.uwis, dtype = object)
+        if (present & ~complete).any():
+            warnings.warn('wells with incomplete coordinates of ' + welltop_name
+                          + ' ignored: ' + ', '.join([str(uwi) for uwi in
+                                                      uwis[present & ~complete]]))
+
+        #uwis and coordinates of the indexed wells, row i of points is well i
+        self.uwis = uwis[complete]
+        self.points = points[complete]
+        self._rows = {uwi: row for row, uwi in enumerate(self.uwis)}
+
+        self.tree = cKDTree(self.points)
+
+    def __len__(self) -> int:
+        return len(self.uwis)
+
+    def __contains__(self, uwi) -> bool:
+        return uwi in self._rows
+
+    def distances(self) -> pd.DataFrame:
+        '''
+        matrix of the distances between all indexed wells
+
+        Returns
+        -------
+        pd.DataFrame
+            row and column headers are the UWIs, cell values are distances [m].
+
+        '''
+        d = squareform(pdist(self.points)) if len(self) > 1 else np.zeros((len(self), len(self)))
+
+        return pd.DataFrame(d, index = pd.Index(self.uwis, name = 'UWI'),
+                            columns = pd.Index(self.uwis, name = 'UWI'))
+
+    def nearest(self, uwi, k: int = 1) -> pd.Series:
+        '''
+        the k wells nearest to a well
+
+        Parameters
+        ----------
+        uwi : str
+            UWI of an indexed well.
+        k : int, optional
+            number of wells. The default is 1.
+
+        Returns
+        -------
+        pd.Series
+            distances [m] by UWI, nearest first. Shorter than k if fewer
+            wells are indexed.
+
+        '''
+        if uwi not in self._rows:
+            raise ValueError('Well ' + str(uwi) + ' has no ' + self.welltop_name
+                             + ' with coordinates')
+
+        k = min(k, len(self) - 1)
+        if k < 1:
+            return _series([], [])
+
+        #k + 1, as the well itself is found as well
+        d, rows = self.tree.query(self.points[self._rows[uwi]], k = k + 1)
+        keep = rows != self._rows[uwi]
+
+        return _series(self.uwis[rows[keep][:k]], d[keep][:k])
+
+    def within(self, point, r: float) -> pd.Series:
+        '''
+        all wells within a distance of a point
+
+        Parameters
+        ----------
+        point : array of float
+            (x, y, z_TVD), or (x, y) for a horizontal index [m].
+        r : float
+            distance [m].
+
+        Returns
+        -------
+        pd.Series
+            distances [m] by UWI, nearest first.
+
+        '''
+        point = np.asarray(point, dtype = float)
+        if point.shape != (self.points.shape[1],):
+            raise ValueError('point must have ' + str(self.points.shape[1])
+                             + ' coordinates')
+
+        rows = np.asarray(self.tree.query_ball_point(point, r), dtype = np.intp)
+        d = np.linalg.norm(self.points[rows] - point, axis = 1)
+        order = np.argsort(d, kind = 'stable')
+
+        return _series(self.uwis[rows[order]], d[order])
+
+    def pairs(self, r: float) -> pd.DataFrame:
+        '''
+        all pairs of wells closer than a distance, e.g. to check well
+        interference or doublet spacing
+
+        Parameters
+        ----------
+        r : float
+            distance [m].
+
+        Returns
+        -------
+        pd.DataFrame
+            columns 'UWI 1', 'UWI 2' and 'distance' [m], one row per pair.
+
+        '''
+        pairs = self.tree.query_pairs(r, output_type = 'ndarray')
+        d = np.linalg.norm(self.points[pairs[:, 0]] - self.points[pairs[:, 1]],
+                           axis = 1)
+
+        return pd.DataFrame({'UWI 1': self.uwis[pairs[:, 0]],
+                             'UWI 2': self.uwis[pairs[:, 1]],
+                             'distance': d})
+
+def _series(uwis, d) -> pd.Series:
+    return pd.Series(np.asarray(d, dtype = float),
+                     index = pd.Index(list(uwis), name = 'UWI', dtype = object),
+                     name = 'distance')
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:05:12 2026
+
+@author: mischasch
+"""
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from itertools import chain, repeat
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+#tables of the store. Every table is indexed by UWI (first column of the
+#primary key), welltops are additionally indexed by name and depth for
+#partial loads (see SQLiteLoader). Surveys can have tens of thousands of
+#stations, so they are stored as one row per well, with the columns as 
+#float64 arrays (see survey_arrays)
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS wells (
+    uwi TEXT PRIMARY KEY,
+    name TEXT,
+    T_res REAL,
+    p_res REAL,
+    S REAL,
+    k REAL,
+    z_ESP REAL,
+    welltype TEXT
+);
+
+CREATE TABLE IF NOT EXISTS welltops (
+    uwi TEXT NOT NULL REFERENCES wells(uwi) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    z_MD REAL,
+    z_TVD REAL,
+    z_NN REAL,
+    x REAL,
+    y REAL,
+    PRIMARY KEY (uwi, name)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS welltops_z_MD ON welltops(name, z_MD);
+CREATE INDEX IF NOT EXISTS welltops_z_TVD ON welltops(name, z_TVD);
+CREATE INDEX IF NOT EXISTS welltops_z_NN ON welltops(name, z_NN);
+
+CREATE TABLE IF NOT EXISTS ipr (
+    uwi TEXT PRIMARY KEY REFERENCES wells(uwi) ON DELETE CASCADE,
+    b REAL,
+    c REAL,
+    measurement_depth,
+    certain_start REAL,
+    certain_end REAL,
+    uncertain_start REAL,
+    uncertain_end REAL,
+    description TEXT,
+    origin TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pta (
+    uwi TEXT PRIMARY KEY REFERENCES wells(uwi) ON DELETE CASCADE,
+    k REAL,
+    phi REAL,
+    aquifer_thickness REAL,
+    kh REAL,
+    transmissivity REAL,
+    phih REAL,
+    Sc REAL,
+    skin REAL,
+    wbs_type TEXT,
+    well_model TEXT,
+    skin_type TEXT,
+    reservoir_model TEXT,
+    boundary_model TEXT,
+    m_d_comp REAL
+);
+
+CREATE TABLE IF NOT EXISTS casing_sections (
+    uwi TEXT NOT NULL REFERENCES wells(uwi) ON DELETE CASCADE,
+    section INTEGER NOT NULL,
+    l REAL,
+    id REAL,
+    od REAL,
+    wg REAL,
+    z_from REAL,
+    z_to REAL,
+    descr TEXT,
+    PRIMARY KEY (uwi, section)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS surveys (
+    uwi TEXT PRIMARY KEY REFERENCES wells(uwi) ON DELETE CASCADE,
+    stations INTEGER NOT NULL,
+    md BLOB,
+    incl BLOB,
+    azim BLOB,
+    tvd BLOB
+);
+'''
+
+#columns of the tables (without uwi and position columns)
+WELL_COLUMNS = ['name', 'T_res', 'p_res', 'S', 'k', 'z_ESP', 'welltype']
+WELLTOP_COLUMNS = ['z_MD', 'z_TVD', 'z_NN', 'x', 'y']
+IPR_COLUMNS = ['b', 'c', 'measurement_depth', 'certain_start', 'certain_end',
+               'uncertain_start', 'uncertain_end', 'description', 'origin']
+#PTA attribute: column (column names are case insensitive, so kh and Kh
+#can't both be used)
+PTA_COLUMNS = {'k': 'k', 'phi': 'phi', 
+               'aquifer_thickness': 'aquifer_thickness', 'kh': 'kh', 
+               'Kh': 'transmissivity', 'phih': 'phih', 'Sc': 'Sc', 
+               'skin': 'skin', 'wbs_type': 'wbs_type', 
+               'well_model': 'well_model', 'skin_type': 'skin_type',
+               'reservoir_model': 'reservoir_model', 
+               'boundary_model': 'boundary_model', 'm_d_comp': 'm_d_comp'}
+CASING_COLUMNS = ['l', 'id', 'od', 'wg', 'z_from', 'z_to', 'descr']
+SURVEY_COLUMNS = ['md', 'incl', 'azim', 'tvd']
+
+TABLES = ['wells', 'welltops', 'ipr', 'pta', 'casing_sections', 'surveys']
+
+def connect(database, read_only: bool = False) -> sqlite3.Connection:
+    '''
+    opens a connection to a store. Connections may be shared between threads,
+    but must not be used by two threads at the same time (see ConnectionPool).
+
+    Parameters
+    ----------
+    database : str or Path
+        path to the SQLite database.
+    read_only : bool, optional
+        if True, the database is opened read-only. The default is False.
+
+    Returns
+    -------
+    sqlite3.Connection
+
+    '''
+    if read_only:
+        connection = sqlite3.connect(Path(database).resolve().as_uri() + '?mode=ro',
+                                     uri = True, check_same_thread = False)
+    else:
+        connection = sqlite3.connect(database, check_same_thread = False)
+        #readers don't block the writer and vice versa
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+
+    connection.execute('PRAGMA foreign_keys = ON')
+
+    return connection
+
+class ConnectionPool():
+    '''
+    small pool of read-only connections to a store, for readers running in
+    several threads. A connection is used by one thread at a time.
+    '''
+    def __init__(self, database, size: int = 4):
+        '''
+
+
+        Parameters
+        ----------
+        database : str or Path
+            path to the SQLite database.
+        size : int, optional
+            maximum number of open connections. The default is 4.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.database = database
+        self.size = size
+
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        '''
+        context manager that borrows a connection from the pool. Blocks if
+        all connections are in use.
+
+        '''
+        if self._closed:
+            raise ValueError('connection pool is closed')
+
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._open()
+
+        try:
+            yield connection
+        finally:
+            if self._closed:
+                connection.close()
+            else:
+                self._idle.put(connection)
+
+    def close(self) -> None:
+        '''
+        closes all idle connections. Borrowed connections are closed when
+        they are returned.
+
+        '''
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _open(self) -> sqlite3.Connection:
+        '''
+        opens a new connection if the pool is not full, else waits for an
+        idle one
+        '''
+        with self._lock:
+            full = self._opened >= self.size
+            if not full:
+                self._opened += 1
+
+        if full:
+            return self._idle.get()
+
+        return connect(self.database, read_only = True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class SQLiteWriter():
+    '''
+    writes the wells of a field to a SQLite store (see SCHEMA). The data of
+    every written well replaces the data stored for the well before.
+    '''
+    def __init__(self, database):
+        '''
+
+
+        Parameters
+        ----------
+        database : str or Path
+            path to the SQLite database. Created if it doesn't exist.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.database = database
+
+    def write(self, field, wells: list = None) -> None:
+        '''
+        writes the wells of a field in one transaction. Rows are inserted
+        in bulk, table by table.
+
+        Parameters
+        ----------
+        field : Field
+            field to write.
+        wells : list of str, optional
+            UWIs of the wells to write. The default is None (all wells).
+
+        Returns
+        -------
+        None.
+
+        '''
+        if isinstance(wells, str):
+            wells = [wells]
+
+        written = [well for well in field.wells
+                   if wells is None or well.uwi in wells]
+        uwis = [well.uwi for well in written]
+
+        connection = connect(self.database)
+        try:
+            with connection:
+                connection.executescript(SCHEMA)
+
+                #rows of all other tables are deleted by the foreign keys
+                connection.execute('DELETE FROM wells WHERE uwi IN '
+                                   '(SELECT value FROM json_each(?))',
+                                   (json.dumps(uwis),))
+
+                _insert(connection, 'wells', ['uwi'] + WELL_COLUMNS,
+                        ([well.uwi] + [getattr(well, column)
+                                       for column in WELL_COLUMNS]
+                         for well in written))
+
+                _insert(connection, 'welltops', ['uwi', 'name'] + WELLTOP_COLUMNS,
+                        ([well.uwi, name] + [getattr(welltop, column)
+                                             for column in WELLTOP_COLUMNS]
+                         for well in written
+                         for name, welltop in well.welltops.items()))
+
+                _insert(connection, 'ipr', ['uwi'] + IPR_COLUMNS,
+                        (_ipr_row(well) for well in written
+                         if well.ipr is not None))
+
+                _insert(connection, 'pta', ['uwi'] + list(PTA_COLUMNS.values()),
+                        ([well.uwi] + [getattr(well.pta, attribute)
+                                       for attribute in PTA_COLUMNS]
+                         for well in written if well.pta is not None))
+
+                _insert(connection, 'casing_sections', 
+                        ['uwi', 'section'] + CASING_COLUMNS,
+                        chain.from_iterable(_casing_rows(well.uwi, well.casing_design)
+                                            for well in written 
+                                            if well.casing_design is not None))
+
+                _insert(connection, 'surveys', 
+                        ['uwi', 'stations'] + SURVEY_COLUMNS,
+                        (_survey_row(well.uwi, well.survey) for well in written 
+                         if well.survey is not None))
+        finally:
+            connection.close()
+
+def _insert(connection, table: str, columns: list, rows) -> None:
+    '''
+    bulk insert of rows (iterable of lists) into a table
+    '''
+    connection.executemany('INSERT INTO {} ({}) VALUES ({})'
+                           .format(table, ', '.join(columns),
+                                   ', '.join(['?'] * len(columns))),
+                           ([_sql_value(value) for value in row] for row in rows))
+
+def _sql_value(value):
+    '''
+    converts numpy scalars to python scalars, which sqlite3 can bind
+    '''
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _ipr_row(well) -> list:
+    ipr = well.ipr
+    certain = ipr.range_certain if ipr.range_certain is not None else (None, None)
+    uncertain = ipr.range_uncertain if ipr.range_uncertain is not None else (None, None)
+
+    return [well.uwi, ipr.b, ipr.c, ipr.measurement_depth,
+            certain[0], certain[1], uncertain[0], uncertain[1],
+            ipr.description, ipr.origin]
+
+def _casing_rows(uwi, casing_design):
+    '''
+    one row per casing section, built column-wise from the arrays
+    '''
+    n = len(casing_design.ls)
+
+    columns = [casing_design.ls, casing_design.ids, casing_design.ods,
+               casing_design.wgs, casing_design.z_from, casing_design.z_to,
+               casing_design.descr]
+    columns = [np.asarray(column).tolist() if column is not None else [None] * n
+               for column in columns]
+
+    return zip(repeat(uwi), range(n), *columns)
+
+def _survey_row(uwi, survey) -> list:
+    '''
+    one row per survey, the columns are stored as little endian float64
+    '''
+    return [uwi, len(survey.md)] + [None if column is None 
+                                    else np.asarray(column, dtype = '<f8').tobytes()
+                                    for column in [survey.md, survey.incl,
+                                                   survey.azim, survey.tvd]]
+
+def survey_arrays(row: dict) -> list:
+    '''
+    inverse of the row written for a survey: md, incl, azim and tvd arrays
+    (None if not stored)
+    '''
+    return [None if row[column] is None 
+            else np.frombuffer(row[column], dtype = '<f8').copy()
+            for column in SURVEY_COLUMNS]
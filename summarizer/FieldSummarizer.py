@@ -12,7 +12,7 @@ from resy.summarizer.WellSummarizer import *
 
 class FieldSummarizer(ABC):
     '''
-    ABC for all field summarizers
+    ABC for all field summarizers. Summarizes a Field or a FieldView.
     '''
     def __init__(self, field):
         #from resy import Field #put here to avoid circular import...
@@ -46,7 +46,7 @@ class FieldWellSummarizerPandas(FieldSummarizer, ABC):
 
         Parameters
         ----------
-        field : FIELD.
+        field : Field or FieldView.
         sumtpye : str
             for available sumtypes, see documentation 
             of class WellSummarizerPandas.
@@ -32,7 +32,7 @@ class Survey():
         None.
 
         '''   
-        self.md = md
+        self.md = np.asarray(md, dtype = float)
         self.incl = incl
         self.azim = azim
         self.tvd = tvd
@@ -53,9 +53,11 @@ class Survey():
                 raise ValueError('object must be an iterable')
                 
             #check length
-            if len(new_azim != len(self.md)):
+            if len(new_azim) != len(self.md):
                 raise ValueError('Azimuth array must be of equal length as the MD array')
             
+            new_azim = np.asarray(new_azim, dtype = float)
+            
         self._azim = new_azim
         
    #inclination vector
@@ -71,14 +73,33 @@ class Survey():
                 raise ValueError('object must be an iterable')
                 
             #check length
-            if len(new_incl != len(self.md)):
+            if len(new_incl) != len(self.md):
                 raise ValueError('Inclination array must be of equal length as the MD array')
             
+            new_incl = np.asarray(new_incl, dtype = float)
+            
         self._incl = new_incl
         
 # =============================================================================
 # Methods
 # =============================================================================
+    def __copy__(self):
+        '''
+        copy that shares the arrays with this survey. The copy gets 
+        read-only views, so it can't modify this survey. The arrays of this
+        survey stay writable.
+        '''
+        new = Survey.__new__(Survey)
+        new.__dict__.update(self.__dict__)
+        
+        for name, values in new.__dict__.items():
+            if isinstance(values, np.ndarray):
+                values = values.view()
+                values.flags.writeable = False
+                new.__dict__[name] = values
+                
+        return new
+    
     def get_tvd_at_md(md):
         '''
         returns TVD values at one or more specific MD depths
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:21:09 2026
+
+@author: mischasch
+"""
+import numpy as np
+import pytest
+
+from resy import brine
+
+def test_table():
+    rng = np.random.default_rng(0)
+    T, p, S = (rng.uniform(0, 250, 10000), rng.uniform(1, 1001, 10000), 
+               rng.uniform(0, 350000, 10000))
+    
+    rho, mu = brine.BrineTable().properties(T, p, S)
+    assert rho == pytest.approx(brine.density(T, p, S), rel = 1e-5)
+    assert mu == pytest.approx(brine.viscosity(T, S), rel = 1e-3)
+    assert np.isnan(brine.BrineTable().properties(300., 100., 0.)[0])
+    
+def test_cache():
+    cache = brine.BrineCache(maxsize = 3)
+    
+    rho, mu = cache.properties(130., 250., 1500.)
+    assert rho == pytest.approx(brine.density(130., 250., 1500.), rel = 1e-5)
+    assert cache.properties(130., 250., 1500.) == (rho, mu)
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    #arrays: every distinct condition is looked up once
+    rho, mu = cache.properties([130., 130., 300.], 250., [1500., 1500., 0.])
+    assert rho.shape == (3,)
+    assert rho[2] == brine.density(300., 250., 0.) #outside of the table
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.hit_rate == 0.5
+    
+    cache.properties(np.arange(10.), 100., 0.)
+    assert len(cache) == 3
+    
+    cache.clear()
+    assert len(cache) == 0 and np.isnan(cache.hit_rate)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 18:40:12 2026
+
+@author: mischasch
+"""
+import os
+
+import numpy as np
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import resy
+from resy.config import config
+from resy.data_loader import (HydraulikDBLoader, SurveyLoader, SQLiteLoader,
+                              HYDRAULIKDB_SHEETS)
+from resy.sheet_cache import SheetCache
+from resy.sqlite_store import SQLiteWriter
+from resy.survey import Survey
+from resy.instrumentation import Instrumentation, MemorySink, JSONLinesSink
+
+UWIS = ['W0', 'W1', 'W2', 'W3']
+
+def write_hydraulikdb(path):
+    '''
+    writes a minimal HydraulikDB with four wells and padded sheets
+    '''
+    wb = Workbook()
+    ws = wb.active
+    ws.title = '1a Verlauf'
+    ws.append(['UWI', 'Bohrung', 'Z1_mMD_TR', 'Z1_mTVD_TR', 'X_TR', 'Y_TR',
+               'GOK_mNN', 'Z1_mMD_ET', 'Z1_mTVD_ET', 'X_ET', 'Y_ET'])
+    for i, uwi in enumerate(UWIS):
+        ws.append([uwi, 'Well ' + str(i), 3000 + i, 2900 + i, 1000 * i, 0,
+                   500, 3500, 3400, 1000 * i, 0])
+    for _ in range(50): #formatting-padded tail
+        ws.append([None] * 11)
+
+    ws = wb.create_sheet('2a Temperatur')
+    ws.append(['title'])
+    ws.append([None])
+    ws.append(['UWI', 'chk1', 'TRESmax'])
+    for i, uwi in enumerate(UWIS):
+        ws.append([uwi, 0, 10.])
+        ws.append([uwi, 1, 100. + i])
+
+    ws = wb.create_sheet('3a Potential')
+    ws.append(['title'])
+    ws.append([None])
+    ws.append(['UWI', 'chk', 'PRES_TR'])
+    for i, uwi in enumerate(UWIS):
+        ws.append([uwi, 1, 300. + i])
+
+    ws = wb.create_sheet('8 Mineralisation')
+    ws.append(['UWI', 'Mineralisation'])
+    for i, uwi in enumerate(UWIS):
+        ws.append([uwi, 1000. * i if i > 0 else ' '])
+
+    ws = wb.create_sheet('5a Produktivität')
+    ws.append(['title'])
+    ws.append([None])
+    ws.append(['Bohrung', None, None, 'B [-]', 'C [-]', None, 'Sicher', None,
+               'Unsicher', None, None, None])
+    for i, uwi in enumerate(UWIS[:2]):
+        ws.append(['Well ' + str(i), None, uwi, 0.1, 0.01, None, 10, 50, 5,
+                   80, ['BDS', 'TKP'][i], 'test'])
+
+    ws = wb.create_sheet('4d Hydraulik PTA')
+    ws.append(['title'])
+    ws.append([None])
+    ws.append(['chk', 'chk Bohrung', 'Permeabilität', 'Porosität',
+               'Mächtigkeit Auswertung', 'Transmissibilität',
+               'Transmissivität', 'Porosität x Mächtigkeit',
+               'Speicherkoeffizient', 'M=D', 'Skin/Skin0'])
+    ws.append([1, 'W2', 100, 0.1, 50, 5000, 1e-4, 5, 1e-4, 1, -2])
+
+    ws = wb.create_sheet('14 Casing Design')
+    ws.append(['title'])
+    ws.append(['UWI', 'Sektion', 'Teufe von', 'Teufe bis', 'OD', 'ID',
+               'Wandstärke'])
+    ws.append(['W0', 'prod', 1000, 0, 13.375, 0.3, 0.5])
+    ws.append(['W0', 'liner', 3000, 1000, 9.625, 0.2, 0.5])
+
+    wb.save(path)
+
+@pytest.fixture
+def hydraulikdb(tmp_path, monkeypatch):
+    path = tmp_path / 'HydraulikDB.xlsx'
+    write_hydraulikdb(path)
+
+    #restored after the test, so other test modules see the original config
+    monkeypatch.setitem(config['DataLoader'], 'HydraulikDB', str(path))
+    monkeypatch.setitem(config['DataLoader'], 'workers', '1')
+
+    return path
+
+def test_load(hydraulikdb):
+    field = resy.Field('test')
+    changes = field.refresh_from_database()
+
+    assert field.uwis == UWIS
+    assert (changes.change == 'added').all()
+
+    assert field['W1'].T_res == 101
+    assert field['W1'].p_res == 301
+    assert np.isnan(field['W0'].S)
+    assert field['W0'].ipr.measurement_depth == 3000
+    assert field['W1'].ipr.measurement_depth == 700
+    assert field['W3'].ipr.b is None
+    assert field['W2'].pta.skin == -2
+    assert list(field['W0'].casing_design.ls) == [2000, 1000]
+    assert field['W0'].welltops['top reservoir'].z_TVD == 2900
+
+def test_cache(hydraulikdb):
+    loader = HydraulikDBLoader(resy.Field(), use_cache = True)
+    cold = loader.read_sheets()
+
+    warm = HydraulikDBLoader(resy.Field(), use_cache = True).read_sheets()
+
+    for sheet_name in cold:
+        assert cold[sheet_name].equals(warm[sheet_name])
+
+def test_cache_hit(hydraulikdb):
+    cold = HydraulikDBLoader(resy.Field(), use_cache = True).read_sheet('2a Temperatur')
+    
+    #served from the cache, not parsed again
+    sink = MemorySink()
+    loader = HydraulikDBLoader(resy.Field(), use_cache = True, 
+                               instrumentation = Instrumentation([sink]))
+    warm = loader.read_sheet('2a Temperatur')
+    loader.instrumentation.flush(loader)
+    assert warm.equals(cold)
+    assert sink.to_frame().set_index('sheet').loc['2a Temperatur', 'source'] == 'cache'
+    
+    #other parse parameters are a miss
+    params = dict(HYDRAULIKDB_SHEETS['2a Temperatur'], header = 0)
+    assert SheetCache(hydraulikdb).get('2a Temperatur', params) is None
+
+def test_parallel_parse(hydraulikdb):
+    sheet_names = HydraulikDBLoader.sheets + ['14 Casing Design']
+    serial = HydraulikDBLoader(resy.Field(), use_cache = False, 
+                               workers = 1).read_sheets(sheet_names)
+    parallel = HydraulikDBLoader(resy.Field(), use_cache = False, 
+                                 workers = 3).read_sheets(sheet_names)
+    
+    assert list(parallel) == list(serial)
+    for sheet_name in serial:
+        assert parallel[sheet_name].equals(serial[sheet_name])
+        assert (parallel[sheet_name].dtypes == serial[sheet_name].dtypes).all()
+
+def test_cache_mixed_types():
+    import datetime
+    import pandas as pd
+    from resy.sheet_cache import _encode, _decode
+    
+    values = [datetime.time(8, 30), datetime.date(2020, 1, 2), 
+              datetime.datetime(2020, 1, 2, 8, 30), 'text', 1.5, 2, np.nan]
+    d = pd.DataFrame({'mixed': values})
+    
+    decoded = _decode(_encode(d))['mixed'].tolist()
+    assert decoded[:-1] == values[:-1]
+    assert [type(value) for value in decoded[:3]] == [datetime.time, datetime.date,
+                                                       pd.Timestamp]
+    assert np.isnan(decoded[-1])
+
+def test_cache_invalidation(hydraulikdb):
+    loader = HydraulikDBLoader(resy.Field(), use_cache = True)
+    cold = loader.read_sheets()
+    
+    def cached(sheet_name):
+        return SheetCache(hydraulikdb).get(sheet_name, HYDRAULIKDB_SHEETS[sheet_name])
+    
+    #new mtime, same content: the sha256 decides, the cache stays valid
+    data = hydraulikdb.read_bytes()
+    hydraulikdb.write_bytes(data)
+    os.utime(hydraulikdb, ns = (0, 10**18))
+    assert cached('3a Potential').equals(cold['3a Potential'])
+    
+    #modified content (size, mtime and sha256 change): the entry is removed
+    wb = load_workbook(hydraulikdb)
+    wb['3a Potential']['C5'] = 350.
+    wb.save(hydraulikdb)
+    assert cached('3a Potential') is None
+    assert HydraulikDBLoader(resy.Field(), use_cache = True).read_sheet(
+        '3a Potential').loc[1, 'PRES_TR'] == 350
+
+def test_parse_extent(tmp_path):
+    from resy.data_loader import _open_workbook, _parse_sheet
+    
+    #wells after a spacer row are read, the padded rows at the end are not
+    wb = Workbook()
+    ws = wb.active
+    ws.title = '1a Verlauf'
+    ws.append(['UWI', 'Bohrung'])
+    ws.append(['W0', 'Well 0'])
+    ws.append([None, None])
+    ws.append(['W1', 'Well 1'])
+    for _ in range(50):
+        ws.append([None] * 2)
+        
+    #sections separated by long gaps, rows with empty keys within the data 
+    #are kept, those after the data are not
+    ws = wb.create_sheet('14 Casing Design')
+    ws.append(['title'])
+    ws.append(['UWI', 'Sektion', 'Teufe von'])
+    ws.append(['W0', 'prod', 1000])
+    ws.append([None, 'comment', None])
+    for _ in range(30):
+        ws.append([None] * 3)
+    ws.append(['W1', 'prod', 2000])
+    ws.append([None, 'note', None])
+    for _ in range(30):
+        ws.append([None] * 3)
+    
+    path = tmp_path / 'extent.xlsx'
+    wb.save(path)
+    workbook = _open_workbook(path.read_bytes())
+    
+    d = _parse_sheet(workbook, '1a Verlauf')
+    assert list(d.columns) == ['UWI', 'Bohrung']
+    assert list(d.UWI) == ['W0', 'W1']
+    
+    d = _parse_sheet(workbook, '14 Casing Design')
+    assert list(d.Sektion) == ['prod', 'comment', 'prod']
+    assert list(d['Teufe von'].dropna()) == [1000, 2000]
+    
+def test_incremental_refresh(hydraulikdb):
+    field = resy.Field('test')
+    field.refresh_from_database()
+
+    assert len(field.refresh_from_database()) == 0
+
+    wb = load_workbook(hydraulikdb)
+    wb['3a Potential']['C5'] = 350.
+    wb['1a Verlauf'].delete_rows(5)
+    wb.save(hydraulikdb)
+
+    changes = field.refresh_from_database()
+
+    assert field['W1'].p_res == 350
+    assert field['W3'] is False
+    assert set(zip(changes.sheet, changes.UWI, changes.change)) == \
+        {('3a Potential', 'W1', 'changed'), ('1a Verlauf', 'W3', 'removed')}
+
+def test_lazy_load(hydraulikdb):
+    field = resy.Field('test')
+    changes = field.refresh_from_database(lazy = True)
+
+    assert set(changes.sheet) == {'1a Verlauf'}
+    assert '5a Produktivität' in field['W0']._lazy.pending
+
+    assert field['W0'].ipr.measurement_depth == 3000
+    assert '5a Produktivität' not in field['W0']._lazy.pending
+    assert '2a Temperatur' in field['W0']._lazy.pending
+
+    #setting an attribute loads its sheet first, so the value is kept
+    field['W1'].T_res = 50
+    assert field['W1'].T_res == 50
+    assert field['W0'].T_res == 100
+
+def test_lazy_load_modified_workbook(hydraulikdb):
+    #all sheets cached
+    resy.Field('test').refresh_from_database()
+    
+    field = resy.Field('test')
+    field.refresh_from_database(lazy = True)
+    assert field['W1'].T_res == 101
+    
+    #modified between two lazy loads: the cached sheet is outdated
+    wb = load_workbook(hydraulikdb)
+    wb['3a Potential']['C5'] = 350.
+    wb.save(hydraulikdb)
+    
+    assert field['W1'].p_res == 350
+
+def test_survey_loader(hydraulikdb, tmp_path):
+    field = resy.Field('test')
+    field.refresh_from_database()
+
+    directory = tmp_path / 'surveys'
+    directory.mkdir()
+
+    md = np.arange(0, 3000, 0.5)
+    with open(directory / 'W0.csv', 'w') as f:
+        f.write('# exported survey\nMD [m];Incl [deg];Azim [deg];TVD [m]\n')
+        np.savetxt(f, np.column_stack([md, md / 100, md / 10, md * 0.9]),
+                   delimiter = ';')
+
+    #matched by well name, stations not sorted, null values
+    with open(directory / 'well 1.las', 'w') as f:
+        f.write('~Well\nNULL.  -999.25 : null value\n'
+                '~Curve\nDEPT.M : depth\nAZI.DEG : azimuth\nINC.DEG : inclination\n'
+                '~A\n100 10 1\n0 0 0\n-999.25 5 5\n200 20 2\n')
+
+    loader = SurveyLoader(field, directory = directory, workers = 2, chunksize = 1000)
+    changes = loader.load()
+
+    assert set(changes.UWI) == {'W0', 'W1'}
+    assert np.array_equal(field['W0'].survey.md, md)
+    assert np.allclose(field['W0'].survey.tvd, md * 0.9)
+    assert list(field['W1'].survey.md) == [0, 100, 200]
+    assert list(field['W1'].survey.incl) == [0, 1, 2]
+    assert list(field['W1'].survey.azim) == [0, 10, 20]
+    assert field['W1'].survey.tvd is None
+
+    #unchanged files are not parsed again
+    assert len(loader.load()) == 0
+
+def test_sqlite_store(hydraulikdb, tmp_path):
+    field = resy.Field('test')
+    field.refresh_from_database()
+    field['W1'].survey = Survey(np.arange(10.), np.zeros(10), np.ones(10))
+
+    database = tmp_path / 'field.sqlite'
+    SQLiteWriter(database).write(field)
+
+    loaded = resy.Field('test')
+    changes = SQLiteLoader(loaded, database).load()
+
+    assert loaded.uwis == UWIS
+    assert (changes.change == 'added').all()
+    assert loaded['W1'].p_res == 301
+    assert loaded['W1'].ipr.measurement_depth == 700
+    assert loaded['W0'].ipr.range_certain == (10, 50)
+    assert loaded['W2'].pta.skin == -2
+    assert list(loaded['W0'].casing_design.ls) == [2000, 1000]
+    assert list(loaded['W0'].casing_design.descr) == ['liner', 'prod']
+    assert np.array_equal(loaded['W1'].survey.azim, np.ones(10))
+    assert loaded['W1'].survey.tvd is None
+    assert loaded['W3'].welltops['top reservoir'].z_TVD == 2903
+
+    #partial load by welltop depth
+    partial = resy.Field('test')
+    SQLiteLoader(partial, database).load(welltop = 'top reservoir', z_min = 2902)
+    assert partial.uwis == ['W2', 'W3']
+
+    #written wells replace the stored wells
+    field['W1'].p_res = 1.
+    SQLiteWriter(database).write(field, wells = ['W1'])
+    changes = SQLiteLoader(loaded, database).load(wells = ['W1'])
+    assert list(changes.change) == ['changed']
+    assert loaded['W1'].p_res == 1
+    assert loaded['W1'].survey is not None
+
+def test_instrumentation(hydraulikdb, tmp_path, capsys, monkeypatch):
+    sink = MemorySink()
+    monkeypatch.setitem(config['DataLoader'], 'verbose', 'False')
+    resy.Field('test').refresh_from_database(
+        instrumentation = Instrumentation([sink, JSONLinesSink(tmp_path / 'stats.jsonl')]))
+
+    assert capsys.readouterr().out == ''
+
+    stats = sink.to_frame().set_index('sheet')
+    assert set(stats.index) == set(HydraulikDBLoader.sheets + ['14 Casing Design'])
+    assert stats.loc['2a Temperatur', 'rows_read'] == 8
+    assert stats.loc['2a Temperatur', 'rows_accepted'] == 4
+    assert stats.loc['14 Casing Design', 'loader'] == 'CasingDesignLoader'
+    assert (stats.wall_time == stats.parse_time + stats.construction_time).all()
+    assert (stats.rows_per_s > 0).all()
+
+    assert len((tmp_path / 'stats.jsonl').read_text().splitlines()) == len(stats)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:12:44 2026
+
+@author: mischasch
+"""
+import copy
+
+import numpy as np
+import pytest
+
+import resy
+from resy.hydraulic_characterisation import IPR, PTA
+from resy.query import Property, has_welltop
+from resy.plotter.FieldPlotter import FieldWellSelector
+
+def test_indices():
+    field = resy.Field('test')
+    field.add_wells([resy.Well('W' + str(i), name = 'Well ' + str(i % 3)) 
+                     for i in range(10)])
+    
+    assert len(field) == 10
+    assert field['W4'].uwi == 'W4'
+    assert field['W10'] is False
+    assert 'W4' in field
+    assert field.get_well_by_name('Well 1') is field['W1']
+    
+    field.remove_wells(['W1', 'W2', 'W1'])
+    assert field.uwis == ['W0'] + ['W' + str(i) for i in range(3, 10)]
+    assert field.get_well_by_name('Well 1') is field['W4']
+    
+    with pytest.raises(ValueError):
+        field.add_well(resy.Well('W0'))
+    with pytest.raises(ValueError):
+        field.remove_wells('W1')
+    
+def test_rename():
+    field = resy.Field('test', wells = [resy.Well('W0', name = 'a'), 
+                                        resy.Well('W1', name = 'b')])
+    
+    field['W0'].name = 'c'
+    field['W1'].uwi = 'W2'
+    
+    assert field.get_well_by_name('a') is False
+    assert field.get_well_by_name('c') is field['W0']
+    assert field['W1'] is False
+    assert field['W2'].name == 'b'
+    assert field.uwis == ['W0', 'W2']
+    
+    with pytest.raises(ValueError):
+        field['W2'].uwi = 'W0'
+    assert field['W2'].uwi == 'W2'
+    
+def test_copy():
+    field = resy.Field('test', wells = [resy.Well('W0', name = 'a')])
+    copied = copy.deepcopy(field)
+    
+    copied['W0'].name = 'b'
+    copied.remove_wells('W0')
+    
+    assert field.get_well_by_name('a') is field['W0']
+    assert len(copied) == 0
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_clone(columnar):
+    wells = [resy.Well('W' + str(i), T_res = float(i), ipr = IPR(b = 1., c = 2.),
+                       casing_design = resy.CasingDesign([500., 1000.], ids = [0.2, 0.3]),
+                       welltops = {'top reservoir': resy.Welltop('top reservoir',
+                                                                 z_TVD = 1000.)})
+             for i in range(3)]
+    field = resy.Field('test', wells = wells, columnar = columnar)
+
+    clone = field['W1'].clone()
+    assert clone.uwi == 'W1' and clone not in field.wells
+    clone.T_res = 99.
+    clone.ipr.c = 5.
+    clone.welltops['top reservoir'].z_TVD = 7.
+    clone.casing_design.adjust_to_zref(600, 'up')
+
+    assert field['W1'].T_res == 1.
+    assert field['W1'].ipr.c == 2.
+    assert field['W1'].welltops['top reservoir'].z_TVD == 1000.
+    assert field['W1'].casing_design.ls.tolist() == [500., 1000.]
+    assert clone.casing_design.ls.tolist() == [500., 400.]
+
+    #the clone gets read-only views of the arrays, the arrays of the well 
+    #stay writable
+    assert np.shares_memory(clone.casing_design.ids, field['W1'].casing_design.ids)
+    with pytest.raises(ValueError):
+        clone.casing_design.ids[0] = 1.
+    field['W1'].casing_design.ids[0] = 0.2
+
+    regression = field.regress('T_res', 'ipr.c')
+    cloned = field.clone()
+    assert cloned.columnar == columnar
+    assert cloned._version == field._version
+    assert cloned.regress('T_res', 'ipr.c') is regression
+    cloned['W0'].T_res = 99.
+    cloned['W0'].welltops['top reservoir'].z_TVD = 7.
+    assert cloned.column('T_res').tolist() == [99., 1., 2.]
+    assert field.column('T_res').tolist() == [0., 1., 2.]
+    assert field.column('welltops.top reservoir.z_TVD').tolist() == [1000.] * 3
+
+    cloned.remove_wells('W1')
+    assert len(field) == 3 and field['W1'] is wells[1]
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_clone_keeps_references(columnar):
+    wells = [resy.Well('W' + str(i), ipr = IPR(b = 1., c = 2.), pta = PTA(k = 1.),
+                       casing_design = resy.CasingDesign([500., 1000.], ids = [0.2, 0.3],
+                                                         ods = [0.25, 0.35], wgs = [50., 60.],
+                                                         descr = ['', '']),
+                       survey = resy.Survey([0., 1000.], incl = [0., 10.], azim = [0., 0.]),
+                       welltops = {'top reservoir': resy.Welltop('top reservoir',
+                                                                 z_TVD = 1000.)})
+             for i in range(2)]
+    field = resy.Field('test', wells = wells, columnar = columnar)
+    well = field['W1']
+    
+    ipr = well.ipr
+    pta = well.pta
+    casing_design = well.casing_design
+    survey = well.survey
+    welltops = well.welltops
+    top = welltops['top reservoir']
+    clone = well.clone()
+    
+    #cloning and accessing the clone do not replace the objects of the well
+    assert clone.ipr is not ipr and clone.casing_design is not casing_design
+    assert well.ipr is ipr and well.pta is pta and well.welltops is welltops
+    assert well.casing_design is casing_design and well.survey is survey
+    assert well.welltops['top reservoir'] is top
+    assert casing_design.ls.flags.writeable and survey.md.flags.writeable
+    
+    #references taken before cloning edit the well, never the clone
+    ipr.c = 5.
+    top.z_TVD = 7.
+    casing_design.adjust_to_zref(600, 'up')
+    survey.incl = [0., 20.]
+    assert well.ipr.c == 5. and clone.ipr.c == 2.
+    assert well.welltops['top reservoir'].z_TVD == 7.
+    assert clone.welltops['top reservoir'].z_TVD == 1000.
+    assert well.casing_design.ls.tolist() == [500., 400.]
+    assert clone.casing_design.ls.tolist() == [500., 1000.]
+    assert well.survey.incl.tolist() == [0., 20.]
+    assert clone.survey.incl.tolist() == [0., 10.]
+    
+    #the clone copies on its first modification
+    clone.casing_design[0] = {'l': 300., 'id': 0.2, 'od': 0.25, 'wg': 50., 
+                               'descr': ''}
+    assert clone.casing_design.ls.tolist() == [300., 1000.]
+    assert not np.shares_memory(clone.casing_design.ls, well.casing_design.ls)
+    assert well.casing_design.ls.tolist() == [500., 400.]
+
+def test_columnar():
+    wells = [resy.Well('W' + str(i), T_res = float(i), ipr = IPR(b = 1., c = i),
+                       welltops = {'top reservoir': resy.Welltop('top reservoir', 
+                                                                 z_TVD = 1000. + i)})
+             for i in range(5)]
+    field = resy.Field('test', wells = wells, columnar = True)
+    
+    wells[2].T_res = 99.
+    wells[3].ipr.c = None
+    wells[4].welltops['top reservoir'].z_TVD = 5.
+    assert field.column('T_res').tolist() == [0., 1., 99., 3., 4.]
+    assert field.column('ipr.c')[3] != field.column('ipr.c')[3] #NaN
+    assert wells[3].ipr.c is None
+    assert field.column('welltops.top reservoir.z_TVD')[-1] == 5.
+    
+    field.remove_wells(['W1', 'W3'])
+    assert field.column('T_res').tolist() == [0., 99., 4.]
+    assert wells[1].T_res == 1. #values move back into removed wells
+    assert wells[4].welltops['top reservoir'].z_TVD == 5.
+    
+    with pytest.raises(ValueError):
+        resy.Field('other', wells = [wells[0]], columnar = True)
+    
+    frame = field.to_frame(['T_res', 'ipr.b'])
+    field.columnar = False
+    assert frame.equals(field.to_frame(['T_res', 'ipr.b']))
+    assert wells[2].T_res == 99.
+    
+@pytest.mark.parametrize('columnar', [False, True])
+def test_query(columnar):
+    wells = [resy.Well('W' + str(i), T_res = 100. + 10 * i, 
+                       welltype = 'prod' if i % 2 else 'inj',
+                       welltops = {'top reservoir': resy.Welltop('top reservoir', 
+                                                                 z_TVD = 3000. + i)} 
+                       if i % 3 else None)
+             for i in range(8)]
+    field = resy.Field('test', wells = wells, columnar = columnar)
+    
+    assert field.query("welltype == 'prod' and T_res > 120").uwis == ['W3', 'W5', 'W7']
+    assert field.query("'top reservoir' in welltops").uwis == ['W1', 'W2', 'W4', 'W5', 'W7']
+    assert field.query("welltops['top reservoir'].z_TVD > 3004").uwis == ['W5', 'W7']
+    assert field.query('T_res >= t_min', t_min = 160).uwis == ['W6', 'W7']
+    assert (field.where(Property('T_res').between(120, 140), welltype = 'inj').uwis 
+            == ['W2', 'W4'])
+    
+    view = field.where(has_welltop('top reservoir'))
+    assert view['W1'] is wells[1] #not copied
+    assert view.where(welltype = 'prod').uwis == ['W1', 'W5', 'W7']
+    
+    field.remove_wells('W5')
+    assert view.uwis == ['W1', 'W2', 'W4', 'W7']
+    assert view.column('T_res').tolist() == [110., 120., 140., 170.]
+    
+    with pytest.raises(ValueError):
+        field.query('T_res + 1 > 2')
+    
+def test_view():
+    field = resy.Field('test', wells = [resy.Well('W' + str(i), T_res = float(i)) 
+                                        for i in range(5)])
+    
+    view = FieldWellSelector(field, ['W3', 'W1', 'W9']).select()
+    assert view.uwis == ['W3', 'W1']
+    assert view['W1'] is field['W1'] #not copied
+    assert view.column('T_res').tolist() == [3., 1.]
+    assert view.view('W1').wells == (field['W1'],)
+    
+    with pytest.raises(ValueError):
+        view.remove_wells('W1')
+    with pytest.raises(ValueError):
+        field.view(['W9'])
+        
+    field.remove_wells('W3')
+    assert view.uwis == ['W1']
+    assert len(field) == 4
+    
+def test_distances_welltop():
+    coordinates = {'W0': (0., 0., 3000.), 'W1': (300., 400., 3000.), 
+                   'W2': (0., 0., 3100.), 'W3': (5000., 0., 3000.)}
+    field = resy.Field('test', wells = [resy.Well(uwi, welltops = {
+        'top reservoir': resy.Welltop('top reservoir', x = x, y = y, z_TVD = z)}) 
+        for uwi, (x, y, z) in coordinates.items()] + [resy.Well('W4')])
+    
+    d = field.compute_distances_welltop('top reservoir')
+    assert list(d.index) == ['W0', 'W1', 'W2', 'W3']
+    assert d.loc['W0', 'W1'] == pytest.approx(500.)
+    assert d.loc['W1', 'W0'] == d.loc['W0', 'W1']
+    assert field.compute_distances_welltop('top reservoir', 
+                                           horizontal = True).loc['W0', 'W2'] == 0.
+    
+    nearest = field.nearest_wells('W0', 'top reservoir', k = 2)
+    assert list(nearest.index) == ['W2', 'W1']
+    assert nearest.tolist() == pytest.approx([100., 500.])
+    
+    assert list(field.wells_within((0., 0., 3000.), 600., 'top reservoir').index) == ['W0', 'W2', 'W1']
+    
+    with pytest.raises(ValueError):
+        field.nearest_wells('W4', 'top reservoir')
+    
+def test_correlate():
+    z = np.linspace(2500., 3500., 20)
+    p_res = 1. + 0.1 * z
+    p_res[3] = None #missing
+    p_res[7] += 50. #outlier
+    
+    field = resy.Field('test', wells = [resy.Well('W' + str(i), p_res = None if np.isnan(p) else p, 
+                                                  T_res = 20. + 0.03 * z_i, welltops = {
+        'top reservoir': resy.Welltop('top reservoir', z_TVD = z_i)}) 
+        for i, (p, z_i) in enumerate(zip(p_res, z))])
+    variables = ['p_res', 'T_res', 'welltops.top reservoir.z_TVD']
+    
+    frame = field.to_frame(variables)
+    for method in ['pearson', 'spearman', 'kendall']:
+        assert np.allclose(field.correlate(variables, method = method), 
+                           frame.corr(method = method))
+    
+    robust = field.regress('p_res', 'welltops.top reservoir.z_TVD', robust = True)
+    linear = field.regress('p_res', 'welltops.top reservoir.z_TVD')
+    assert robust.n == 19
+    assert robust.slopes[0] == pytest.approx(0.1, rel = 1e-3)
+    assert abs(linear.slopes[0] - 0.1) > abs(robust.slopes[0] - 0.1)
+    
+    #cached until an input changes
+    assert field.regress('p_res', 'welltops.top reservoir.z_TVD', robust = True) is robust
+    field['W7'].p_res = 1. + 0.1 * z[7]
+    assert field.regress('p_res', 'welltops.top reservoir.z_TVD', robust = True) is not robust
+    
+@pytest.mark.parametrize('columnar', [False, True])
+def test_pressure_trend(columnar):
+    def make_well(i, compartment):
+        z = 2500. + 50. * i
+        p_res = (10. if compartment == 'A' else 30.) + 0.1 * z + (40. if i == 7 else 0.)
+        return resy.Well(compartment + str(i), p_res = p_res, welltops = {
+            'top reservoir': resy.Welltop('top reservoir', z_TVD = z)})
+    
+    wells = [make_well(i, compartment) for i in range(20) for compartment in 'AB']
+    compartments = {well.uwi: well.uwi[0] for well in wells}
+    field = resy.Field('test', wells = wells[:30], columnar = columnar)
+    
+    trend = field.fit_pressure_trend('clip', compartments = compartments)
+    assert trend.coefficients.loc['A', 'gradient'] == pytest.approx(0.1)
+    assert trend.coefficients.loc['A', 'n'] == 14 #outlier A7 rejected
+    assert field['A7'].p_regr == pytest.approx(10. + 0.1 * 2850.)
+    assert field['B3'].p_regr == pytest.approx(30. + 0.1 * 2650.)
+    
+    #added wells are fitted incrementally and get p_regr
+    field.add_wells(wells[30:])
+    assert trend.coefficients['n'].sum() == 38
+    assert field['B19'].p_regr == pytest.approx(30. + 0.1 * 3450.)
+    assert resy.Well('W', p_regr = 300.).p_regr == 300.
+    
+def test_ipr_matrix():
+    field = resy.Field('test', wells = [
+        resy.Well('W0', ipr = IPR(b = 1., c = 0.01, range_certain = (10, 50), 
+                                  range_uncertain = (0, 80))),
+        resy.Well('W1', ipr = IPR(b = 2.)),
+        resy.Well('W2')])
+    
+    ipr = field.ipr_matrix([0., 20., 60., 100.])
+    assert ipr.dp.shape == (3, 4)
+    assert ipr.dp[0].tolist() == pytest.approx([0., 24., 96., 200.])
+    assert ipr.dp[1].tolist() == [0., 40., 120., 200.]
+    assert np.isnan(ipr.dp[2]).all()
+    assert ipr.certain[0].tolist() == [False, True, False, False]
+    assert ipr.uncertain[0].tolist() == [True, False, True, False]
+    assert not ipr.certain[1:].any() and not ipr.uncertain[1:].any()
+    
+    q = field.rate_at_drawdown(96.)
+    assert q['W0'] == pytest.approx(60.)
+    assert q['W1'] == pytest.approx(48.)
+    assert np.isnan(q['W2'])
+    assert field.rate_at_drawdown([24., 40., 1.]).tolist()[:2] == pytest.approx([20., 20.])
+    assert field['W0'].ipr.get_q_at_dp(field['W0'].ipr.get_dp_at_q(33.)) == pytest.approx(33.)
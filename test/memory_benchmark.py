@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:38 2026
+
+@author: mischasch
+
+Memory footprint of wells with welltops, IPR and PTA, compared to the same
+wells with dict-backed objects (the layout before Well, Welltop, IPR and PTA
+declared __slots__). Run as a script:
+    python memory_benchmark.py [number of wells]
+"""
+import gc
+import sys
+import tracemalloc
+
+import resy
+from resy.hydraulic_characterisation import IPR, PTA
+from resy.welltop import Welltops
+
+WELLTOPS = ['surface', 'top reservoir', 'final depth']
+
+def make_wells(n: int) -> list:
+    return [resy.Well('W' + str(i), name = 'Well ' + str(i), 
+                      T_res = 100. + i % 50, p_res = 300. + i % 20, S = 1e5,
+                      ipr = IPR(b = 0.1, c = 0.01, range_certain = (10, 50),
+                                measurement_depth = 'top reservoir'),
+                      pta = PTA(k = 100., phi = 0.1, kh = 1e4, skin = -1.),
+                      welltops = {name: resy.Welltop(name, z_MD = 1000. * j, 
+                                                     z_TVD = 950. * j, 
+                                                     x = 4.4e6, y = 5.3e6)
+                                  for j, name in enumerate(WELLTOPS)})
+            for i in range(n)]
+
+class DictBacked():
+    '''
+    plain object with the attributes of a well, welltop, IPR or PTA in its
+    attribute dict. Stored properties are kept in one values dict per 
+    object, as StoredProperties did before __slots__.
+    '''
+    
+def dict_backed(obj):
+    '''
+    dict-backed copy of a well, welltop, IPR or PTA (see DictBacked), with
+    dict-backed copies of its welltops, IPR and PTA. Other values are shared.
+    '''
+    if isinstance(obj, Welltops):
+        return {name: dict_backed(welltop) for name, welltop in obj.items()}
+    if not isinstance(obj, (resy.Well, resy.Welltop, IPR, PTA)):
+        return obj
+    
+    stored = getattr(type(obj), '_stored', [])
+    
+    new = DictBacked()
+    if stored:
+        new._values = {name: getattr(obj, name) for name in stored}
+    for name in _slots(obj):
+        if name[1:] not in stored and hasattr(obj, name):
+            setattr(new, name, dict_backed(getattr(obj, name)))
+            
+    return new
+
+def footprint(n: int = 10000, slots: bool = True) -> float:
+    '''
+    traced memory per well [bytes], including its welltops, IPR and PTA. 
+    With slots False, of dict-backed copies of the wells (see dict_backed).
+    '''
+    gc.collect()
+    tracemalloc.start()
+    
+    wells = make_wells(n)
+    if not slots:
+        wells = [dict_backed(well) for well in wells]
+        gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    
+    tracemalloc.stop()
+    del wells
+    
+    return size / n
+
+def object_sizes(slots: bool = True) -> dict:
+    '''
+    size of single objects [bytes], including their attribute dict if it
+    is allocated (a __dict__ slot is only filled when used). With slots 
+    False, of dict-backed copies (see dict_backed).
+    '''
+    well = make_wells(1)[0]
+    objects = {'Well': well, 'Welltop': well.welltops['top reservoir'],
+               'IPR': well.ipr, 'PTA': well.pta}
+    if not slots:
+        objects = {name: dict_backed(obj) for name, obj in objects.items()}
+    
+    sizes = dict()
+    for name, obj in objects.items():
+        attributes = _attribute_dict(obj)
+        sizes[name] = sys.getsizeof(obj) + (sys.getsizeof(attributes) 
+                                            if attributes is not None else 0)
+        if isinstance(obj, DictBacked) and hasattr(obj, '_values'):
+            sizes[name] += sys.getsizeof(obj._values)
+            
+    return sizes
+
+def _slots(obj) -> list:
+    '''
+    names of the slots of an object, without __dict__ and __weakref__
+    '''
+    return [name for cls in type(obj).__mro__ 
+            for name in getattr(cls, '__slots__', ())
+            if name not in ('__dict__', '__weakref__')]
+
+def _attribute_dict(obj):
+    '''
+    attribute dict of an object, None if it has none or it was never 
+    allocated. vars would allocate the dict of a __dict__ slot, so it is 
+    found among the objects referred to by obj that are no slot values.
+    '''
+    if not hasattr(type(obj), '__slots__'):
+        return vars(obj)
+    
+    values = [id(getattr(obj, name)) for name in _slots(obj) if hasattr(obj, name)]
+    for referent in gc.get_referents(obj):
+        if type(referent) is dict and id(referent) not in values:
+            return referent
+    return None
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    
+    before, after = object_sizes(slots = False), object_sizes()
+    print('{:8s} {:>14s} {:>14s}'.format('', 'dict-backed', '__slots__'))
+    for name in after:
+        print('{:8s} {:8d} bytes {:8d} bytes'.format(name, before[name], after[name]))
+    print('per well (with 3 welltops, IPR and PTA, {} wells):'.format(n))
+    print('  dict-backed: {:.0f} bytes'.format(footprint(n, slots = False)))
+    print('  __slots__:   {:.0f} bytes'.format(footprint(n)))
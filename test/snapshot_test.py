@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:37 2026
+
+@author: mischasch
+"""
+import numpy as np
+import pytest
+
+import resy
+from resy.hydraulic_characterisation import IPR
+
+def make_field(n = 3):
+    field = resy.Field('test')
+    for i in range(n):
+        md = np.linspace(0, 3000 + i, 1000)
+        well = resy.Well('W' + str(i), name = 'Well ' + str(i), T_res = 100. + i,
+                         p_res = np.float64(300), p_regr = 195. + i, S = np.nan,
+                         ipr = IPR(b = 0.1, c = 0.01, range_certain = (10, 50),
+                                   measurement_depth = 'top reservoir'),
+                         survey = resy.Survey(md, md / 100, md / 10,
+                                              md * 0.9 if i > 0 else None),
+                         casing_design = resy.CasingDesign([1000, 2000], 
+                                                           ids = [0.2, 0.3],
+                                                           descr = np.array(['liner', 'prod'])))
+        well.welltops['top reservoir'] = resy.Welltop('top reservoir', z_MD = 3000.,
+                                                      z_TVD = 2900. + i)
+        field.add_well(well)
+    return field
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_snapshot(tmp_path, mmap):
+    field = make_field()
+    field.save_snapshot(tmp_path / 'field.snap')
+    
+    loaded = resy.Field.load_snapshot(tmp_path / 'field.snap', mmap = mmap)
+    
+    assert loaded.name == 'test'
+    assert loaded.uwis == field.uwis
+    for well, loaded_well in zip(field.wells, loaded.wells):
+        assert loaded_well.name == well.name
+        assert loaded_well.T_res == well.T_res
+        assert loaded_well.p_regr == well.p_regr
+        assert np.array_equal(loaded_well.survey.md, well.survey.md)
+        assert np.array_equal(loaded_well.survey.azim, well.survey.azim)
+        assert list(loaded_well.casing_design.ids) == [0.2, 0.3]
+        assert loaded_well.casing_design.ods is None
+        assert loaded_well.welltops['top reservoir'].z_TVD == \
+            well.welltops['top reservoir'].z_TVD
+    
+    assert np.isnan(loaded['W0'].S)
+    assert loaded['W0'].survey.tvd is None
+    assert loaded['W0'].ipr.range_certain == (10, 50)
+    assert loaded['W0'].ipr.measurement_depth == 'top reservoir'
+    
+def test_snapshot_copy_on_write(tmp_path):
+    make_field().save_snapshot(tmp_path / 'field.snap')
+    
+    loaded = resy.Field.load_snapshot(tmp_path / 'field.snap')
+    loaded['W1'].survey.md[0] = -1
+    
+    #changes stay in memory, the file is not modified
+    assert resy.Field.load_snapshot(tmp_path / 'field.snap')['W1'].survey.md[0] == 0
+    
+def test_not_a_snapshot(tmp_path):
+    (tmp_path / 'field.snap').write_bytes(b'no snapshot at all')
+    
+    with pytest.raises(ValueError):
+        resy.Field.load_snapshot(tmp_path / 'field.snap')
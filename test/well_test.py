@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:32:18 2026
+
+@author: mischasch
+"""
+import copy
+
+import numpy as np
+import pytest
+
+import resy
+from resy import brine
+from resy.friction_losses import friction_losses, friction_factor
+
+def make_well():
+    return resy.Well('W1', casing_design = resy.CasingDesign([1000., 2000.], 
+                                                              ids = [0.2, 0.3]),
+                     T_res = 130., p_res = 250., S = 1500.)
+
+def test_fl_at_q():
+    well = make_well()
+    q = np.linspace(0, 150, 1000)
+    
+    fl = well.get_fl_at_q(q)
+    assert fl.shape == (1000,)
+    assert fl[0] == 0.
+    assert np.all(np.diff(fl) > 0)
+    assert well.get_fl_at_q(50.) == pytest.approx(fl[np.argmin(np.abs(q - 50.))], rel = 1e-2)
+    
+    #Darcy-Weisbach of a single section
+    rho, mu = brine.density(130., 250., 1500.), brine.viscosity(130., 1500.)
+    v = 0.05 / (np.pi / 4 * 0.2**2)
+    Re = rho * v * 0.2 / mu
+    f = 0.02
+    for _ in range(50): #Colebrook-White by fixed-point iteration
+        f = (-2 * np.log10(3e-5 / 0.2 / 3.7 + 2.51 / (Re * np.sqrt(f))))**-2
+    assert (friction_losses(50., [0.2], [1000.], 3e-5, rho, mu)[0] 
+            == pytest.approx(f * 1000 / 0.2 * rho * v**2 / 2 / 1e5))
+    
+def test_fl_at_q_keeps_casing_design():
+    well = make_well()
+    
+    fl = well.get_fl_at_q([50., 100.], z_ref = 1500.)
+    assert np.all(fl < well.get_fl_at_q([50., 100.]))
+    assert well.casing_design.ls.tolist() == [1000., 2000.]
+    
+    #the arrays of the well stay writable, only the copy is read-only
+    well.casing_design.ls[0] = 900.
+    survey = resy.Survey([0., 1000.], incl = [0., 10.], azim = [0., 0.])
+    assert not copy.copy(survey).md.flags.writeable
+    survey.md[1] = 1100.
+    
+def test_friction_factor():
+    Re = np.logspace(2, 8, 500)
+    relative_roughness = np.linspace(0, 0.01, 500)
+    
+    f = friction_factor(Re, relative_roughness)
+    
+    laminar = Re < 2300
+    assert f[laminar] == pytest.approx(64 / Re[laminar])
+    x = 1 / np.sqrt(f[~laminar])
+    assert np.abs(x + 2 * np.log10(relative_roughness[~laminar] / 3.7 
+                                   + 2.51 * x / Re[~laminar])).max() < 1e-10
+    assert friction_factor(0., 1e-4) == 0.
+    
+def test_vfp(tmp_path):
+    from resy.vfp import VFPCache
+    
+    well = make_well()
+    cache = VFPCache(tmp_path)
+    q, z_ref = np.linspace(0, 150, 31), np.linspace(0, 1800, 7)
+    
+    table = cache.table(well, q, T = [120., 130., 140.], p = [200., 250., 300.], 
+                        z_ref = z_ref)
+    assert cache.builds == 1
+    
+    #exact at the grid points, within the error bound in between
+    assert table.get_fl(q, 130., 250., 1500.) == pytest.approx(
+        well.get_fl_at_q(q, z_ref = 1500.))
+    q_mid = (q[1:] + q[:-1]) / 2
+    fl, error = table.get_fl(q_mid, 135., 250., 1450., error = True)
+    well.T_res = 135.
+    assert np.all(np.abs(fl - well.get_fl_at_q(q_mid, z_ref = 1450.)) <= error)
+    assert np.isnan(table.get_fl(200., 130., 250.))
+    
+    #reused from memory and from the directory
+    assert cache.table(well, q, [120., 130., 140.], [200., 250., 300.], z_ref) is table
+    other = VFPCache(tmp_path)
+    other.table(well, q, [120., 130., 140.], [200., 250., 300.], z_ref)
+    assert other.builds == 0
+    
+    #rebuilt when the salinity changes
+    well.S = 100000.
+    other.table(well, q, [120., 130., 140.], [200., 250., 300.], z_ref)
+    assert other.builds == 1
+    
+def test_result_cache(tmp_path, monkeypatch):
+    from resy.calculator import result_cache
+    
+    cache = result_cache.ResultCache(tmp_path)
+    monkeypatch.setattr(result_cache, 'cache', cache)
+    well = make_well()
+    q = np.linspace(0, 150, 31)
+    
+    fl = well.get_fl_at_q(q, z_ref = 1500.)
+    expected = fl.copy()
+    fl[:] = 0 #results handed out are copies
+    assert well.get_fl_at_q(q, z_ref = 1500.).tolist() == expected.tolist()
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    #persisted, and recomputed when the well changes
+    other = result_cache.ResultCache(tmp_path)
+    monkeypatch.setattr(result_cache, 'cache', other)
+    assert well.get_fl_at_q(q, z_ref = 1500.).tolist() == expected.tolist()
+    assert (other.hits, other.misses) == (1, 0)
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.npz']
+    
+    well.casing_design = resy.CasingDesign([1000., 2000.], ids = [0.2, 0.25])
+    assert np.all(well.get_fl_at_q(q, z_ref = 1500.)[1:] > expected[1:])
+    assert other.misses == 1
+    
+    #invalidation and size-bounded eviction
+    other.invalidate(well)
+    assert len(other) == 0 and list(tmp_path.iterdir()) == []
+    other.maxsize = 1
+    well.get_fl_at_q(q)
+    assert other.size == 0 and len(other) == 1
+    
+    #only numeric results are cached
+    numeric = result_cache.ResultCache(tmp_path / 'numeric')
+    numeric.put('key', {'not': 'numeric'})
+    assert numeric.get('key') == (False, None)
+    numeric.put('key', [1., 2.])
+    assert result_cache.ResultCache(tmp_path / 'numeric').get('key') == (True, [1., 2.])
+    
+def test_result_cache_keys(monkeypatch):
+    import pandas as pd
+    from resy.calculator import result_cache
+    from resy.calculator.WellCalculator import WellPatQCalculator
+    
+    monkeypatch.setattr(result_cache, 'cache', result_cache.ResultCache())
+    well = make_well()
+    
+    #array-likes are keyed like arrays
+    expected = well.get_fl_at_q(np.array([10., 20.]))
+    assert well.get_fl_at_q(range(10, 30, 10)).tolist() == expected.tolist()
+    assert well.get_fl_at_q(pd.Series([10., 20.])).tolist() == expected.tolist()
+    
+    #inputs that may be None
+    assert result_cache._digest([(np.arange(3.), None)]) != result_cache._digest([(np.arange(3.),)])
+    
+    #pressures depend on b_res and c_res of the well
+    key = result_cache.cache.key(WellPatQCalculator(well, 50., 0))
+    well.b_res, well.c_res = 0.1, 0.01
+    assert result_cache.cache.key(WellPatQCalculator(well, 50., 0)) != key
+    with pytest.raises(ValueError):
+        WellPatQCalculator(well, 50., 0, flow_direction = 'down').calculate()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 08:17:44 2026
+
+@author: mischasch
+"""
+import copy
+import hashlib
+import itertools
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from resy import brine
+from resy.config import config
+from resy.friction_losses import friction_losses
+
+#names of the axes of a VFP table, in the order of the dimensions
+AXES = ('q', 'T', 'p', 'z_ref')
+
+#changes whenever the computation of the tables changes, so persisted tables
+#are rebuilt
+VERSION = 1
+
+class VFPTable():
+    '''
+    vertical flow performance table of a well: friction losses [bar] (see
+    resy.well.Well.get_fl_at_q) precomputed on a grid of flow rate q [l/s],
+    temperature T [°C], reservoir pressure p [bara] and reference depth
+    z_ref [m MD]. Queries are answered by multilinear interpolation, for any
+    number of query points at once, with an estimated error bound.
+    '''
+    def __init__(self, axes: dict, fl: np.ndarray, flow_direction: str = 'up',
+                 key: str = None):
+        '''
+        use build to compute the table of a well
+
+        Parameters
+        ----------
+        axes : dict
+            ascending grid values of q, T, p and z_ref.
+        fl : np.ndarray
+            friction losses [bar] at the grid points, one dimension per axis.
+        flow_direction : str, optional
+            'up' or 'down' (see resy.well.Well.get_fl_at_q). The default is
+            'up'.
+        key : str, optional
+            identifies the inputs of the table (see table_key). The default
+            is None.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.axes = {name: np.atleast_1d(np.asarray(axes[name], dtype = float))
+                     for name in AXES}
+        self.fl = np.asarray(fl, dtype = float)
+        self.flow_direction = flow_direction
+        self.key = key
+
+        if self.fl.shape != tuple([len(axis) for axis in self.axes.values()]):
+            raise ValueError('friction losses must have one value per grid point')
+
+        self._error = _error_bounds(self.fl, list(self.axes.values()))
+
+    @classmethod
+    def build(cls, well, q, T, p, z_ref = 0, flow_direction: str = 'up'):
+        '''
+        computes the table of a well, from its casing design, roughness and
+        salinity
+
+        Parameters
+        ----------
+        well : Well
+        q : array of float
+            flow rates [l/s].
+        T : float or array of float
+            temperatures [°C].
+        p : float or array of float
+            reservoir pressures [bara].
+        z_ref : float or array of float, optional
+            reference depths [m MD]. The default is 0.
+        flow_direction : str, optional
+            'up' or 'down'. The default is 'up'.
+
+        Returns
+        -------
+        VFPTable
+
+        '''
+        axes = _axes(q, T, p, z_ref)
+        casing_design, S = _inputs(well)
+
+        T_grid, p_grid = np.meshgrid(axes['T'], axes['p'], indexing = 'ij')
+        rho, mu = brine.properties(T_grid, p_grid, S)
+        rho, mu = np.asarray(rho)[..., None, None], np.asarray(mu)[..., None, None]
+
+        fl = np.empty(tuple([len(axis) for axis in axes.values()]))
+        for i, z in enumerate(axes['z_ref']):
+            #adjust a copy, the casing design of the well is not modified
+            adjusted = (copy.copy(casing_design).adjust_to_zref(z, flow_direction)
+                        if z != 0 else casing_design)
+
+            #all temperatures, pressures and rates at once: T x p x q
+            losses = friction_losses(axes['q'], adjusted.ids, adjusted.ls,
+                                     k = well.k, rho = rho, mu = mu)
+            fl[..., i] = np.moveaxis(losses, -1, 0)
+
+        return cls(axes, fl, flow_direction, table_key(well, axes, flow_direction))
+
+    def get_fl(self, q, T, p, z_ref = 0, error: bool = False):
+        '''
+        interpolated friction losses. The query values are broadcast, e.g.
+        an array of rates at one temperature, pressure and depth.
+
+        Parameters
+        ----------
+        q : float or array of float
+            flow rate(s) [l/s].
+        T : float or array of float
+            temperature(s) [°C].
+        p : float or array of float
+            reservoir pressure(s) [bara].
+        z_ref : float or array of float, optional
+            reference depth(s) [m MD]. The default is 0.
+        error : bool, optional
+            if True, the estimated error bound is returned as well. The
+            default is False.
+
+        Returns
+        -------
+        fl : float or np.ndarray
+            friction losses [bar], NaN outside of the grid.
+        error : float or np.ndarray
+            estimated bound of the interpolation error [bar], from the
+            curvature of the table (only if error is True).
+
+        '''
+        points = np.broadcast_arrays(*[np.asarray(value, dtype = float)
+                                       for value in (q, T, p, z_ref)])
+
+        fl, cells = _interpolate(self.fl, list(self.axes.values()), points)
+
+        if not error:
+            return _result(fl)
+        return _result(fl), _result(np.where(np.isnan(fl), np.nan, self._error[cells]))
+
+    def covers(self, q, T, p, z_ref = 0) -> bool:
+        '''
+        True if all query values lie within the grid
+        '''
+        return bool(np.all([np.all((np.asarray(value) >= axis[0])
+                                   & (np.asarray(value) <= axis[-1]))
+                            for value, axis in zip((q, T, p, z_ref),
+                                                   self.axes.values())]))
+
+    def save(self, path) -> None:
+        '''
+        saves the table to a numpy .npz file
+        '''
+        with open(path, 'wb') as f:
+            np.savez(f, fl = self.fl, flow_direction = self.flow_direction,
+                     key = '' if self.key is None else self.key,
+                     **{'axis_' + name: axis for name, axis in self.axes.items()})
+
+    @classmethod
+    def load(cls, path):
+        '''
+        loads a table saved with save
+        '''
+        with np.load(path, allow_pickle = False) as data:
+            return cls({name: data['axis_' + name] for name in AXES}, data['fl'],
+                       str(data['flow_direction']), str(data['key']) or None)
+
+class VFPCache():
+    '''
+    VFP tables of wells, kept in memory and optionally in a directory, so
+    they are reused across sessions. Tables are identified by the inputs
+    they are computed from (see table_key): a table is rebuilt only when
+    the casing design, roughness or salinity of the well or the grid change.
+    '''
+    def __init__(self, directory = None):
+        '''
+
+
+        Parameters
+        ----------
+        directory : str or Path, optional
+            directory to persist the tables in. The default is None (memory
+            only).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.directory = Path(directory) if directory is not None else None
+
+        self._tables = dict() #key: VFPTable
+        self.builds = 0 #number of tables computed
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def table(self, well, q, T, p, z_ref = 0, flow_direction: str = 'up') -> VFPTable:
+        '''
+        VFP table of a well, from memory or the directory if its inputs are
+        unchanged, else built (see VFPTable.build for the parameters)
+        '''
+        axes = _axes(q, T, p, z_ref)
+        key = table_key(well, axes, flow_direction)
+
+        if key in self._tables:
+            return self._tables[key]
+
+        path = self.directory / (key + '.npz') if self.directory is not None else None
+        if path is not None and path.exists():
+            try:
+                table = VFPTable.load(path)
+            except (OSError, ValueError, KeyError):
+                warnings.warn('VFP table ' + str(path) + ' could not be read, '
+                              'it is rebuilt')
+                table = None
+            if table is not None and table.key == key:
+                self._tables[key] = table
+                return table
+
+        table = VFPTable.build(well, **axes, flow_direction = flow_direction)
+        self.builds += 1
+        self._tables[key] = table
+
+        if path is not None:
+            self.directory.mkdir(parents = True, exist_ok = True)
+            table.save(path)
+
+        return table
+
+    def clear(self) -> None:
+        '''
+        removes the tables from memory (not from the directory)
+        '''
+        self._tables.clear()
+
+#tables used by resy.well.Well.get_vfp, persisted in the directory of the
+#VFP section of the config.ini (if set)
+cache = VFPCache(config.get('VFP', 'directory', fallback = None))
+
+def table_key(well, axes: dict, flow_direction: str) -> str:
+    '''
+    hash of the inputs of the VFP table of a well: casing design,
+    roughness, salinity, grid and flow direction
+    '''
+    casing_design, S = _inputs(well)
+
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(repr((VERSION, flow_direction, well.k, S)).encode())
+    for values in [casing_design.ids, casing_design.ls] + [axes[name] for name in AXES]:
+        h.update(np.ascontiguousarray(values, dtype = float).tobytes())
+        h.update(b'|')
+
+    return h.hexdigest()
+
+def _inputs(well) -> tuple:
+    '''
+    casing design and salinity of a well for the friction losses
+    '''
+    if well.casing_design is None:
+        raise ValueError('Well ' + str(well.uwi) + ' has no casing design')
+
+    S = well.S
+    if S is None:
+        warnings.warn('Well ' + str(well.uwi) + ' has no salinity, '
+                      'friction losses are computed for fresh water')
+        S = 0
+
+    return well.casing_design, S
+
+def _axes(q, T, p, z_ref) -> dict:
+    axes = {name: np.atleast_1d(np.asarray(values, dtype = float))
+            for name, values in zip(AXES, (q, T, p, z_ref))}
+
+    for name, axis in axes.items():
+        if axis.ndim != 1 or np.any(np.diff(axis) <= 0):
+            raise ValueError('grid values of ' + name + ' must be ascending')
+
+    return axes
+
+def _locate(axis: np.ndarray, x: np.ndarray) -> tuple:
+    '''
+    lower grid index, weight of the upper grid point and inside mask of
+    values on an axis. Axes with one value only contain that value.
+    '''
+    if len(axis) == 1:
+        return np.zeros(x.shape, dtype = np.intp), np.zeros(x.shape), x == axis[0]
+
+    i = np.clip(np.searchsorted(axis, x, side = 'right') - 1, 0, len(axis) - 2)
+    with np.errstate(invalid = 'ignore'):
+        w = (x - axis[i]) / (axis[i + 1] - axis[i])
+
+    return i, w, (x >= axis[0]) & (x <= axis[-1])
+
+def _interpolate(values: np.ndarray, axes: list, points: list) -> tuple:
+    '''
+    multilinear interpolation on a rectilinear grid, NaN outside of the
+    grid. Also returns the indices of the grid cells of the points.
+    '''
+    located = [_locate(axis, x) for axis, x in zip(axes, points)]
+    lower = tuple([i for i, _, _ in located])
+    inside = np.logical_and.reduce([mask for _, _, mask in located])
+
+    result = np.zeros(points[0].shape)
+    for corner in itertools.product((0, 1), repeat = len(axes)):
+        #corners beyond axes with one value don't exist
+        if any([c and len(axis) == 1 for c, axis in zip(corner, axes)]):
+            continue
+
+        weight = np.ones(points[0].shape)
+        for (_, w, _), c in zip(located, corner):
+            weight = weight * (w if c else 1 - w)
+        result += weight * values[tuple([i + c for i, c in zip(lower, corner)])]
+
+    return np.where(inside, result, np.nan), lower
+
+def _error_bounds(values: np.ndarray, axes: list) -> np.ndarray:
+    '''
+    estimated bound of the error of multilinear interpolation per grid
+    cell: the sum over all axes of h**2 / 4 times the sum of the absolute
+    second derivatives (finite differences) at both ends of the cell. For
+    smooth losses this is conservative by a factor of 4, but it also
+    covers kinks within a cell, e.g. where z_ref crosses the end of a
+    casing section. Axes with fewer than three values don't contribute.
+    '''
+    cells = tuple([max(len(axis) - 1, 1) for axis in axes])
+    bound = np.zeros(cells)
+
+    for d, axis in enumerate(axes):
+        if len(axis) < 3:
+            continue
+
+        #second derivative at the inner grid points along the axis
+        v = np.moveaxis(values, d, 0)
+        h = np.diff(axis).reshape((-1,) + (1,) * (v.ndim - 1))
+        slopes = np.diff(v, axis = 0) / h
+        curvature = np.abs(2 * np.diff(slopes, axis = 0) / (h[:-1] + h[1:]))
+
+        #per cell: the curvature of both of its grid points (the outer
+        #points use the curvature of their inner neighbour)
+        curvature = np.concatenate([curvature[:1], curvature, curvature[-1:]])
+        cell = h**2 / 4 * (curvature[:-1] + curvature[1:])
+
+        #per cell along the other axes: the larger bound of its grid points
+        cell = np.moveaxis(cell, 0, d)
+        for other, other_axis in enumerate(axes):
+            if other != d and len(other_axis) > 1:
+                cell = np.maximum(np.take(cell, range(len(other_axis) - 1), axis = other),
+                                  np.take(cell, range(1, len(other_axis)), axis = other))
+        bound += cell
+
+    return bound
+
+def _result(values: np.ndarray):
+    return float(values) if values.ndim == 0 else values
@@ -6,13 +6,14 @@ Created on Sun Oct  9 14:53:08 2022
 @author: mischasch
 """
 
+import copy
 import numpy as np
 from collections.abc import Iterable
 import warnings
 from abc import ABC, abstractmethod
 
 from resy.casing_design import CasingDesign
-from resy.welltop import Welltop
+from resy.welltop import Welltop, Welltops
 from resy.survey import Survey
 #from resy.welltop import Welltops
 #from resy.summarizer import WellSummarizer
@@ -20,11 +21,24 @@ import resy.calculator.WellCalculator as WellCalculator
 from resy.plotter.WellPlotter import *
 import resy.summarizer as summarizer
 from resy.hydraulic_characterisation import PTA, IPR
+from resy.property_store import StoredProperties
 
-class Well():
+class Well(StoredProperties):
     '''
     Contains information on a well and allows for computations of derived values
     '''
+    #properties kept in the property store of a columnar field (see 
+    #resy.property_store)
+    _stored = ['name', 'T_res', 'p_res', 'p_regr', 'S', 'k', 'z_ESP', 'welltype']
+    
+    #objects of the well that are copied for clones (see clone)
+    _cloned = ['welltops', 'ipr', 'pta', 'casing_design', 'survey']
+    
+    #slots instead of an attribute dict per well. __dict__ is created only 
+    #if other attributes are set
+    __slots__ = (('_lazy', '_fields', '_uwi', '_welltops', '_ipr', '_pta', 
+                  '_casing_design', '_survey', '__dict__') 
+                 + tuple(['_' + name for name in _stored]))
     
     def __init__(self, uwi, name = None, casing_design = None, survey = None, 
                  welltops: dict = None, ipr: IPR = None, pta : PTA = None,
@@ -72,18 +86,26 @@ class Well():
             depth [m TVD] of ESP intake
 
         '''
+        self._init_storage()
+        
+        #loader of database sheets that are loaded on first access of the
+        #corresponding attribute (see resy.data_loader.LazyLoader)
+        self._lazy = None
+        
+        #fields that contain the well, their indices are updated when the 
+        #UWI or name changes
+        self._fields = []
+        
         self.name = name
         self.uwi = uwi
         self.T_res = T_res
         self.p_res = p_res
+        self.p_regr = p_regr
         self.S = S
         self.k = k
         self.z_ESP = z_ESP
         
-        if welltops is None:
-            self.welltops = dict()
-        else:
-            self.welltops = welltops
+        self.welltops = welltops
         
         if ipr is None:
             self.ipr = IPR()
@@ -102,6 +124,196 @@ class Well():
 # =============================================================================
 #Properties
 # =============================================================================
+    @property
+    def uwi(self):
+        '''
+        unique well identifier
+        
+        '''
+        return self._uwi
+    
+    @uwi.setter
+    def uwi(self, new_uwi):
+        old = getattr(self, '_uwi', None)
+        if new_uwi == old:
+            return
+        
+        for field in self._fields:
+            if new_uwi in field:
+                raise ValueError('Well ' + str(new_uwi) + ' already in field ' 
+                                 + str(field.name))
+                
+        self._uwi = new_uwi
+        
+        for field in self._fields:
+            field._rename(self, 'uwi', old)
+            
+    @property
+    def name(self):
+        '''
+        well name
+        
+        '''
+        return self._get('name')
+    
+    @name.setter
+    def name(self, new_name):
+        old = self._get('name')
+        self._set('name', new_name)
+        
+        if new_name != old:
+            for field in self._fields:
+                field._rename(self, 'name', old)
+        
+    #properties that may be loaded lazily from the database
+    @property
+    def T_res(self):
+        '''
+        reservoir temperature [°C]
+        
+        '''
+        self._load_lazy('T_res')
+        return self._get('T_res')
+    
+    @T_res.setter
+    def T_res(self, new_T_res):
+        self._load_lazy('T_res')
+        self._set('T_res', new_T_res)
+        
+    @property
+    def p_res(self):
+        '''
+        reservoir pressure [bara]
+        
+        '''
+        self._load_lazy('p_res')
+        return self._get('p_res')
+    
+    @p_res.setter
+    def p_res(self, new_p_res):
+        self._load_lazy('p_res')
+        self._set('p_res', new_p_res)
+        
+    @property
+    def p_regr(self):
+        '''
+        reservoir pressure [bara] according to the reservoir-wide regression
+        of p_res vs. top reservoir (see resy.field.Field.fit_pressure_trend)
+        
+        '''
+        return self._get('p_regr')
+    
+    @p_regr.setter
+    def p_regr(self, new_p_regr):
+        self._set('p_regr', new_p_regr)
+        
+    @property
+    def S(self):
+        '''
+        salinity [mg/l]
+        
+        '''
+        self._load_lazy('S')
+        return self._get('S')
+    
+    @S.setter
+    def S(self, new_S):
+        self._load_lazy('S')
+        self._set('S', new_S)
+        
+    @property
+    def ipr(self):
+        '''
+        inflow performance relationship
+        
+        '''
+        self._load_lazy('ipr')
+        return self._ipr
+    
+    @ipr.setter
+    def ipr(self, new_ipr):
+        self._load_lazy('ipr')
+        
+        old = getattr(self, '_ipr', None)
+        if isinstance(old, IPR) and old is not new_ipr:
+            old._detach()
+        
+        if self._store is not None and isinstance(new_ipr, IPR):
+            #an IPR can only be stored for one well
+            if new_ipr._store is not None and new_ipr is not old:
+                new_ipr = copy.copy(new_ipr)
+            new_ipr._attach(self._store, self._row, 'ipr.')
+            
+        self._ipr = new_ipr
+        
+    @property
+    def pta(self):
+        '''
+        pressure transient analysis results
+        
+        '''
+        self._load_lazy('pta')
+        return self._pta
+    
+    @pta.setter
+    def pta(self, new_pta):
+        self._load_lazy('pta')
+        self._pta = new_pta
+        
+    @property
+    def k(self):
+        '''
+        friction losses roughness parameter
+        
+        '''
+        return self._get('k')
+    
+    @k.setter
+    def k(self, new_k):
+        self._set('k', new_k)
+        
+    @property
+    def z_ESP(self):
+        '''
+        depth [m TVD] of ESP intake
+        
+        '''
+        return self._get('z_ESP')
+    
+    @z_ESP.setter
+    def z_ESP(self, new_z_ESP):
+        self._set('z_ESP', new_z_ESP)
+        
+    @property
+    def welltype(self):
+        '''
+        'prod' for a production well, 'inj' for an injection well
+        
+        '''
+        return self._get('welltype')
+    
+    @welltype.setter
+    def welltype(self, new_welltype):
+        self._set('welltype', new_welltype)
+        
+    @property
+    def welltops(self):
+        '''
+        welltops by name
+        
+        '''
+        return self._welltops
+    
+    @welltops.setter
+    def welltops(self, new_welltops):
+        old = getattr(self, '_welltops', None)
+        if new_welltops is old and old is not None:
+            return
+        if old is not None:
+            old.clear()
+            
+        self._welltops = Welltops(self, new_welltops)
+        
     #casing design
     @property
     def casing_design(self):
@@ -109,10 +321,13 @@ class Well():
         casign design as used for friction losses computation
 
         '''
+        self._load_lazy('casing_design')
         return self._casing_design
 
     @casing_design.setter
     def casing_design(self, new_casing_design):
+        self._load_lazy('casing_design')
+        
         #type check
         if new_casing_design is not None:
             if not isinstance(new_casing_design, CasingDesign):
@@ -138,8 +353,121 @@ class Well():
         
         self._survey = new_survey
         
+    def _load_lazy(self, attribute: str) -> None:
+        '''
+        loads the database sheet of an attribute on first access. Setting an
+        attribute loads the sheet as well, so the new value is not 
+        overwritten later.
+
+        '''
+        if self._lazy is not None:
+            self._lazy.load(attribute)
+            
+    def clone(self):
+        '''
+        copy of the well for scenario analysis, e.g. to try other casing 
+        designs or ESP depths. Cloning is cheap: the clone gets shallow 
+        copies of the welltops, IPR, PTA, casing design and survey. The 
+        arrays of casing designs and surveys are shared, the clone gets 
+        read-only views that are replaced on its first modification (copy 
+        on write). The well itself is not changed, its arrays stay writable.
+        Arrays of the well that are written in place (e.g. 
+        well.casing_design.ids[0] = 0.2) are seen by the clone as well, 
+        use the methods of the casing design or survey instead.
+        
+        The clone is not part of any field.
+
+        Returns
+        -------
+        Well
+
+        '''
+        return self._clone()
+    
+    def _clone(self, store = None, row: int = None):
+        '''
+        clone of the well (see clone). If a store is given, the clone is 
+        bound to a row of it, which must hold the values of the well (a 
+        copy of the store of its field, see resy.field.Field.clone).
+        '''
+        for attribute in self._cloned:
+            self._load_lazy(attribute)
+        
+        new = Well.__new__(Well)
+        new._init_storage()
+        new._lazy = None
+        new._fields = []
+        new._uwi = self._uwi
+        
+        if store is not None:
+            new._bind(store, row)
+        else:
+            for name in self._stored:
+                new._set(name, self._get(name))
+            
+        #the IPR and the welltops may be views onto the store of a field
+        new._ipr = self._ipr._copy(store, row) if isinstance(self._ipr, IPR) else self._ipr
+        new._welltops = Welltops(new, {name: welltop._copy(store, row) 
+                                       if isinstance(welltop, Welltop) else welltop
+                                       for name, welltop in self._welltops.items()})
+        
+        #copies with read-only views of the arrays (see CasingDesign.__copy__)
+        new._pta = copy.copy(self._pta)
+        new._casing_design = copy.copy(self._casing_design)
+        new._survey = copy.copy(self._survey)
             
+        extra = getattr(self, '__dict__', None)
+        if extra:
+            new.__dict__.update(extra)
+            
+        return new
+            
+    def _attach(self, store, row: int, prefix: str = '') -> None:
+        '''
+        moves the stored properties of the well, its IPR and its welltops 
+        into a row of a property store (see resy.field.Field.columnar)
+        '''
         
+        super()._attach(store, row, prefix)
+        
+        if isinstance(self._ipr, IPR):
+            if self._ipr._store is not None:
+                self._ipr = copy.copy(self._ipr)
+            self._ipr._attach(store, row, prefix + 'ipr.')
+            
+        #setting the welltops again attaches them (see resy.welltop.Welltops)
+        for name, welltop in list(self._welltops.items()):
+            self._welltops[name] = welltop
+                
+    def _detach(self) -> None:
+        '''
+        moves the stored properties of the well, its IPR and its welltops
+        out of the property store
+        '''
+        if isinstance(self._ipr, IPR) and self._ipr._store is self._store:
+            self._ipr._detach()
+            
+        for welltop in self._welltops.values():
+            if isinstance(welltop, Welltop) and welltop._store is self._store:
+                welltop._detach()
+                
+        super()._detach()
+        
+    def _move(self, row: int) -> None:
+        '''
+        changes the row of the well in the property store (after rows 
+        before it were removed)
+        '''
+        self._row = row
+        
+        if isinstance(self._ipr, IPR) and self._ipr._store is self._store:
+            self._ipr._row = row
+        
+        for welltop in self._welltops.values():
+            if isinstance(welltop, Welltop) and welltop._store is self._store:
+                welltop._row = row
+        
+
     def compute_c_surf(self, z_ref = 0):
         '''
         
@@ -197,6 +525,36 @@ class Well():
         return WellCalculator.WellFLatQCalculator(self, q = q, z_ref = z_ref,
                                    flow_direction = flow_direction).calculate()
     
+    def get_vfp(self, q, T, p, z_ref = 0, flow_direction: str = 'up'):
+        '''
+        VFP table of the well: friction losses precomputed on a grid of flow
+        rates, temperatures, reservoir pressures and reference depths, for 
+        fast interpolated queries (see resy.vfp.VFPTable.get_fl). The table
+        is reused, also across sessions if a VFP directory is configured, 
+        until the casing design, roughness or salinity of the well change.
+
+        Parameters
+        ----------
+        q : array of float
+            flow rates [l/s].
+        T : float or array of float
+            temperatures [°C].
+        p : float or array of float
+            reservoir pressures [bara].
+        z_ref : float or array of float, optional
+            reference depths [m MD]. The default is 0.
+        flow_direction : str, optional
+            'up' or 'down' (see get_fl_at_q). The default is 'up'.
+
+        Returns
+        -------
+        resy.vfp.VFPTable
+
+        '''
+        from resy import vfp #import here to avoid circular import
+        
+        return vfp.cache.table(self, q, T, p, z_ref, flow_direction)
+    
     def get_p_at_q(self, q, z_ref = 0, T = None):
         '''
         computes the pressure at on or specific flow rates at a specific depth. 
@@ -5,14 +5,22 @@ Created on Mon Oct 10 21:00:37 2022
 
 @author: mischasch
 """
+import copy
+
 import pandas as pd
 import numpy as np
 from resy.summarizer import WelltopSummarizer
+from resy.property_store import StoredProperties
         
-class Welltop():
+class Welltop(StoredProperties):
     '''
     a welltop
     '''
+    #properties kept in the property store of a columnar field
+    _stored = ['name', 'z_MD', 'z_TVD', 'z_NN', 'x', 'y']
+    
+    __slots__ = tuple(['_' + name for name in _stored])
+    
     def __init__(self, name, z_MD = None, z_TVD = None, z_NN = None, x = None, y = None):
         '''
         
@@ -37,7 +45,8 @@ class Welltop():
         None.
 
         '''
-            
+        self._init_storage()
+        
         self.name = name
         self.z_MD = z_MD
         self.z_TVD = z_TVD
@@ -47,7 +56,175 @@ class Welltop():
         
     def __repr__(self):
         return self.summary
+
+    @property
+    def name(self):
+        '''
+        welltop name
+        
+        '''
+        return self._get('name')
+    
+    @name.setter
+    def name(self, new_name):
+        self._set('name', new_name)
+        
+    @property
+    def z_MD(self):
+        '''
+        depth [m MD]
+        
+        '''
+        return self._get('z_MD')
+    
+    @z_MD.setter
+    def z_MD(self, new_z_MD):
+        self._set('z_MD', new_z_MD)
+
+    @property
+    def z_TVD(self):
+        '''
+        depth [m TVD]
+        
+        '''
+        return self._get('z_TVD')
+    
+    @z_TVD.setter
+    def z_TVD(self, new_z_TVD):
+        self._set('z_TVD', new_z_TVD)
+
+    @property
+    def z_NN(self):
+        '''
+        depth [m NN]
+        
+        '''
+        return self._get('z_NN')
+    
+    @z_NN.setter
+    def z_NN(self, new_z_NN):
+        self._set('z_NN', new_z_NN)
+
+    @property
+    def x(self):
+        '''
+        x coordinate
+        
+        '''
+        return self._get('x')
+    
+    @x.setter
+    def x(self, new_x):
+        self._set('x', new_x)
+
+    @property
+    def y(self):
+        '''
+        y coordinate
+        
+        '''
+        return self._get('y')
+    
+    @y.setter
+    def y(self, new_y):
+        self._set('y', new_y)
     
     @property
     def summary(self):
         return WelltopSummarizer(self).summarize(form = 'str')
+
+class Welltops(dict):
+    '''
+    welltops of a well by name. Welltops added to the welltops of a well in a
+    columnar field are attached to the property store of the field (columns
+    'welltops.<name>.<property>'), removed welltops are detached.
+    '''
+    __slots__ = ('_well',)
+    
+    def __init__(self, well = None, welltops: dict = None):
+        '''
+        
+
+        Parameters
+        ----------
+        well : Well, optional
+            well the welltops belong to. The default is None.
+        welltops : dict, optional
+            name: Welltop. The default is None.
+
+        Returns
+        -------
+        None.
+
+        '''
+        super().__init__()
+        self._well = well
+        
+        if welltops is not None:
+            self.update(welltops)
+            
+    def __setitem__(self, name, welltop):
+        old = self.get(name)
+        if old is not None and old is not welltop:
+            self._detach(old)
+            
+        super().__setitem__(name, self._attach(name, welltop))
+        
+    def __delitem__(self, name):
+        self._detach(self[name])
+        super().__delitem__(name)
+        
+    def pop(self, name, *default):
+        if name in self:
+            self._detach(self[name])
+        return super().pop(name, *default)
+    
+    def popitem(self):
+        name, welltop = super().popitem()
+        self._detach(welltop)
+        return name, welltop
+    
+    def clear(self):
+        for welltop in self.values():
+            self._detach(welltop)
+        super().clear()
+        
+    def update(self, *args, **kwargs):
+        for name, welltop in dict(*args, **kwargs).items():
+            self[name] = welltop
+            
+    def setdefault(self, name, default = None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+    
+    def _store(self):
+        '''
+        property store of the well, None if the well is not in a columnar 
+        field (or not set up yet, e.g. while copying or unpickling)
+        '''
+        return getattr(getattr(self, '_well', None), '_store', None)
+    
+    def _attach(self, name, welltop):
+        '''
+        attaches a welltop to the row of the well. Welltops stored for
+        another well are copied.
+        '''
+        store = self._store()
+        if store is None or not isinstance(welltop, Welltop):
+            return welltop
+        
+        row, prefix = self._well._row, 'welltops.' + str(name) + '.'
+        if welltop._store is store and welltop._row == row and welltop._prefix == prefix:
+            return welltop
+        
+        if welltop._store is not None:
+            welltop = copy.copy(welltop)
+        welltop._attach(store, row, prefix)
+        
+        return welltop
+    
+    def _detach(self, welltop) -> None:
+        store = self._store()
+        if store is not None and isinstance(welltop, Welltop) and welltop._store is store:
+            welltop._detach()